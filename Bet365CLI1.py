@@ -1,10 +1,12 @@
 # how to run? xvfb-run python3 Bet365CLI.py
 import os
-import time
-import requests
 from dotenv import load_dotenv
 from playwright.sync_api import sync_playwright
 from playwright_stealth import Stealth
+from browser_pool import launch_context, close_context
+from wire_format import post_slots
+from ndjson_store import NdjsonRunWriter
+from scroll_driver import ScrollDriver
 
 load_dotenv()
 
@@ -18,7 +20,7 @@ def sync_to_laravel(slots_data):
     if not slots_data: return False
     print(f"   [API] Syncing {len(slots_data)} new slots...")
     try:
-        response = requests.post(API_ENDPOINT, json=slots_data, timeout=120)
+        response = post_slots(API_ENDPOINT, slots_data, timeout=120)
         if response.status_code == 200:
             details = response.json().get('details', {})
             print(f"   [SUCCESS] New: {details.get('new_slots_added')}, Skipped: {details.get('existing_slots_skipped')}")
@@ -31,8 +33,7 @@ def sync_to_laravel(slots_data):
 
 def run():
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=IS_HEADLESS)
-        context = browser.new_context(viewport={'width': 1920, 'height': 1080})
+        context = launch_context(p, CASINO_NAME, headless=IS_HEADLESS, viewport={'width': 1920, 'height': 1080})
         page = context.new_page()
         Stealth().apply_stealth_sync(page)
 
@@ -43,10 +44,10 @@ def run():
         page.wait_for_selector('div[data-testid="launchGame"]', timeout=30000)
 
         synced_titles = set()  # Session-based tracking to avoid duplicates in the scroll loop
-        scroll_attempts = 0
-        max_scroll_attempts = 50
+        writer = NdjsonRunWriter(CASINO_NAME)
+        scroller = ScrollDriver(page, 'div[data-testid="launchGame"]', step=1500, wheel=False)
 
-        while scroll_attempts < max_scroll_attempts:
+        while True:
             # 1. Extract currently visible slots
             items = page.query_selector_all('div[data-testid="launchGame"]')
             new_batch = []
@@ -83,22 +84,21 @@ def run():
 
             # 2. Sync new items found in this specific scroll
             if new_batch:
+                writer.write_many(new_batch)
                 sync_to_laravel(new_batch)
-                scroll_attempts = 0 # Reset attempts because we found data
-            else:
-                scroll_attempts += 1 # Increment because no new items appeared
 
-            # 3. Scroll down to trigger the infinite scroll lazy-load
+            # 3. Scroll down to trigger the infinite scroll lazy-load; stops once the page stops growing
             print(f"--- Scroll Activity: Found {len(new_batch)} new items (Total seen: {len(synced_titles)}) ---")
-            page.evaluate("window.scrollBy(0, 1500)")
-            time.sleep(3)
+            if not scroller.advance(len(new_batch)):
+                break
 
             # Safety break to avoid infinite loops if the site behaves unexpectedly
             if len(synced_titles) > 3000:
                 print(">>> Reached safety limit of 3000 slots.")
                 break
 
-        browser.close()
+        writer.commit()
+        close_context(context)
         print(f"\n>>> Scrape Complete for {CASINO_NAME}. Total synced: {len(synced_titles)}")
 
 if __name__ == "__main__":
@@ -1,10 +1,13 @@
 import os
-import time
-import requests
 import re
 from dotenv import load_dotenv
 from playwright.sync_api import sync_playwright
 from playwright_stealth import Stealth
+from browser_pool import launch_context, close_context
+from wire_format import post_slots
+from ndjson_store import NdjsonRunWriter
+from scroll_driver import ScrollDriver
+from selector_health import health_for
 
 load_dotenv()
 
@@ -13,13 +16,15 @@ CASINO_NAME = "https://ge.betsson.com"
 API_ENDPOINT = os.getenv('API_ENDPOINT', 'http://checkthisone.online/api/slots/sync')
 IS_HEADLESS = os.getenv('HEADLESS', 'True').lower() == 'true'
 TARGET_URL = "https://ge.betsson.com/ka/slots"
+# Slot cards, current markup first
+CARD_SELECTORS = ['.eb-slot-card-container', '[class*="slot-card-container"]']
 
 
 def sync_to_laravel(slots_data):
     if not slots_data: return False
     print(f"   [API] Syncing {len(slots_data)} slots...")
     try:
-        response = requests.post(API_ENDPOINT, json=slots_data, timeout=120)
+        response = post_slots(API_ENDPOINT, slots_data, timeout=120)
         if response.status_code == 200:
             res = response.json()
             details = res.get('details', {})
@@ -34,34 +39,38 @@ def sync_to_laravel(slots_data):
 
 
 def run():
+    health = health_for(TARGET_URL)
+    if health.broken():
+        print(f"!!! {health.site} is marked broken (selectors missing on recent runs), skipping.")
+        return
+
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=IS_HEADLESS, args=["--disable-blink-features=AutomationControlled"])
-        context = browser.new_context(viewport={'width': 1920, 'height': 1080})
+        context = launch_context(p, CASINO_NAME, headless=IS_HEADLESS, args=["--disable-blink-features=AutomationControlled"],
+                                 viewport={'width': 1920, 'height': 1080})
         page = context.new_page()
         Stealth().apply_stealth_sync(page)
 
         print(f">>> Opening {TARGET_URL}")
         try:
             # FIX 1: Change to domcontentloaded to bypass network timeouts
-            page.goto(TARGET_URL, wait_until="domcontentloaded", timeout=60000)
+            response = page.goto(TARGET_URL, wait_until="domcontentloaded", timeout=60000)
             # Explicitly wait for the Angular slot cards to appear
-            page.wait_for_selector('.eb-slot-card-container', timeout=45000)
+            card_selector = health.find(page, "cards", CARD_SELECTORS, response, timeout=20000)
+            if not card_selector:
+                raise RuntimeError("no slot cards found")
         except Exception as e:
             print(f"!!! Initial load failed or timed out: {e}")
             page.screenshot(path="betsson_error.png")
-            browser.close()
+            close_context(context)
             return
 
         synced_titles = set()
-        consecutive_no_new = 0
-
-        while consecutive_no_new < 15:  # Stop if 15 scrolls yield no new data
-            # 1. Scroll slightly to trigger lazy loading of images/data
-            page.mouse.wheel(0, 1200)
-            time.sleep(2)  # Wait for Angular to render new items
+        writer = NdjsonRunWriter(CASINO_NAME)
+        scroller = ScrollDriver(page, card_selector, step=1200)
 
-            # 2. Extract slots using the specific classes from your snippet
-            items = page.query_selector_all('.eb-slot-card-container')
+        while True:
+            # 1. Extract slots using the specific classes from your snippet
+            items = page.query_selector_all(card_selector)
             new_batch = []
 
             for item in items:
@@ -92,18 +101,20 @@ def run():
                 except:
                     continue
 
-            # 3. Sync to Laravel
+            # 2. Sync to Laravel
             if new_batch:
+                writer.write_many(new_batch)
                 sync_to_laravel(new_batch)
-                consecutive_no_new = 0  # Reset counter
-            else:
-                consecutive_no_new += 1
-                print(f"   [INFO] No new items found (Attempt {consecutive_no_new}/15)")
+
+            # 3. Scroll to trigger lazy loading; waits as long as Angular has needed to render so far
+            if not scroller.advance(len(new_batch)):
+                break
 
             # Safety cap
             if len(synced_titles) > 8000: break
 
-        browser.close()
+        writer.commit()
+        close_context(context)
         print(f"\n>>> Scrape Complete for Betsson. Total unique: {len(synced_titles)}")
 
 
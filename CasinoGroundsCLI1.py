@@ -1,9 +1,12 @@
 import os
 import time
-import requests
 from dotenv import load_dotenv
 from playwright.sync_api import sync_playwright
 from playwright_stealth import Stealth
+from browser_pool import launch_context, close_context
+from wire_format import post_slots
+from ndjson_store import NdjsonRunWriter
+from http_listing import crawl_listing
 
 load_dotenv()
 
@@ -11,14 +14,31 @@ load_dotenv()
 CASINO_NAME = "CasinoGrounds"
 API_ENDPOINT = os.getenv('API_ENDPOINT', 'http://checkthisone.online/api/slots/sync')
 IS_HEADLESS = os.getenv('HEADLESS', 'True').lower() == 'true'
-TARGET_URL = "https://casinogrounds.com/slots/"
+# Overridable so the scraper can run against casino_simulator.py
+BASE_URL = os.getenv('CASINOGROUNDS_BASE_URL', 'https://casinogrounds.com')
+TARGET_URL = BASE_URL + "/slots/"
+# The listing is server-rendered, so it is first read over plain HTTP; the browser loop below
+# only runs when this mapping stops matching or returns too little
+HTTP_SPEC = {
+    "card": 'div[data-testid^="game-card-"]',
+    "card_filter": ("data-testid", r"^game-card-\d+$"),
+    "fields": {
+        "title": {"css": '[data-testid$="-title"]'},
+        "provider": {"css": '[data-testid$="-provider"]'},
+        "avatar": {"css": 'img[data-testid$="-image"]', "attr": "src"},
+    },
+    "required": ["title"],
+    "page_url": "{url}?page={page}",
+    "more": ("button", "load more"),
+    "min_records": 100,
+}
 
 
 def sync_to_laravel(slots_data):
     if not slots_data: return False
     print(f"   [API] Syncing {len(slots_data)} slots...")
     try:
-        response = requests.post(API_ENDPOINT, json=slots_data, timeout=120)
+        response = post_slots(API_ENDPOINT, slots_data, timeout=120)
         if response.status_code == 200:
             res = response.json()
             details = res.get('details', {})
@@ -32,9 +52,21 @@ def sync_to_laravel(slots_data):
 
 
 def run():
+    synced_titles = set()
+    writer = NdjsonRunWriter(CASINO_NAME)
+
+    def sync_batch(batch):
+        synced_titles.update(slot["title"] for slot in batch)
+        writer.write_many(batch)
+        sync_to_laravel(batch)
+
+    if crawl_listing(CASINO_NAME, TARGET_URL, HTTP_SPEC, on_batch=sync_batch) is not None:
+        writer.commit()
+        print(f"\n>>> Scrape Complete (HTTP). Total: {len(synced_titles)}")
+        return
+
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=IS_HEADLESS)
-        context = browser.new_context(viewport={'width': 1920, 'height': 1080})
+        context = launch_context(p, CASINO_NAME, headless=IS_HEADLESS, viewport={'width': 1920, 'height': 1080})
         page = context.new_page()
         Stealth().apply_stealth_sync(page)
 
@@ -44,8 +76,6 @@ def run():
         except:
             page.goto(TARGET_URL, wait_until="domcontentloaded")
 
-        synced_titles = set()
-
         while True:
             # 1. Wait for any game card title to ensure the grid is loaded
             page.wait_for_selector('[data-testid$="-title"]', timeout=30000)
@@ -90,6 +120,7 @@ def run():
 
             # 3. Sync found items
             if new_batch:
+                writer.write_many(new_batch)
                 sync_to_laravel(new_batch)
             else:
                 print("   (No new items found in current view)")
@@ -115,7 +146,8 @@ def run():
 
             if len(synced_titles) > 10000: break
 
-        browser.close()
+        writer.commit()
+        close_context(context)
         print(f"\n>>> Scrape Complete. Total: {len(synced_titles)}")
 
 
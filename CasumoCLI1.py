@@ -1,10 +1,13 @@
 import os
 import time
-import requests
 import re
 from dotenv import load_dotenv
 from playwright.sync_api import sync_playwright
 from playwright_stealth import Stealth
+from browser_pool import launch_context, close_context
+from wire_format import post_slots
+from ndjson_store import NdjsonRunWriter
+from scroll_driver import ScrollDriver
 
 load_dotenv()
 
@@ -29,7 +32,7 @@ def sync_to_laravel(slots_data):
     if not slots_data: return False
     print(f"   [API] Syncing {len(slots_data)} new slots...")
     try:
-        response = requests.post(API_ENDPOINT, json=slots_data, timeout=120)
+        response = post_slots(API_ENDPOINT, slots_data, timeout=120)
         if response.status_code == 200:
             res = response.json()
             details = res.get('details', {})
@@ -45,14 +48,16 @@ def sync_to_laravel(slots_data):
 def run():
     with sync_playwright() as p:
         # Added extra arguments to look more 'human'
-        browser = p.chromium.launch(headless=IS_HEADLESS, args=[
-            "--disable-blink-features=AutomationControlled",
-            "--no-sandbox",
-            "--disable-setuid-sandbox"
-        ])
 
         # Use a realistic User Agent
-        context = browser.new_context(
+        context = launch_context(
+            p, CASINO_NAME,
+            headless=IS_HEADLESS,
+            args=[
+                "--disable-blink-features=AutomationControlled",
+                "--no-sandbox",
+                "--disable-setuid-sandbox"
+            ],
             viewport={'width': 1920, 'height': 1080},
             user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
         )
@@ -88,9 +93,11 @@ def run():
             page.screenshot(path="casumo_debug.png")
 
         synced_titles = set()
+        writer = NdjsonRunWriter(CASINO_NAME)
 
-        # Vertical discovery loop
-        for v_step in range(20):
+        # Vertical discovery loop, until no more categories load
+        scroller = ScrollDriver(page, 'div[data-testid*="-games-"]', step=1200, max_steps=20)
+        while True:
             # Selector matches trendingNow-games-0, gameOfWeek-games-1, etc.
             items = page.query_selector_all('div[data-testid*="-games-"]')
             new_batch = []
@@ -126,15 +133,17 @@ def run():
                     continue
 
             if new_batch:
+                writer.write_many(new_batch)
                 sync_to_laravel(new_batch)
 
             # Scroll down to load more categories
-            page.mouse.wheel(0, 1200)
-            time.sleep(2.5)
+            if not scroller.advance(len(new_batch)):
+                break
 
             if len(synced_titles) > 10000: break
 
-        browser.close()
+        writer.commit()
+        close_context(context)
         print(f"\n>>> Scrape Complete. Total: {len(synced_titles)}")
 
 
@@ -1,9 +1,12 @@
 import os
 import time
-import requests
 from dotenv import load_dotenv
 from playwright.sync_api import sync_playwright
 from playwright_stealth import Stealth
+from browser_pool import launch_context, close_context
+from wire_format import post_slots
+from ndjson_store import NdjsonRunWriter
+from hydration_state import extract_catalog
 
 load_dotenv()
 
@@ -13,13 +16,27 @@ API_ENDPOINT = os.getenv('API_ENDPOINT', 'http://checkthisone.online/api/slots/s
 IS_HEADLESS = os.getenv('HEADLESS', 'True').lower() == 'true'
 TARGET_URL = "https://www.cloudbet.com/en/casino/slots"  # Ensure standard entry URL
 BASE_URL = "https://www.cloudbet.com"
+# Next.js app: the first HTML carries the lobby in __NEXT_DATA__
+HYDRATION_SPEC = {
+    "source": "__NEXT_DATA__",
+    "path": "props.pageProps.games|props.pageProps.initialData.games",
+    "required": ["title", "slug", "provider"],
+    "fields": {"title": "name|title", "slug": "slug|key", "provider": "provider.name|providerName|provider",
+               "avatar": "thumbnail|image|imageUrl|thumbnailUrl"},
+    "url": BASE_URL + "/en/casino/play/{slug}",
+    "asset_base": BASE_URL,
+    "cursor": {"path": "props.pageProps.nextCursor|props.pageProps.cursor",
+               "url": BASE_URL + "/_next/data/{build_id}/en/casino/slots.json?cursor={cursor}"},
+    "total": "props.pageProps.total|props.pageProps.totalCount",
+    "min_records": 20,
+}
 
 
 def sync_to_laravel(slots_data):
     if not slots_data: return False
     print(f"   [API] Syncing {len(slots_data)} new slots...")
     try:
-        response = requests.post(API_ENDPOINT, json=slots_data, timeout=120)
+        response = post_slots(API_ENDPOINT, slots_data, timeout=120)
         if response.status_code == 200:
             details = response.json().get('details', {})
             print(
@@ -34,8 +51,7 @@ def sync_to_laravel(slots_data):
 
 def run():
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=IS_HEADLESS)
-        context = browser.new_context(viewport={'width': 1920, 'height': 1080})
+        context = launch_context(p, CASINO_NAME, headless=IS_HEADLESS, viewport={'width': 1920, 'height': 1080})
         page = context.new_page()
         Stealth().apply_stealth_sync(page)
 
@@ -43,8 +59,17 @@ def run():
         page.goto(TARGET_URL, wait_until="domcontentloaded", timeout=90000)
 
         synced_slugs = set()
+        writer = NdjsonRunWriter(CASINO_NAME)
 
-        while True:
+        def sync_batch(batch):
+            synced_slugs.update(slot["url"].split('/')[-1] for slot in batch)
+            writer.write_many(batch)
+            sync_to_laravel(batch)
+
+        # Read the catalog from the hydration state; the Load-more crawl only runs when it's missing or partial
+        _, complete = extract_catalog(page, HYDRATION_SPEC, CASINO_NAME, on_batch=sync_batch)
+
+        while not complete:
             # 1. Wait for game tiles to render
             # We use the unique class 'TileContent-wrapper' which contains the info
             try:
@@ -89,6 +114,7 @@ def run():
 
             # 3. Sync to Laravel
             if new_batch:
+                writer.write_many(new_batch)
                 sync_to_laravel(new_batch)
 
             # 4. Handle "Load more" button
@@ -109,7 +135,8 @@ def run():
             # Safety break
             if len(synced_slugs) > 5000: break
 
-        browser.close()
+        writer.commit()
+        close_context(context)
         print(f"\n>>> Scrape Complete for Cloudbet. Total: {len(synced_slugs)}")
 
 
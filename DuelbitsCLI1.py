@@ -1,10 +1,13 @@
 import os
 import time
-import requests
 import re
 from dotenv import load_dotenv
 from playwright.sync_api import sync_playwright
 from playwright_stealth import Stealth
+from browser_pool import launch_context, close_context
+from wire_format import post_slots
+from ndjson_store import NdjsonRunWriter
+from hydration_state import extract_catalog
 
 load_dotenv()
 
@@ -15,13 +18,27 @@ API_ENDPOINT = os.getenv('API_ENDPOINT', 'http://checkthisone.online/api/slots/s
 IS_HEADLESS = os.getenv('HEADLESS', 'True').lower() == 'true'
 TARGET_URL = "https://duelbits.com/en/slots"
 BASE_URL = "https://duelbits.com"
+# Next.js app: the first HTML carries the lobby in __NEXT_DATA__
+HYDRATION_SPEC = {
+    "source": "__NEXT_DATA__",
+    "path": "props.pageProps.games|props.pageProps.initialGames",
+    "required": ["title", "slug", "provider"],
+    "fields": {"title": "name|title", "slug": "slug|identifier", "provider": "provider.name|providerName|provider",
+               "avatar": "image|thumbnail|imageUrl"},
+    "url": BASE_URL + "/slots/{slug}",
+    "asset_base": BASE_URL,
+    "cursor": {"path": "props.pageProps.nextCursor|props.pageProps.cursor",
+               "url": BASE_URL + "/_next/data/{build_id}/en/slots.json?cursor={cursor}"},
+    "total": "props.pageProps.total|props.pageProps.totalCount",
+    "min_records": 20,
+}
 
 
 def sync_to_laravel(slots_data):
     if not slots_data: return False
     print(f"   [API] Syncing {len(slots_data)} slots...")
     try:
-        response = requests.post(API_ENDPOINT, json=slots_data, timeout=120)
+        response = post_slots(API_ENDPOINT, slots_data, timeout=120)
         if response.status_code == 200:
             res = response.json()
             details = res.get('details', {})
@@ -37,12 +54,11 @@ def sync_to_laravel(slots_data):
 
 def run():
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=IS_HEADLESS, args=[
-            "--disable-blink-features=AutomationControlled",
-            "--no-sandbox"
-        ])
         # Use a real user agent to bypass simple filters
-        context = browser.new_context(
+        context = launch_context(
+            p, CASINO_NAME,
+            headless=IS_HEADLESS,
+            args=["--disable-blink-features=AutomationControlled", "--no-sandbox"],
             viewport={'width': 1920, 'height': 1080},
             user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
         )
@@ -62,8 +78,17 @@ def run():
             page.screenshot(path="duelbits_error.png")
 
         synced_slugs = set()
+        writer = NdjsonRunWriter(CASINO_NAME)
 
-        while True:
+        def sync_batch(batch):
+            synced_slugs.update(slot["url"].split('/')[-1] for slot in batch)
+            writer.write_many(batch)
+            sync_to_laravel(batch)
+
+        # Read the catalog from the hydration state; the Load-more crawl only runs when it's missing or partial
+        _, complete = extract_catalog(page, HYDRATION_SPEC, CASINO_NAME, on_batch=sync_batch)
+
+        while not complete:
             # 2. Extract visible slots using the specific classes from your element
             # Select the container and then find the link inside
             containers = page.query_selector_all('div[class*="styles_cardContainer"]')
@@ -102,6 +127,7 @@ def run():
                     continue
 
             if new_batch:
+                writer.write_many(new_batch)
                 sync_to_laravel(new_batch)
 
             # 4. Handle "Load More" Button
@@ -126,7 +152,8 @@ def run():
 
             if len(synced_slugs) > 10000: break
 
-        browser.close()
+        writer.commit()
+        close_context(context)
         print(f"\n>>> Scrape Complete for Duelbits. Total: {len(synced_slugs)}")
 
 
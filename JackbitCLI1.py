@@ -1,10 +1,13 @@
 import os
 import time
-import requests
 import re
 from dotenv import load_dotenv
 from playwright.sync_api import sync_playwright
 from playwright_stealth import Stealth
+from browser_pool import launch_context, close_context
+from wire_format import post_slots
+from ndjson_store import NdjsonRunWriter
+from selector_health import health_for
 
 load_dotenv()
 
@@ -13,6 +16,8 @@ CASINO_NAME = "Jackbit"
 API_ENDPOINT = os.getenv('API_ENDPOINT', 'http://checkthisone.online/api/slots/sync')
 IS_HEADLESS = os.getenv('HEADLESS', 'True').lower() == 'true'
 TARGET_URL = "https://jackbit.com/en/casino/casino?category=3"
+# Game tiles, current markup first
+GAME_SELECTORS = ['li[gameid]', '[gameid]']
 BASE_URL = "https://jackbit.com"
 
 
@@ -20,7 +25,7 @@ def sync_to_laravel(slots_data):
     if not slots_data: return False
     print(f"   [API] Syncing {len(slots_data)} slots...")
     try:
-        response = requests.post(API_ENDPOINT, json=slots_data, timeout=120)
+        response = post_slots(API_ENDPOINT, slots_data, timeout=120)
         if response.status_code == 200:
             res = response.json()
             details = res.get('details', {})
@@ -35,31 +40,39 @@ def sync_to_laravel(slots_data):
 
 
 def run():
+    health = health_for(TARGET_URL)
+    if health.broken():
+        print(f"!!! {health.site} is marked broken (selectors missing on recent runs), skipping.")
+        return
+
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=IS_HEADLESS, args=["--disable-blink-features=AutomationControlled"])
-        context = browser.new_context(viewport={'width': 1920, 'height': 1080})
+        context = launch_context(p, CASINO_NAME, headless=IS_HEADLESS, args=["--disable-blink-features=AutomationControlled"],
+                                 viewport={'width': 1920, 'height': 1080})
         page = context.new_page()
         Stealth().apply_stealth_sync(page)
 
         print(f">>> Opening {TARGET_URL}")
         try:
             # FIX 1: Use domcontentloaded to avoid the 90s timeout
-            page.goto(TARGET_URL, wait_until="domcontentloaded", timeout=60000)
+            response = page.goto(TARGET_URL, wait_until="domcontentloaded", timeout=60000)
 
             # FIX 2: Explicitly wait for the list items to appear
             print("   Waiting for slots to load...")
-            page.wait_for_selector('li[gameid]', timeout=45000)
+            game_selector = health.find(page, "games", GAME_SELECTORS, response, timeout=20000)
+            if not game_selector:
+                raise RuntimeError("no game tiles found")
         except Exception as e:
             print(f"!!! Load failed: {e}")
             page.screenshot(path="jackbit_error.png")
-            browser.close()
+            close_context(context)
             return
 
         synced_game_ids = set()
+        writer = NdjsonRunWriter(CASINO_NAME)
 
         while True:
             # 1. Extract slots
-            items = page.query_selector_all('li[gameid]')
+            items = page.query_selector_all(game_selector)
             new_batch = []
 
             for item in items:
@@ -101,6 +114,7 @@ def run():
 
             # 2. Sync to Laravel
             if new_batch:
+                writer.write_many(new_batch)
                 sync_to_laravel(new_batch)
 
             # 3. Handle "Show more" button
@@ -125,7 +139,8 @@ def run():
 
             if len(synced_game_ids) > 6000: break
 
-        browser.close()
+        writer.commit()
+        close_context(context)
         print(f"\n>>> Scrape Complete. Total: {len(synced_game_ids)}")
 
 
@@ -1,9 +1,10 @@
 import os
 import time
-import requests
+import threading
 from dotenv import load_dotenv
-from playwright.sync_api import sync_playwright
-from playwright_stealth import Stealth
+from wire_format import post_slots
+from ndjson_store import NdjsonRunWriter
+from tab_fanout import MAX_TABS, SharedDedup, SyncQueue, fan_out
 
 load_dotenv()
 
@@ -11,14 +12,22 @@ load_dotenv()
 CASINO_NAME = "https://mrgreen.com"
 API_ENDPOINT = os.getenv('API_ENDPOINT', 'http://checkthisone.online/api/slots/sync')
 IS_HEADLESS = os.getenv('HEADLESS', 'True').lower() == 'true'
-TARGET_URL = "https://www.mrgreen.com/slots/"
+# Overridable so the scraper can run against casino_simulator.py
+BASE_URL = os.getenv('MRGREEN_BASE_URL', 'https://www.mrgreen.com')
+TARGET_URL = BASE_URL + "/slots/"
+GAME_SELECTOR = '.cy-single-game-regular-template'
+NEXT_BUTTON = 'button.cy-swiper-button-next'
+MAX_SCROLLS = 20
+MAX_SWIPES = 60
+# Safety cap on the whole catalog
+MAX_GAMES = 5000
 
 
 def sync_to_laravel(slots_data):
     if not slots_data: return False
     print(f"   [API] Syncing {len(slots_data)} slots...")
     try:
-        response = requests.post(API_ENDPOINT, json=slots_data, timeout=120)
+        response = post_slots(API_ENDPOINT, slots_data, timeout=120)
         if response.status_code == 200:
             res = response.json()
             details = res.get('details', {})
@@ -32,86 +41,138 @@ def sync_to_laravel(slots_data):
     return False
 
 
+def extract_batch(items, synced_titles):
+    new_batch = []
+    for item in items:
+        try:
+            title_el = item.query_selector('.cy-game-title')
+            title = title_el.inner_text().strip() if title_el else ""
+
+            if title and synced_titles.claim(title):
+                img_el = item.query_selector('img.cy-game-image')
+                avatar = img_el.get_attribute('src') if img_el else ""
+
+                # Extract Provider from class list (it was in your element snippet)
+                classes = item.get_attribute('class') or ""
+                provider = "Unknown"
+                for cls in classes.split():
+                    if cls.startswith('game-company-'):
+                        provider = cls.replace('game-company-', '').capitalize()
+
+                new_batch.append({
+                    "title": title,
+                    "provider": provider,
+                    "url": TARGET_URL,
+                    "avatar": avatar,
+                    "casino_name": CASINO_NAME
+                })
+        except:
+            continue
+    return new_batch
+
+
+def open_lobby(page):
+    # Use domcontentloaded to avoid the timeout
+    page.goto(TARGET_URL, wait_until="domcontentloaded", timeout=60000)
+    # Wait for the game grid specifically
+    page.wait_for_selector(GAME_SELECTOR, timeout=45000)
+
+
+class SliderClaims:
+    """Hands out slider indices to the tabs, each one once, until the lobby's slider count is reached."""
+
+    def __init__(self):
+        self._next = 0
+        self._lock = threading.Lock()
+        self.found = 0
+
+    def claim(self, slider_count):
+        with self._lock:
+            self.found = max(self.found, slider_count)
+            if self._next >= slider_count:
+                return None
+            self._next += 1
+            return self._next - 1
+
+
+def mount_sliders(page, synced_titles, sync_queue):
+    """Scrolls the lobby top to bottom so every slider mounts, syncing what's visible on the way."""
+    for _ in range(MAX_SCROLLS):
+        sync_queue.put(extract_batch(page.query_selector_all(GAME_SELECTOR), synced_titles))
+        page.mouse.wheel(0, 800)
+        time.sleep(2)
+    return page.locator(NEXT_BUTTON).count()
+
+
+def crawl_slider(page, index, synced_titles, sync_queue):
+    """Swipes slider `index` of the already loaded lobby to its end, reading only that slider's games."""
+    buttons = page.locator(NEXT_BUTTON)
+    if buttons.count() <= index:
+        print(f"!!! Slider {index} never appeared.")
+        return
+
+    button = buttons.nth(index)
+    button.scroll_into_view_if_needed()
+    slider = button.locator(f"xpath=ancestor::*[.//*[contains(@class, '{GAME_SELECTOR[1:]}')]][1]")
+
+    idle_swipes = 0
+    for _ in range(MAX_SWIPES):
+        if len(synced_titles) >= MAX_GAMES:
+            break
+        new_batch = extract_batch(slider.locator(GAME_SELECTOR).element_handles(), synced_titles)
+        sync_queue.put(new_batch)
+        idle_swipes = 0 if new_batch else idle_swipes + 1
+        if idle_swipes >= 3 or not (button.is_visible() and button.is_enabled()):
+            break
+        button.click()
+        time.sleep(0.5)
+    print(f"--- Slider {index} done (Total synced: {len(synced_titles)})")
+
+
+def crawl_tab(page, claims, synced_titles, sync_queue):
+    """
+    One tab: loads the lobby once, then keeps claiming sliders and swiping them on that same page,
+    so the lobby is loaded once per tab rather than once per slider.
+    """
+    open_lobby(page)
+    slider_count = mount_sliders(page, synced_titles, sync_queue)
+    while len(synced_titles) < MAX_GAMES:
+        index = claims.claim(slider_count)
+        if index is None:
+            break
+        crawl_slider(page, index, synced_titles, sync_queue)
+
+
 def run():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=IS_HEADLESS, args=["--disable-blink-features=AutomationControlled"])
-        context = browser.new_context(viewport={'width': 1920, 'height': 1080})
-        page = context.new_page()
-        Stealth().apply_stealth_sync(page)
+    synced_titles = SharedDedup()
+    writer = NdjsonRunWriter(CASINO_NAME)
+    sync_queue = SyncQueue(writer, sync_to_laravel)
 
-        print(f">>> Opening {TARGET_URL}")
-        try:
-            # Use domcontentloaded to avoid the timeout
-            page.goto(TARGET_URL, wait_until="domcontentloaded", timeout=60000)
-            # Wait for the game grid specifically
-            page.wait_for_selector('.cy-single-game-regular-template', timeout=45000)
-        except Exception as e:
-            print(f"!!! Initial Load Failed: {e}")
-            browser.close()
+    print(f">>> Opening {TARGET_URL}")
+    try:
+        # Every tab loads the lobby once and swipes sliders from the shared claims until none are
+        # left, sharing the dedup set and sync queue
+        claims = SliderClaims()
+        fan_out(CASINO_NAME, list(range(MAX_TABS)),
+                lambda page, _: crawl_tab(page, claims, synced_titles, sync_queue), headless=IS_HEADLESS)
+        if not claims.found:
+            print("!!! Initial Load Failed")
+            writer.mark_incomplete()
             return
-
-        synced_titles = set()
-
-        # 1. Identify containers that hold the swiper/sliders
-        # We target the common parent of the game templates
-        print("   Scanning page for sliders...")
-
-        # 2. Extract slots by scrolling. Mr Green sliders usually expand
-        # or load more as you scroll the main page down too.
-        scroll_count = 0
-        while scroll_count < 20:
-            items = page.query_selector_all('.cy-single-game-regular-template')
-            new_batch = []
-
-            for item in items:
-                try:
-                    title_el = item.query_selector('.cy-game-title')
-                    title = title_el.inner_text().strip() if title_el else ""
-
-                    if title and title not in synced_titles:
-                        img_el = item.query_selector('img.cy-game-image')
-                        avatar = img_el.get_attribute('src') if img_el else ""
-
-                        # Extract Provider from class list (it was in your element snippet)
-                        classes = item.get_attribute('class') or ""
-                        provider = "Unknown"
-                        for cls in classes.split():
-                            if cls.startswith('game-company-'):
-                                provider = cls.replace('game-company-', '').capitalize()
-
-                        new_batch.append({
-                            "title": title,
-                            "provider": provider,
-                            "url": TARGET_URL,
-                            "avatar": avatar,
-                            "casino_name": CASINO_NAME
-                        })
-                        synced_titles.add(title)
-                except:
-                    continue
-
-            if new_batch:
-                sync_to_laravel(new_batch)
-
-            # 3. Horizontal Swiping Logic
-            # Mr Green often uses a generic swiper-button-next
-            next_buttons = page.locator('button.cy-swiper-button-next').all()
-            for btn in next_buttons:
-                if btn.is_visible() and btn.is_enabled():
-                    btn.click()
-                    time.sleep(0.5)
-
-            # 4. Vertical Scrolling (to trigger more categories)
-            page.mouse.wheel(0, 800)
-            time.sleep(2)
-            scroll_count += 1
-
-            # If we've seen enough or the page stopped growing
-            if len(synced_titles) > 5000: break
-
-        browser.close()
-        print(f"\n>>> Scrape Complete for Mr Green. Total synced: {len(synced_titles)}")
+        print(f"   Found {claims.found} sliders.")
+        if len(synced_titles) >= MAX_GAMES:
+            print(f"!!! Stopped at the {MAX_GAMES}-game cap.")
+            writer.mark_incomplete()
+    except BaseException:
+        writer.mark_incomplete()
+        raise
+    finally:
+        # Whatever was synced before a failure still ends up in a committed run file, marked
+        # incomplete so catalog_change doesn't compare against it
+        sync_queue.close()
+        writer.commit()
+    print(f"\n>>> Scrape Complete for Mr Green. Total synced: {len(synced_titles)}")
 
 
 if __name__ == "__main__":
-    run()
\ No newline at end of file
+    run()
@@ -1,9 +1,11 @@
 import os
 import time
-import requests
 from dotenv import load_dotenv
-from playwright.sync_api import sync_playwright
-from playwright_stealth import Stealth
+from wire_format import post_slots
+from ndjson_store import NdjsonRunWriter
+from listing_frontier import ListingFrontier
+from tab_fanout import SharedDedup, SyncQueue, fan_out
+from http_listing import crawl_listing
 
 load_dotenv()
 
@@ -11,22 +13,42 @@ load_dotenv()
 CASINO_NAME = "PlayOJO"
 API_ENDPOINT = os.getenv('API_ENDPOINT', 'http://checkthisone.online/api/slots/sync')
 IS_HEADLESS = os.getenv('HEADLESS', 'True').lower() == 'true'
+# Overridable so the scraper can run against casino_simulator.py
+BASE_URL = os.getenv('PLAYOJO_BASE_URL', 'https://www.playojo.com')
 
 # List of URLs provided
 TARGET_URLS = [
-    "https://www.playojo.com/slots/new-slots-games/",
-    "https://www.playojo.com/slots/trending-slots-games/",
-    "https://www.playojo.com/slots/popular-near-you-slots-games/",
-    "https://www.playojo.com/slots/exclusive-slots-games/",
-    "https://www.playojo.com/slots/megaways-games/"
+    BASE_URL + "/slots/new-slots-games/",
+    BASE_URL + "/slots/trending-slots-games/",
+    BASE_URL + "/slots/popular-near-you-slots-games/",
+    BASE_URL + "/slots/exclusive-slots-games/",
+    BASE_URL + "/slots/megaways-games/"
 ]
+# Newest-first listings: stop once we reach cards we already have
+ORDERED_URLS = {
+    BASE_URL + "/slots/new-slots-games/",
+}
+# Category pages are read over plain HTTP first; categories this mapping can't read
+# go to the browser tabs below
+HTTP_SPEC = {
+    "card": ".thumb",
+    "fields": {
+        "title": {"css": "h3"},
+        "provider": {"css": ".thumb_hover img", "attr": "alt"},
+        "avatar": {"css": ".thumb_img", "attr": "src"},
+    },
+    "required": ["title"],
+    "page_url": "{url}?page={page}",
+    "more": ("button.btn-green", "load more"),
+    "min_records": 20,
+}
 
 
 def sync_to_laravel(slots_data):
     if not slots_data: return False
     print(f"   [API] Syncing {len(slots_data)} new slots...")
     try:
-        response = requests.post(API_ENDPOINT, json=slots_data, timeout=120)
+        response = post_slots(API_ENDPOINT, slots_data, timeout=120)
         if response.status_code == 200:
             details = response.json().get('details', {})
             print(
@@ -37,79 +59,113 @@ def sync_to_laravel(slots_data):
     return False
 
 
-def run():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=IS_HEADLESS)
-        context = browser.new_context(viewport={'width': 1920, 'height': 1080})
-        page = context.new_page()
-        Stealth().apply_stealth_sync(page)
+def crawl_category(page, url, synced_titles, sync_queue):
+    print(f"\n>>> Starting Category: {url}")
+    try:
+        page.goto(url, wait_until="networkidle", timeout=90000)
+    except:
+        print(f"!!! Failed to load {url}, skipping.")
+        return
+
+    frontier = ListingFrontier(CASINO_NAME, url) if url in ORDERED_URLS else None
+    checked = 0
+
+    while True:
+        # 1. Wait for thumbnails
+        page.wait_for_selector('.thumb', timeout=30000)
 
-        synced_titles = set()
+        # 2. Extract slots
+        items = page.query_selector_all('.thumb')
+        new_batch = []
 
-        for url in TARGET_URLS:
-            print(f"\n>>> Starting Category: {url}")
+        # LOAD MORE appends cards, so only the ones after `checked` are new in the DOM
+        for item in items[checked:]:
             try:
-                page.goto(url, wait_until="networkidle", timeout=90000)
+                # Title is inside h3
+                title_el = item.query_selector('h3')
+                title = title_el.inner_text().strip() if title_el else ""
+
+                # Provider is hidden in an img alt tag inside the hover container
+                provider_img = item.query_selector('.thumb_hover img')
+                provider = provider_img.get_attribute('alt') if provider_img else "Unknown"
+
+                if title and frontier and frontier.see(title, provider):
+                    break
+
+                if title and synced_titles.claim(title):
+                    # Avatar from the main thumb_img
+                    img_el = item.query_selector('.thumb_img')
+                    avatar = img_el.get_attribute('src') if img_el else ""
+
+                    new_batch.append({
+                        "title": title,
+                        "provider": provider,
+                        "url": url,
+                        "avatar": avatar,
+                        "casino_name": CASINO_NAME
+                    })
             except:
-                print(f"!!! Failed to load {url}, skipping.")
                 continue
+        checked = len(items)
+
+        # 3. Hand the batch to the shared sync queue
+        sync_queue.put(new_batch)
+
+        # 4. Handle "LOAD MORE"
+        # Using the specific text and button class btn-green
+        load_more = page.locator('button.btn-green:has-text("LOAD MORE")')
+
+        if frontier and frontier.stopped_early:
+            print(f">>> Reached the known frontier, {url} up to date.")
+            break
+        elif load_more.is_visible():
+            print(f"--- Clicking 'LOAD MORE' on {url} (Total items in memory: {len(synced_titles)}) ---")
+            load_more.scroll_into_view_if_needed()
+            load_more.click()
+
+            # PlayOJO items take a second to slide in
+            time.sleep(3)
+        else:
+            print(f">>> Category complete: {url}")
+            break
+
+    if frontier:
+        frontier.commit()
+        if frontier.stopped_early:
+            sync_queue.writer.mark_incomplete()
+
+
+def crawl_category_http(url, sync_batch, writer):
+    """crawl_listing() for one category, with the same frontier as crawl_category(). False = use the browser."""
+    frontier = ListingFrontier(CASINO_NAME, url) if url in ORDERED_URLS else None
+    if crawl_listing(CASINO_NAME, url, HTTP_SPEC, on_batch=sync_batch, frontier=frontier) is None:
+        return False
+    if frontier:
+        frontier.commit()
+        if frontier.stopped_early:
+            writer.mark_incomplete()
+    return True
 
-            while True:
-                # 1. Wait for thumbnails
-                page.wait_for_selector('.thumb', timeout=30000)
-
-                # 2. Extract slots
-                items = page.query_selector_all('.thumb')
-                new_batch = []
-
-                for item in items:
-                    try:
-                        # Title is inside h3
-                        title_el = item.query_selector('h3')
-                        title = title_el.inner_text().strip() if title_el else ""
-
-                        if title and title not in synced_titles:
-                            # Avatar from the main thumb_img
-                            img_el = item.query_selector('.thumb_img')
-                            avatar = img_el.get_attribute('src') if img_el else ""
-
-                            # Provider is hidden in an img alt tag inside the hover container
-                            provider_img = item.query_selector('.thumb_hover img')
-                            provider = provider_img.get_attribute('alt') if provider_img else "Unknown"
-
-                            new_batch.append({
-                                "title": title,
-                                "provider": provider,
-                                "url": url,
-                                "avatar": avatar,
-                                "casino_name": CASINO_NAME
-                            })
-                            synced_titles.add(title)
-                    except:
-                        continue
-
-                # 3. Sync to Laravel
-                if new_batch:
-                    sync_to_laravel(new_batch)
-
-                # 4. Handle "LOAD MORE"
-                # Using the specific text and button class btn-green
-                load_more = page.locator('button.btn-green:has-text("LOAD MORE")')
-
-                if load_more.is_visible():
-                    print(f"--- Clicking 'LOAD MORE' (Total items in memory: {len(synced_titles)}) ---")
-                    load_more.scroll_into_view_if_needed()
-                    load_more.click()
-
-                    # PlayOJO items take a second to slide in
-                    time.sleep(3)
-                else:
-                    print(">>> Category complete.")
-                    break
 
-        browser.close()
-        print(f"\n>>> Global Scrape Complete. Total unique items: {len(synced_titles)}")
+def run():
+    synced_titles = SharedDedup()
+    writer = NdjsonRunWriter(CASINO_NAME)
+    sync_queue = SyncQueue(writer, sync_to_laravel)
+
+    def sync_batch(batch):
+        sync_queue.put([slot for slot in batch if synced_titles.claim(slot["title"])])
+
+    browser_urls = [url for url in TARGET_URLS if not crawl_category_http(url, sync_batch, writer)]
+
+    # One tab per remaining category, all feeding the same dedup set and sync queue
+    if browser_urls:
+        fan_out(CASINO_NAME, browser_urls, lambda page, url: crawl_category(page, url, synced_titles, sync_queue),
+                headless=IS_HEADLESS)
+
+    sync_queue.close()
+    writer.commit()
+    print(f"\n>>> Global Scrape Complete. Total unique items: {len(synced_titles)}")
 
 
 if __name__ == "__main__":
-    run()
\ No newline at end of file
+    run()
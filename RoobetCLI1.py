@@ -1,9 +1,12 @@
 import os
 import time
-import requests
 from dotenv import load_dotenv
 from playwright.sync_api import sync_playwright
 from playwright_stealth import Stealth
+from browser_pool import launch_context, close_context
+from wire_format import post_slots
+from ndjson_store import NdjsonRunWriter
+from scroll_driver import ScrollDriver
 
 load_dotenv()
 
@@ -19,7 +22,7 @@ def sync_to_laravel(slots_data):
     if not slots_data: return False
     print(f"   [API] Syncing {len(slots_data)} slots...")
     try:
-        response = requests.post(API_ENDPOINT, json=slots_data, timeout=120)
+        response = post_slots(API_ENDPOINT, slots_data, timeout=120)
         if response.status_code == 200:
             res = response.json()
             details = res.get('details', {})
@@ -34,8 +37,8 @@ def sync_to_laravel(slots_data):
 
 def run():
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=IS_HEADLESS, args=["--disable-blink-features=AutomationControlled"])
-        context = browser.new_context(viewport={'width': 1920, 'height': 1080})
+        context = launch_context(p, CASINO_NAME, headless=IS_HEADLESS, args=["--disable-blink-features=AutomationControlled"],
+                                 viewport={'width': 1920, 'height': 1080})
         page = context.new_page()
         Stealth().apply_stealth_sync(page)
 
@@ -45,17 +48,18 @@ def run():
             page.wait_for_selector('a[href^="/casino/game/"]', timeout=45000)
         except Exception as e:
             print(f"!!! Initial Load Failed. Check connection.")
-            browser.close()
+            close_context(context)
             return
 
         synced_slugs = set()
+        writer = NdjsonRunWriter(CASINO_NAME)
+
+        scroller = ScrollDriver(page, 'a[href^="/casino/game/"]', step=1000)
 
         while True:
-            # 1. Aggressive Scroll to find the button
+            # 1. Scroll until lazy loading stops, which brings up the button
             print("   Scrolling to find 'Load More' button...")
-            for _ in range(8):  # 8 small scrolls to trigger lazy load
-                page.mouse.wheel(0, 1000)
-                time.sleep(0.5)
+            scroller.scroll_to_end()
 
             # 2. Extract items currently visible
             items = page.query_selector_all('a[href^="/casino/game/"]')
@@ -82,6 +86,7 @@ def run():
                     continue
 
             if new_batch:
+                writer.write_many(new_batch)
                 sync_to_laravel(new_batch)
 
             # 3. Handle Button with Retry
@@ -116,7 +121,8 @@ def run():
 
             if len(synced_slugs) > 10000: break
 
-        browser.close()
+        writer.commit()
+        close_context(context)
         print(f"\n>>> Scrape Complete. Total unique: {len(synced_slugs)}")
 
 
@@ -1,9 +1,12 @@
 import os
 import time
-import requests
 from dotenv import load_dotenv
 from playwright.sync_api import sync_playwright
 from playwright_stealth import Stealth
+from browser_pool import launch_context, close_context
+from wire_format import post_slots
+from ndjson_store import NdjsonRunWriter
+from host_pacing import pacer_for
 
 # Load configuration from .env
 load_dotenv()
@@ -26,7 +29,7 @@ def sync_to_laravel(slots_data):
 
     print(f"   [API] Syncing {len(slots_data)} slots to {API_ENDPOINT}...")
     try:
-        response = requests.post(API_ENDPOINT, json=slots_data, timeout=120)
+        response = post_slots(API_ENDPOINT, slots_data, timeout=120)
 
         if response.status_code == 200:
             res = response.json()
@@ -40,12 +43,14 @@ def sync_to_laravel(slots_data):
         print(f"   [CONNECTION ERROR] Error: {e}")
         return False
 
-def scrape_page(p, page_number):
+def scrape_page(p, page_number, writer):
     """
     Launches a fresh browser, context, and page for every page number.
     """
-    browser = p.chromium.launch(headless=IS_HEADLESS)
-    context = browser.new_context(
+    # One HAR recording per page; the profile stays shared
+    context = launch_context(
+        p, f"{CASINO_NAME}-page-{page_number}", profile=CASINO_NAME,
+        headless=IS_HEADLESS,
         user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
         viewport={'width': 1920, 'height': 1080}
     )
@@ -56,7 +61,14 @@ def scrape_page(p, page_number):
     print(f"\n--- Processing Page {page_number} ---")
 
     try:
-        page.goto(target_url, wait_until="networkidle", timeout=60000)
+        pacer = pacer_for(target_url)
+        pacer.wait()
+        try:
+            response = page.goto(target_url, wait_until="networkidle", timeout=60000)
+        except Exception:
+            pacer.report(error=True)
+            raise
+        pacer.report_response(response, page)
 
         # Wait for slot grid elements
         print("   Waiting for slot grid...")
@@ -99,6 +111,7 @@ def scrape_page(p, page_number):
                 continue
 
         if slots:
+            writer.write_many(slots)
             return sync_to_laravel(slots)
 
         print(f"   [!] Page {page_number} appeared empty.")
@@ -109,20 +122,20 @@ def scrape_page(p, page_number):
         return False
     finally:
         # Crucial: Close browser every time to free up RAM
-        browser.close()
+        close_context(context)
 
 def run():
     with sync_playwright() as p:
+        writer = NdjsonRunWriter(CASINO_NAME)
         for page_num in range(1, MAX_PAGES + 1):
-            success = scrape_page(p, page_num)
+            success = scrape_page(p, page_num, writer)
 
             if not success:
                 print(f"   Retrying Page {page_num} once in 10s...")
                 time.sleep(10)
-                scrape_page(p, page_num)
+                scrape_page(p, page_num, writer)
 
-            # Polite delay between full browser launches
-            time.sleep(5)
+        writer.commit()
 
 if __name__ == "__main__":
     run()
\ No newline at end of file
@@ -5,6 +5,14 @@ import requests
 from dotenv import load_dotenv
 from playwright.sync_api import sync_playwright
 from playwright_stealth import Stealth
+from browser_pool import HAR_MODE, launch_browser, open_context, close_browser
+from session_probe import SessionKeeper
+from host_pacing import pacer_for
+from detail_prefetch import Prefetcher, open_slot
+from detail_priority import DetailQueue
+from slot_feed import SlotFeed
+from slot_record import DetailRecord
+from detail_extract import extract_details
 
 load_dotenv()
 
@@ -15,6 +23,10 @@ API_GET_SLOTS = f"{API_BASE}/api/casinos/{CASINO_ID}/slots"
 API_UPDATE_SLOT = f"{API_BASE}/api/slots/update-details"
 IS_HEADLESS = os.getenv('HEADLESS', 'True').lower() == 'true'
 STATE_FILE = "state.json"
+# Login cookies whose expiry triggers a background re-login (comma separated); none known, probes catch it
+AUTH_COOKIES = [c for c in os.getenv('SPORTSBET_AUTH_COOKIES', '').split(',') if c]
+# Slot fields that count as missing when ordering the detail queue
+PRIORITY_FIELDS = ["theoretical_rtp", "volatility_level", "max_win_multiplier"]
 
 USER_LOGIN = os.getenv('CASINO_USER')
 USER_PASS = os.getenv('CASINO_PASS')
@@ -27,6 +39,14 @@ VOLATILITY_MAP = {
     "casino.volatility_5": 5
 }
 
+# "Game Stats" section; volatility is read from the translation key, e.g. "casino.volatility_3"
+DETAIL_FIELDS = {
+    "rtp": {"strategy": "label", "label": "casino.rtp", "numeric": True, "required": True},
+    "volatility": {"strategy": "attribute", "selector": 'span[data-translation*="casino.volatility_"]',
+                   "attribute": "data-translation"},
+    "max_win": {"strategy": "label", "label": "casino.max_win", "numeric": True},
+}
+
 
 def human_click(page, selector):
     """Calculates element position and moves mouse naturally to click it."""
@@ -47,10 +67,10 @@ def human_click(page, selector):
     return False
 
 
-def perform_login(p):
+def perform_login(p, state_path=STATE_FILE):
     print(f"[Login] Initializing fresh login...")
-    browser = p.chromium.launch(headless=IS_HEADLESS)
-    context = browser.new_context(viewport={'width': 1920, 'height': 1080})
+    browser = launch_browser(p, headless=IS_HEADLESS)
+    context = open_context(browser, "sportsbet-login", viewport={'width': 1920, 'height': 1080})
     page = context.new_page()
     Stealth().apply_stealth_sync(page)
 
@@ -68,27 +88,27 @@ def perform_login(p):
         page.wait_for_url(lambda url: "/auth/login" not in url, timeout=30000)
         time.sleep(10)  # Post-login rest
 
-        context.storage_state(path=STATE_FILE)
-        browser.close()
+        context.storage_state(path=state_path)
+        close_browser(browser)
         return True
     except Exception as e:
         print(f"[CRITICAL LOGIN ERROR] {e}")
-        browser.close()
+        close_browser(browser)
         return False
 
 
-def parse_slot_details(page, slot):
-    url = slot.get('url')
-    if not url: return None
-
+def read_slot_details(job):
+    """Parses a detail page started by open_slot(); it has been loading since job["started"]."""
+    page, slot = job["page"], job["slot"]
     print(f"\n[Scraper] Navigating to: {slot.get('title')}")
     try:
-        # Instead of goto, we can try clicking a link if we were on a list,
-        # but for now, we use goto with a slow 'commit'
-        page.goto(url, wait_until="commit", timeout=60000)
+        pacer = pacer_for(slot['url'])
+        if job["response"] is None:
+            return None
+        page.bring_to_front()
 
-        # Long wait to let the 'Human Verify' pass or fail
-        time.sleep(random.randint(15, 20))
+        # Long wait to let the 'Human Verify' pass or fail, counted from when the page started loading
+        time.sleep(max(0, random.randint(15, 20) - (time.monotonic() - job["started"])))
 
         if "Verify you are human" in page.content():
             print("    [!] Blocked by Cloudflare. Attempting mouse 'wiggle'...")
@@ -96,24 +116,22 @@ def parse_slot_details(page, slot):
             page.mouse.move(random.randint(100, 500), random.randint(100, 500), steps=20)
             time.sleep(5)
             if "Verify you are human" in page.content():
+                pacer.report(challenge=True)
                 return None
+        pacer.report_response(job["response"])
 
         # Human-like scroll
         for _ in range(3):
             page.mouse.wheel(0, random.randint(200, 400))
             time.sleep(1)
 
-        extracted = {"theoretical_rtp": None, "volatility_level": None, "max_win_multiplier": None}
-
-        # Targeted extraction
-        rtp_el = page.locator('div:has(> p > span[data-translation="casino.rtp"]) >> p.text-bulma').first
-        if rtp_el.is_visible():
-            extracted["theoretical_rtp"] = rtp_el.inner_text().replace('%', '').strip()
-
-        vol_el = page.locator('span[data-translation*="casino.volatility_"]').first
-        if vol_el.is_visible():
-            key = vol_el.get_attribute('data-translation')
-            extracted["volatility_level"] = VOLATILITY_MAP.get(key)
+        raw = extract_details(page, DETAIL_FIELDS, timeout=10000)
+        extracted = DetailRecord(
+            slot["id"],
+            theoretical_rtp=raw.get("rtp"),
+            volatility_level=VOLATILITY_MAP.get(raw.get("volatility")),
+            max_win_multiplier=raw.get("max_win"),
+        )
 
         print(f"    [Data] {extracted}")
         return extracted
@@ -122,39 +140,59 @@ def parse_slot_details(page, slot):
         return None
 
 
+def parse_slot_details(page, slot):
+    if not slot.get('url'): return None
+    return read_slot_details(open_slot(page, slot))
+
+
 def run():
     print(f"[Start] Casino ID: {CASINO_ID}")
-    try:
-        res = requests.post(API_GET_SLOTS, timeout=20)
-        slots = res.json() if res.status_code == 200 else []
-    except:
-        return
+    queue = DetailQueue("sportsbet-details", PRIORITY_FIELDS)
+    # The slot list streams in on a background thread while the browser starts, logs in and warms up;
+    # each iteration takes the most important slot that has arrived so far
+    feed = SlotFeed(API_GET_SLOTS, queue)
 
     with sync_playwright() as p:
         if not os.path.exists(STATE_FILE):
             if not perform_login(p): return
 
-        browser = p.chromium.launch(headless=IS_HEADLESS)
-        context = browser.new_context(storage_state=STATE_FILE)
+        browser = launch_browser(p, headless=IS_HEADLESS)
+        context = open_context(browser, "sportsbet-details", storage_state=STATE_FILE)
         page = context.new_page()
         Stealth().apply_stealth_sync(page)
 
+        keeper = SessionKeeper(STATE_FILE, perform_login, probe_url="https://sportsbet.io/",
+                               cookie_domain="sportsbet.io", context_name="sportsbet-details",
+                               auth_cookies=AUTH_COOKIES, logged_out_selector='a[href*="/auth/login"]')
+        # A stale state file would make every detail page load logged out
+        if not keeper.probe(context):
+            print("[Session] Saved session is no longer valid.")
+            context, page = keeper.recover(browser, context, page)
+
         # WARM UP
         print("[Session] Warming up on dashboard...")
         page.goto("https://sportsbet.io/", wait_until="domcontentloaded")
         time.sleep(15)
 
-        for slot in slots:
-            data = parse_slot_details(page, slot)
-            if data and any(data.values()):
-                requests.post(API_UPDATE_SLOT, json={"slot_id": slot['id'], **data})
-
-            # Massive cooldown
-            sleep_gap = random.randint(30, 60)
-            print(f"[Cooldown] Resting for {sleep_gap}s...")
-            time.sleep(sleep_gap)
-
-        browser.close()
+        # Slot N+1 loads in a second tab while slot N is parsed and posted
+        prefetch = Prefetcher(context)
+        for job in prefetch.pipeline(feed):
+            slot = job["slot"]
+            data = read_slot_details(job)
+            if not (data and data.has_data()) and not keeper.probe(context):
+                # Logged out mid run: log in again and retry this slot instead of losing it
+                context, page = keeper.recover(browser, context, page)
+                prefetch.bind(context)
+                data = parse_slot_details(page, slot)
+            queue.record(slot['id'], bool(data and data.theoretical_rtp))
+            if data and data.has_data() and HAR_MODE == "replay":
+                print(f"    [HAR] Replay, not updating {slot['title']}: {data.to_payload()}")
+            elif data and data.has_data():
+                requests.post(API_UPDATE_SLOT, json=data.to_payload())
+            context, page = keeper.maintain(browser, context, page)
+            prefetch.bind(context)
+
+        close_browser(browser)
 
 
 if __name__ == "__main__":
@@ -1,9 +1,12 @@
 import os
 import time
-import requests
 from dotenv import load_dotenv
 from playwright.sync_api import sync_playwright
 from playwright_stealth import Stealth
+from browser_pool import launch_context, close_context
+from wire_format import post_slots
+from ndjson_store import NdjsonRunWriter
+from host_pacing import pacer_for, host_of
 
 load_dotenv()
 
@@ -19,7 +22,7 @@ def sync_to_laravel(slots_data):
     if not slots_data: return False
     print(f"   [API] Syncing {len(slots_data)} new slots...")
     try:
-        response = requests.post(API_ENDPOINT, json=slots_data, timeout=120)
+        response = post_slots(API_ENDPOINT, slots_data, timeout=120)
         return response.status_code == 200
     except Exception as e:
         print(f"   [API ERROR] {e}")
@@ -29,16 +32,15 @@ def sync_to_laravel(slots_data):
 def run():
     with sync_playwright() as p:
         # Stake is VERY sensitive. We use extra arguments to hide the automation.
-        browser = p.chromium.launch(
+        # Randomize User Agent to look less like a server
+        context = launch_context(
+            p, CASINO_NAME,
             headless=IS_HEADLESS,
             args=[
                 "--disable-blink-features=AutomationControlled",
                 "--no-sandbox",
                 "--disable-setuid-sandbox"
-            ]
-        )
-        # Randomize User Agent to look less like a server
-        context = browser.new_context(
+            ],
             user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
             viewport={'width': 1920, 'height': 1080}
         )
@@ -46,10 +48,18 @@ def run():
         Stealth().apply_stealth_sync(page)
 
         print(f">>> Opening {TARGET_URL}")
+        # Shares stake.com's schedule with StakeCLI2's detail pages
+        pacer = pacer_for(TARGET_URL)
 
         try:
             # Use 'domcontentloaded' - Stake is too heavy for 'networkidle'
-            page.goto(TARGET_URL, wait_until="domcontentloaded", timeout=60000)
+            pacer.wait()
+            try:
+                response = page.goto(TARGET_URL, wait_until="domcontentloaded", timeout=60000)
+            except Exception:
+                pacer.report(error=True)
+                raise
+            pacer.report_response(response, page)
 
             # Look for the grid. If it fails, take a screenshot of the blocker.
             print("   Waiting for initial grid load...")
@@ -59,10 +69,11 @@ def run():
             print(f"!!! Selector Timeout. Saving debug screenshot to 'stake_error.png'")
             page.screenshot(path="stake_error.png")
             print("!!! Check stake_error.png to see if Cloudflare is blocking you.")
-            browser.close()
+            close_context(context)
             return
 
         synced_ids = set()
+        writer = NdjsonRunWriter(CASINO_NAME)
 
         while True:
             # Scroll a bit to trigger rendering
@@ -101,6 +112,7 @@ def run():
                     continue
 
             if new_batch:
+                writer.write_many(new_batch)
                 sync_to_laravel(new_batch)
 
             # Stake "Load More" button is usually in a div with .contents
@@ -108,7 +120,15 @@ def run():
 
             if load_more.is_visible():
                 print(f"--- Clicking 'Load More' (Total: {len(synced_ids)}) ---")
-                load_more.click()
+                # Each click is one more stake.com API request, so it goes through the pacer too
+                pacer.wait()
+                try:
+                    with page.expect_response(lambda r: host_of(r.url) == pacer.host and
+                                              r.request.resource_type in ("xhr", "fetch"), timeout=30000) as info:
+                        load_more.click()
+                    pacer.report_response(info.value)
+                except Exception:
+                    pacer.report(error=True)
                 time.sleep(3)
             else:
                 # Try one deep scroll to see if it appears
@@ -117,7 +137,8 @@ def run():
                 if not load_more.is_visible():
                     break
 
-        browser.close()
+        writer.commit()
+        close_context(context)
         print(f">>> Done. Total: {len(synced_ids)}")
 
 
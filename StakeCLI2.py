@@ -5,6 +5,14 @@ import requests
 from dotenv import load_dotenv
 from playwright.sync_api import sync_playwright
 from playwright_stealth import Stealth
+from browser_pool import HAR_MODE, launch_browser, open_context, close_browser
+from session_probe import SessionKeeper
+from host_pacing import pacer_for
+from detail_prefetch import Prefetcher, open_slot
+from detail_priority import DetailQueue
+from slot_feed import SlotFeed
+from slot_record import DetailRecord
+from detail_extract import extract_details
 
 load_dotenv()
 
@@ -15,6 +23,10 @@ API_GET_SLOTS = f"{API_BASE}/api/casinos/{CASINO_ID}/slots"
 API_UPDATE_SLOT = f"{API_BASE}/api/slots/update-details"
 IS_HEADLESS = os.getenv('HEADLESS', 'True').lower() == 'true'
 STATE_FILE = "stake_state.json"
+# Login cookies whose expiry triggers a background re-login (comma separated)
+AUTH_COOKIES = [c for c in os.getenv('STAKE_AUTH_COOKIES', 'session').split(',') if c]
+# Slot fields that count as missing when ordering the detail queue
+PRIORITY_FIELDS = ["theoretical_rtp", "volatility_level", "max_win_multiplier"]
 
 USER_LOGIN = os.getenv('CASINO_USER')
 USER_PASS = os.getenv('CASINO_PASS')
@@ -23,15 +35,23 @@ VOLATILITY_MAP = {
     "low": 1, "medium": 2, "high": 3, "very high": 4, "extreme": 5
 }
 
+# Rows of the "Game info" table, matched on the lowercased first cell
+DETAIL_FIELDS = {
+    "rtp": {"strategy": "table", "label": "rtp", "exact": True, "numeric": True, "required": True},
+    "volatility": {"strategy": "table", "label": "volatility", "numeric": False},
+    "max_win": {"strategy": "table", "label": "max win", "numeric": True},
+}
+
 
-def perform_login(p):
+def perform_login(p, state_path=STATE_FILE):
     if not USER_LOGIN or not USER_PASS:
         print("[ERROR] CASINO_USER or CASINO_PASS missing in .env")
         return False
 
     print(f"[Login] Opening Stake for {USER_LOGIN}...")
-    browser = p.chromium.launch(headless=IS_HEADLESS)
-    context = browser.new_context(
+    browser = launch_browser(p, headless=IS_HEADLESS)
+    context = open_context(
+        browser, "stake-login",
         viewport={'width': 1280, 'height': 800},
         user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
     )
@@ -72,52 +92,58 @@ def perform_login(p):
             # Critical: Wait for Svelte to finish writing session data to storage
             time.sleep(10)
 
-            context.storage_state(path=STATE_FILE)
+            context.storage_state(path=state_path)
             page.screenshot(path="stake_03_logged_in.png")
-            browser.close()
+            close_browser(browser)
             return True
         except Exception:
             print("    [Error] Timed out waiting for dashboard.")
             page.screenshot(path="stake_error_login_stuck.png")
-            browser.close()
+            close_browser(browser)
             return False
 
     except Exception as e:
         print(f"[CRITICAL LOGIN ERROR] {e}")
         page.screenshot(path="stake_critical_crash.png")
-        browser.close()
+        close_browser(browser)
         return False
 
 
-def parse_slot_details(page, slot):
-    url = slot.get('url')
-    if not url: return None
+def session_alive(context):
+    """SessionKeeper probe: Stake's GraphQL API returns the user only for a live session token."""
+    token = next((c["value"] for c in context.cookies("https://stake.com") if c["name"] == "session"), "")
+    if not token:
+        return False
+    response = context.request.post("https://stake.com/_api/graphql", data={"query": "query { user { id } }"},
+                                    headers={"x-access-token": token}, timeout=15000)
+    return response.ok and bool(((response.json() or {}).get("data") or {}).get("user"))
 
+
+def read_slot_details(job):
+    """Parses a detail page started by open_slot(); it may still be loading."""
+    page, slot = job["page"], job["slot"]
     print(f"\n[Scraper] Visiting: {slot.get('title')}")
     try:
-        page.goto(url, wait_until="domcontentloaded", timeout=60000)
-        time.sleep(10)  # Heavy Svelte components need time
+        if job["response"] is None:
+            return None
+        page.wait_for_load_state("domcontentloaded", timeout=60000)
+        pacer_for(slot['url']).report_response(job["response"], page)
 
-        # Open "Game info" table
+        # Open "Game info" table as soon as the heavy Svelte components render it
         info_btn = page.get_by_role("button", name="Game info", exact=False)
-        if info_btn.is_visible():
+        try:
+            info_btn.wait_for(state="visible", timeout=10000)
             info_btn.click()
-            time.sleep(2)
-
-        extracted = {"theoretical_rtp": None, "volatility_level": None, "max_win_multiplier": None}
-        rows = page.query_selector_all('tbody tr')
-
-        for row in rows:
-            cells = row.query_selector_all('td')
-            if len(cells) >= 2:
-                label = cells[0].inner_text().strip().lower()
-                val = cells[1].inner_text().strip()
-                if "rtp" == label:
-                    extracted["theoretical_rtp"] = val.replace('%', '').strip()
-                elif "volatility" in label:
-                    extracted["volatility_level"] = VOLATILITY_MAP.get(val.lower())
-                elif "max win" in label:
-                    extracted["max_win_multiplier"] = val.lower().replace('x', '').replace(',', '').strip()
+        except Exception:
+            pass
+
+        raw = extract_details(page, DETAIL_FIELDS, timeout=12000)
+        extracted = DetailRecord(
+            slot["id"],
+            theoretical_rtp=raw.get("rtp"),
+            volatility_level=VOLATILITY_MAP.get((raw.get("volatility") or "").lower()),
+            max_win_multiplier=raw.get("max_win"),
+        )
 
         print(f"    [Data] {extracted}")
         return extracted
@@ -126,33 +152,58 @@ def parse_slot_details(page, slot):
         return None
 
 
+def parse_slot_details(page, slot):
+    if not slot.get('url'): return None
+    return read_slot_details(open_slot(page, slot))
+
+
 def run():
     print(f"[Start] Stake Scanner (Casino ID: {CASINO_ID})")
-    try:
-        res = requests.post(API_GET_SLOTS, timeout=20)
-        slots = res.json() if res.status_code == 200 else []
-    except:
-        return
+    queue = DetailQueue("stake-details", PRIORITY_FIELDS)
+    # The slot list streams in on a background thread while the browser starts, logs in and warms up;
+    # each iteration takes the most important slot that has arrived so far
+    feed = SlotFeed(API_GET_SLOTS, queue)
 
     with sync_playwright() as p:
         if not os.path.exists(STATE_FILE):
             if not perform_login(p): return
 
-        browser = p.chromium.launch(headless=IS_HEADLESS)
-        context = browser.new_context(storage_state=STATE_FILE)
+        browser = launch_browser(p, headless=IS_HEADLESS)
+        context = open_context(browser, "stake-details", storage_state=STATE_FILE)
         page = context.new_page()
         Stealth().apply_stealth_sync(page)
 
-        for slot in slots:
-            data = parse_slot_details(page, slot)
-            if data and any(data.values()):
+        keeper = SessionKeeper(STATE_FILE, perform_login, probe_url="https://stake.com/",
+                               cookie_domain="stake.com", context_name="stake-details",
+                               auth_cookies=AUTH_COOKIES, logged_in_selector='[data-testid="wallet-selector"]',
+                               probe_request=session_alive)
+        # A stale state file would make every detail page load logged out
+        if not keeper.probe(context):
+            print("[Session] Saved session is no longer valid.")
+            context, page = keeper.recover(browser, context, page)
+
+        # Slot N+1 loads in a second tab while slot N is parsed and posted
+        prefetch = Prefetcher(context)
+        for job in prefetch.pipeline(feed):
+            slot = job["slot"]
+            data = read_slot_details(job)
+            if not (data and data.has_data()) and not keeper.probe(context):
+                # Logged out mid run: log in again and retry this slot instead of losing it
+                context, page = keeper.recover(browser, context, page)
+                prefetch.bind(context)
+                data = parse_slot_details(page, slot)
+            queue.record(slot['id'], bool(data and data.theoretical_rtp))
+            if data and data.has_data() and HAR_MODE == "replay":
+                print(f"    [HAR] Replay, not updating {slot['title']}: {data.to_payload()}")
+            elif data and data.has_data():
                 try:
-                    requests.post(API_UPDATE_SLOT, json={"slot_id": slot['id'], **data}, timeout=10)
+                    requests.post(API_UPDATE_SLOT, json=data.to_payload(), timeout=10)
                     print(f"    [DB] {slot['title']} updated.")
                 except:
                     pass
-            time.sleep(random.randint(5, 12))
-        browser.close()
+            context, page = keeper.maintain(browser, context, page)
+            prefetch.bind(context)
+        close_browser(browser)
 
 
 if __name__ == "__main__":
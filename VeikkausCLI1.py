@@ -1,9 +1,11 @@
 import os
 import time
-import requests
 from dotenv import load_dotenv
 from playwright.sync_api import sync_playwright
 from playwright_stealth import Stealth
+from browser_pool import launch_context, close_context
+from wire_format import post_slots
+from ndjson_store import NdjsonRunWriter
 
 load_dotenv()
 
@@ -18,7 +20,7 @@ def sync_to_laravel(slots_data):
     if not slots_data: return False
     print(f"   [API] Syncing {len(slots_data)} new slots...")
     try:
-        response = requests.post(API_ENDPOINT, json=slots_data, timeout=120)
+        response = post_slots(API_ENDPOINT, slots_data, timeout=120)
         if response.status_code == 200:
             details = response.json().get('details', {})
             print(
@@ -31,8 +33,7 @@ def sync_to_laravel(slots_data):
 
 def run():
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=IS_HEADLESS)
-        context = browser.new_context(viewport={'width': 1920, 'height': 1080})
+        context = launch_context(p, CASINO_NAME, headless=IS_HEADLESS, viewport={'width': 1920, 'height': 1080})
         page = context.new_page()
         Stealth().apply_stealth_sync(page)
 
@@ -40,6 +41,7 @@ def run():
         page.goto(TARGET_URL, wait_until="networkidle", timeout=90000)
 
         synced_titles = set()
+        writer = NdjsonRunWriter(CASINO_NAME)
 
         while True:
             # 1. Wait for game cards using data-testid
@@ -76,6 +78,7 @@ def run():
 
             # 3. Sync to Laravel
             if new_batch:
+                writer.write_many(new_batch)
                 sync_to_laravel(new_batch)
 
             # 4. Handle "Show more" button
@@ -96,7 +99,8 @@ def run():
             # Safety break for very large lists
             if len(synced_titles) > 5000: break
 
-        browser.close()
+        writer.commit()
+        close_context(context)
         print(f"\n>>> Scrape Complete for Veikkaus. Total synced: {len(synced_titles)}")
 
 
@@ -0,0 +1,194 @@
+import os
+import io
+import sys
+import json
+import time
+import asyncio
+import hashlib
+import aiohttp
+from urllib.parse import urlsplit
+from dotenv import load_dotenv
+from PIL import Image, ImageOps
+from ndjson_store import iter_records
+
+load_dotenv()
+
+# --- CONFIGURATION ---
+CACHE_DIR = os.getenv('AVATAR_CACHE_DIR', 'avatar_cache')
+MAX_CONCURRENCY = int(os.getenv('AVATAR_CONCURRENCY', 16))
+THUMB_SIZE = (int(os.getenv('AVATAR_WIDTH', 220)), int(os.getenv('AVATAR_HEIGHT', 280)))
+THUMB_FORMAT = os.getenv('AVATAR_FORMAT', 'WEBP')
+THUMB_QUALITY = int(os.getenv('AVATAR_QUALITY', 80))
+# Don't even send a conditional request if we checked the URL this recently
+REVALIDATE_AFTER = int(os.getenv('AVATAR_REVALIDATE_HOURS', 24)) * 3600
+INDEX_FILE = os.path.join(CACHE_DIR, "index.json")
+OBJECTS_DIR = os.path.join(CACHE_DIR, "objects")
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
+
+
+def load_index():
+    """
+    Index layout: urls -> {etag, last_modified, source, checked_at}, sources -> thumb hash,
+    etags -> source keyed by etag_key() (host + ETag, since weak ETags from different CDNs can collide).
+    """
+    if os.path.exists(INDEX_FILE):
+        with open(INDEX_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    return {"urls": {}, "sources": {}, "etags": {}}
+
+
+def save_index(index):
+    # Write-then-rename so a crash never leaves a half written index behind
+    tmp_path = f"{INDEX_FILE}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    os.replace(tmp_path, INDEX_FILE)
+
+
+def etag_key(url, etag):
+    return f"{urlsplit(url).hostname} {etag}"
+
+
+def object_path(digest):
+    ext = THUMB_FORMAT.lower()
+    return os.path.join(OBJECTS_DIR, digest[:2], f"{digest}.{ext}")
+
+
+def thumb_for_url(index, url):
+    """Returns the local thumbnail path for a remote avatar URL, or None if it isn't cached."""
+    entry = index["urls"].get(url)
+    if not entry:
+        return None
+    thumb = index["sources"].get(entry["source"])
+    return object_path(thumb) if thumb else None
+
+
+def make_thumbnail(raw_bytes):
+    """Crops/resizes to THUMB_SIZE and re-encodes. Runs in a worker thread."""
+    with Image.open(io.BytesIO(raw_bytes)) as img:
+        img = ImageOps.exif_transpose(img)
+        img = img.convert("RGBA" if img.mode in ("RGBA", "LA", "P") else "RGB")
+        img = ImageOps.fit(img, THUMB_SIZE, method=Image.LANCZOS)
+        out = io.BytesIO()
+        img.save(out, format=THUMB_FORMAT, quality=THUMB_QUALITY)
+        return out.getvalue()
+
+
+def store_object(data):
+    digest = hashlib.sha256(data).hexdigest()
+    path = object_path(digest)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    return digest
+
+
+async def fetch_avatar(session, semaphore, index, url, stats):
+    entry = index["urls"].get(url)
+    now = time.time()
+
+    # 1. Fresh enough by URL -> no network at all
+    if entry and now - entry.get("checked_at", 0) < REVALIDATE_AFTER:
+        stats["cached"] += 1
+        return
+
+    # 2. Conditional request so unchanged images come back as 304 with no body
+    headers = {}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    async with semaphore:
+        try:
+            async with session.get(url, headers=headers) as response:
+                if response.status == 304 and entry:
+                    entry["checked_at"] = now
+                    stats["not_modified"] += 1
+                    return
+                if response.status != 200:
+                    print(f"   [Avatar] HTTP {response.status}: {url[:80]}")
+                    stats["failed"] += 1
+                    return
+
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
+
+                # 3. Same CDN object already seen under another URL on this host -> reuse it without reading the body
+                if etag and etag_key(url, etag) in index["etags"]:
+                    index["urls"][url] = {"etag": etag, "last_modified": last_modified,
+                                          "source": index["etags"][etag_key(url, etag)], "checked_at": now}
+                    stats["deduped"] += 1
+                    return
+
+                raw = await response.read()
+        except Exception as e:
+            print(f"   [Avatar ERROR] {url[:80]}: {e}")
+            stats["failed"] += 1
+            return
+
+    # 4. Dedup by content hash of the original bytes, only re-encode unseen artwork
+    source = hashlib.sha256(raw).hexdigest()
+    if source not in index["sources"]:
+        try:
+            thumb = await asyncio.get_running_loop().run_in_executor(None, make_thumbnail, raw)
+        except Exception as e:
+            print(f"   [Avatar ERROR] Could not decode {url[:80]}: {e}")
+            stats["failed"] += 1
+            return
+        index["sources"][source] = store_object(thumb)
+        stats["downloaded"] += 1
+    else:
+        stats["deduped"] += 1
+
+    if etag:
+        index["etags"][etag_key(url, etag)] = source
+    index["urls"][url] = {"etag": etag, "last_modified": last_modified, "source": source, "checked_at": now}
+
+
+async def sync_avatars(urls):
+    os.makedirs(OBJECTS_DIR, exist_ok=True)
+    index = load_index()
+    stats = {"cached": 0, "not_modified": 0, "deduped": 0, "downloaded": 0, "failed": 0}
+
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+    connector = aiohttp.TCPConnector(limit=MAX_CONCURRENCY, ttl_dns_cache=300)
+    timeout = aiohttp.ClientTimeout(total=60)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                     headers={"User-Agent": USER_AGENT}) as session:
+        await asyncio.gather(*(fetch_avatar(session, semaphore, index, url, stats) for url in urls))
+
+    save_index(index)
+    return stats
+
+
+def load_avatar_urls(path):
+    urls = {}  # dict keeps first-seen order while dropping repeats
+    for record in iter_records(path):
+        # Cards without artwork come through with avatar missing, "" or None
+        avatar = record.get("avatar") or ""
+        if avatar.startswith("http"):
+            urls[avatar] = None
+    return list(urls)
+
+
+def run():
+    source_file = sys.argv[1] if len(sys.argv) > 1 else "slots_data.json"
+    urls = load_avatar_urls(source_file)
+    print(f">>> Syncing {len(urls)} avatars from {source_file} into {CACHE_DIR}")
+
+    started = time.time()
+    stats = asyncio.run(sync_avatars(urls))
+    elapsed = time.time() - started
+
+    print(f">>> Done in {elapsed:.1f}s. Downloaded: {stats['downloaded']}, Deduped: {stats['deduped']}, "
+          f"Not modified: {stats['not_modified']}, Cached: {stats['cached']}, Failed: {stats['failed']}")
+
+
+if __name__ == "__main__":
+    run()
@@ -1,11 +1,13 @@
 # how to run? xvfb-run python3 bcGameCLI1.py
 import os
 import time
-import requests
 import re
 from dotenv import load_dotenv
 from playwright.sync_api import sync_playwright
 from playwright_stealth import Stealth
+from browser_pool import launch_context, close_context
+from wire_format import post_slots
+from ndjson_store import NdjsonRunWriter
 
 load_dotenv()
 
@@ -22,7 +24,7 @@ def sync_to_laravel(slots_data):
         return False
     print(f"   [API] Syncing {len(slots_data)} slots...")
     try:
-        response = requests.post(API_ENDPOINT, json=slots_data, timeout=120)
+        response = post_slots(API_ENDPOINT, slots_data, timeout=120)
         if response.status_code == 200:
             details = response.json().get('details', {})
             print(f"   [SUCCESS] New: {details.get('new_slots_added')}, Skipped: {details.get('existing_slots_skipped')}")
@@ -64,14 +66,14 @@ def extract_slots(page, casino_name):
 
 def run():
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=IS_HEADLESS)
-        context = browser.new_context(viewport={'width': 1920, 'height': 1080})
+        context = launch_context(p, CASINO_NAME, headless=IS_HEADLESS, viewport={'width': 1920, 'height': 1080})
         page = context.new_page()
         Stealth().apply_stealth_sync(page)
 
         print(f">>> Opening {TARGET_URL} for {CASINO_NAME}")
         page.goto(TARGET_URL, wait_until="domcontentloaded", timeout=60000)
 
+        writer = NdjsonRunWriter(CASINO_NAME)
         current_page = 1
         max_pages = 1
 
@@ -96,6 +98,7 @@ def run():
             # 3. Scrape and Sync
             slots = extract_slots(page, CASINO_NAME)
             if slots:
+                writer.write_many(slots)
                 sync_to_laravel(slots)
 
             # 4. Pagination Logic
@@ -132,7 +135,8 @@ def run():
                 print("   Reached the last page.")
                 break
 
-        browser.close()
+        writer.commit()
+        close_context(context)
         print(f"\n>>> Scrape Complete for {CASINO_NAME}.")
 
 
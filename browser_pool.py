@@ -0,0 +1,254 @@
+import os
+import json
+import fcntl
+import sys
+import signal
+import shutil
+import tempfile
+import threading
+import subprocess
+from ndjson_store import casino_slug
+
+# --- CONFIGURATION ---
+# ws:// endpoint(s) of warm Chromium servers, comma separated; "auto" reads ENDPOINTS_FILE
+# written by browser_server.py; empty = every script launches its own browser
+BROWSER_WS_ENV = 'PW_BROWSER_WS'
+ENDPOINTS_FILE = os.getenv('BROWSER_SERVER_FILE', 'browser_server.json')
+# Caps per browser so total memory is controlled from the server side
+RENDERER_LIMIT = int(os.getenv('BROWSER_RENDERER_LIMIT', 8))
+JS_HEAP_MB = int(os.getenv('BROWSER_JS_HEAP_MB', 512))
+SERVER_ARGS = [
+    "--disable-blink-features=AutomationControlled",
+    "--no-sandbox",
+    "--disable-setuid-sandbox",
+    "--disable-dev-shm-usage",
+    f"--renderer-process-limit={RENDERER_LIMIT}",
+    f"--js-flags=--max-old-space-size={JS_HEAP_MB}",
+]
+# HAR_MODE=record saves every context's traffic to HAR_DIR/<name>.har; HAR_MODE=replay serves
+# it back with no network, so waits and extraction can be re-tuned against the same data
+HAR_MODE = os.getenv('HAR_MODE', '').lower()
+HAR_DIR = os.getenv('HAR_DIR', 'har')
+# PW_PERSISTENT_PROFILES=true gives launch_context() one Chromium profile per casino, so the HTTP and
+# code cache and consent/locale cookies survive between runs. Profiles need a local browser, so this
+# takes precedence over PW_BROWSER_WS for the scripts that use launch_context().
+PERSISTENT_PROFILES = os.getenv('PW_PERSISTENT_PROFILES', 'False').lower() == 'true'
+PROFILE_ROOT = os.getenv('PW_PROFILE_ROOT', 'pw_profiles')
+PROFILE_CACHE_MB = int(os.getenv('PW_PROFILE_CACHE_MB', 300))
+PROFILE_CACHE_DIRS = ("Cache", "Code Cache", "GPUCache")
+CHROMIUM_SINGLETONS = ("SingletonLock", "SingletonSocket", "SingletonCookie")
+
+_profile_locks = {}
+_har_uses = {}
+
+
+def browser_endpoints():
+    value = os.getenv(BROWSER_WS_ENV, '').strip()
+    if value == "auto":
+        try:
+            with open(ENDPOINTS_FILE, encoding="utf-8") as f:
+                return json.load(f)["endpoints"]
+        except (OSError, ValueError, KeyError):
+            return []
+    return [e.strip() for e in value.split(",") if e.strip()]
+
+
+def launch_browser(p, headless=True, args=None):
+    """
+    Drop-in for p.chromium.launch(). When PW_BROWSER_WS is set the script attaches to that warm
+    browser instead of starting its own; every new_context() on it is still fully isolated, and
+    browser.close() only drops our connection and contexts.
+    """
+    endpoints = browser_endpoints()
+    # Spread processes over the servers, starting from a different one per process
+    offset = os.getpid() % len(endpoints) if endpoints else 0
+    for ws_endpoint in endpoints[offset:] + endpoints[:offset]:
+        try:
+            return p.chromium.connect(ws_endpoint, timeout=10000)
+        except Exception as e:
+            print(f"[Browser] Could not attach to {ws_endpoint} ({str(e)[:60]})")
+    if endpoints:
+        print("[Browser] No browser server reachable, launching locally.")
+    return p.chromium.launch(headless=headless, args=args)
+
+
+def start_browser_server(headless=True, port=0, ws_path=None, args=None):
+    """
+    Starts `playwright launch-server` for Chromium and returns (process, ws_endpoint).
+    The Python API has no launch_server(), so this goes through the public CLI of the installed
+    package (`python -m playwright`, which runs the bundled driver). The CLI wrapper, the driver and
+    Chromium share a new session, so stop_browser_server() takes all of them down together.
+    A fixed port and ws_path give a stable endpoint that can live in .env.
+    """
+    config = {"headless": headless, "args": args or SERVER_ARGS}
+    if port:
+        config["port"] = port
+    if ws_path:
+        config["wsPath"] = ws_path
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump(config, f)
+        config_path = f.name
+
+    process = subprocess.Popen(
+        [sys.executable, "-m", "playwright", "launch-server", "--browser", "chromium", "--config", config_path],
+        stdout=subprocess.PIPE, text=True, start_new_session=True)
+    try:
+        # The driver prints the ws endpoint as its first line once Chromium is up
+        ws_endpoint = process.stdout.readline().strip()
+    finally:
+        os.remove(config_path)
+    if not ws_endpoint.startswith("ws"):
+        stop_browser_server(process)
+        raise RuntimeError(f"Browser server did not start: {ws_endpoint!r}")
+    # Keep reading, or the driver blocks once the pipe buffer fills with later output
+    threading.Thread(target=_drain, args=(process.stdout,), daemon=True).start()
+    return process, ws_endpoint
+
+
+def _drain(stream):
+    try:
+        for _ in stream:
+            pass
+    except (OSError, ValueError):
+        pass
+
+
+def stop_browser_server(process, timeout=10):
+    """Stops a start_browser_server() process together with the Chromium it launched (same process group)."""
+    for sig in (signal.SIGTERM, signal.SIGKILL):
+        try:
+            os.killpg(process.pid, sig)
+        except ProcessLookupError:
+            break
+        try:
+            process.wait(timeout)
+            break
+        except subprocess.TimeoutExpired:
+            continue
+    process.wait()
+
+
+def har_path(name):
+    return os.path.join(HAR_DIR, f"{casino_slug(name)}.har")
+
+
+def recording_name(name):
+    """
+    Every context gets its own recording: a recording is rewritten when its context closes, so a
+    name reused within one run (a context per page, a re-login swap) becomes name-2, name-3, ...
+    A replay run opens its contexts in the same order and so finds the same files.
+    """
+    _har_uses[name] = _har_uses.get(name, 0) + 1
+    return name if _har_uses[name] == 1 else f"{name}-{_har_uses[name]}"
+
+
+def apply_har(context, name):
+    """Records to / replays from har_path() of this context's recording_name(name) per HAR_MODE."""
+    if not HAR_MODE:
+        return
+    name = recording_name(name)
+    if HAR_MODE == "record":
+        os.makedirs(HAR_DIR, exist_ok=True)
+        context.route_from_har(har_path(name), update=True, update_content="embed", update_mode="minimal")
+    elif HAR_MODE == "replay":
+        if os.path.exists(har_path(name)):
+            # Anything not in the recording is aborted rather than fetched live
+            context.route_from_har(har_path(name), not_found="abort")
+        else:
+            print(f"[HAR] No recording at {har_path(name)}, every request will be aborted.")
+            context.route("**/*", lambda route: route.abort())
+
+
+def open_context(browser, name, **options):
+    """
+    Drop-in for browser.new_context() that records to / replays from har_path(name) per HAR_MODE.
+    Recordings are only written when the context closes, so finish with close_browser().
+    """
+    context = browser.new_context(**options)
+    apply_har(context, name)
+    return context
+
+
+def _dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for file_name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, file_name))
+            except OSError:
+                pass
+    return total
+
+
+def acquire_profile(name):
+    """
+    Locks PROFILE_ROOT/<casino> for this run and returns (path, lock), or (None, None) when another
+    run holds it. With the lock held, Chromium singleton files can only be leftovers of a crashed
+    run and are removed; caches over PROFILE_CACHE_MB are dropped before the browser starts.
+    """
+    path = os.path.join(PROFILE_ROOT, casino_slug(name))
+    os.makedirs(path, exist_ok=True)
+    lock = open(f"{path}.lock", "w")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock.close()
+        return None, None
+
+    for singleton in CHROMIUM_SINGLETONS:
+        leftover = os.path.join(path, singleton)
+        if os.path.lexists(leftover):
+            os.remove(leftover)
+
+    caches = [os.path.join(path, "Default", d) for d in PROFILE_CACHE_DIRS]
+    size = sum(_dir_size(c) for c in caches)
+    if size > PROFILE_CACHE_MB * 1024 * 1024:
+        print(f"[Profile] {casino_slug(name)} cache at {size // 2**20} MB, clearing.")
+        for cache in caches:
+            shutil.rmtree(cache, ignore_errors=True)
+    return path, lock
+
+
+def launch_context(p, name, headless=True, args=None, profile=None, **options):
+    """
+    launch_browser() + open_context() in one call. With PW_PERSISTENT_PROFILES the context runs on
+    the casino's own profile (`profile`, default `name`) instead; if another run is using it, a fresh
+    context is used. Finish with close_context().
+    """
+    if PERSISTENT_PROFILES:
+        path, lock = acquire_profile(profile or name)
+        if path:
+            try:
+                context = p.chromium.launch_persistent_context(
+                    path, headless=headless,
+                    args=(args or []) + [f"--disk-cache-size={PROFILE_CACHE_MB * 1024 * 1024}"], **options)
+            except Exception:
+                lock.close()
+                raise
+            _profile_locks[context] = lock
+            apply_har(context, name)
+            return context
+        print(f"[Profile] {casino_slug(profile or name)} is in use by another run, using a fresh context.")
+    return open_context(launch_browser(p, headless=headless, args=args), name, **options)
+
+
+def close_context(context):
+    """Closes a launch_context() context with its browser, and releases its profile."""
+    browser = context.browser
+    if browser:
+        close_browser(browser)
+    else:
+        context.close()
+    lock = _profile_locks.pop(context, None)
+    if lock:
+        lock.close()
+
+
+def close_browser(browser):
+    """Closes contexts first (which flushes HAR recordings), then the browser or our connection."""
+    for context in list(browser.contexts):
+        try:
+            context.close()
+        except Exception as e:
+            print(f"[Browser] Context close failed: {str(e)[:60]}")
+    browser.close()
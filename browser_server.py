@@ -0,0 +1,55 @@
+import os
+import json
+import time
+from dotenv import load_dotenv
+from browser_pool import ENDPOINTS_FILE, start_browser_server, stop_browser_server
+
+load_dotenv()
+
+# --- CONFIGURATION ---
+IS_HEADLESS = os.getenv('HEADLESS', 'True').lower() == 'true'
+SERVER_COUNT = int(os.getenv('BROWSER_SERVER_COUNT', 1))
+BASE_PORT = int(os.getenv('BROWSER_SERVER_PORT', 39400))
+WS_PATH = os.getenv('BROWSER_SERVER_PATH', 'slots')
+
+
+def write_endpoints(servers):
+    tmp_path = f"{ENDPOINTS_FILE}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"endpoints": [ws for _, ws in servers], "pid": os.getpid()}, f, indent=2)
+    os.replace(tmp_path, ENDPOINTS_FILE)
+
+
+def start(index):
+    return start_browser_server(headless=IS_HEADLESS, port=BASE_PORT + index, ws_path=f"{WS_PATH}-{index}")
+
+
+def run():
+    servers = [start(i) for i in range(SERVER_COUNT)]
+    write_endpoints(servers)
+
+    print(f">>> {len(servers)} Chromium server(s) running. Attach the scrapers with:")
+    print(f"    PW_BROWSER_WS={','.join(ws for _, ws in servers)}")
+    print(f"    (or PW_BROWSER_WS=auto to read {ENDPOINTS_FILE})")
+
+    try:
+        while True:
+            time.sleep(5)
+            for i, (process, _) in enumerate(servers):
+                if process.poll() is not None:
+                    print(f"[Server] Chromium server {i} exited ({process.returncode}), restarting.")
+                    # Whatever of its Chromium is still running would otherwise be orphaned
+                    stop_browser_server(process)
+                    servers[i] = start(i)
+                    write_endpoints(servers)
+    except KeyboardInterrupt:
+        print(">>> Shutting down browser servers...")
+    finally:
+        for process, _ in servers:
+            stop_browser_server(process)
+        if os.path.exists(ENDPOINTS_FILE):
+            os.remove(ENDPOINTS_FILE)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,232 @@
+import os
+import sys
+import time
+import re
+import tempfile
+import unicodedata
+import mysql.connector
+from dotenv import load_dotenv
+from ndjson_store import iter_records
+from slot_updater import DB_CONFIG
+
+load_dotenv()
+
+# --- CONFIGURATION ---
+CHUNK_SIZE = int(os.getenv('BULK_CHUNK_SIZE', 2000))
+# insert = multi-row INSERT ... ON DUPLICATE KEY UPDATE, load_data = LOAD DATA LOCAL INFILE into a staging table
+BULK_MODE = os.getenv('BULK_MODE', 'insert').lower()
+SLOTS_TABLE = os.getenv('BULK_SLOTS_TABLE', 'slots')
+PROVIDERS_TABLE = os.getenv('BULK_PROVIDERS_TABLE', 'providers')
+CASINOS_TABLE = os.getenv('BULK_CASINOS_TABLE', 'casinos')
+LINKS_TABLE = os.getenv('BULK_LINKS_TABLE', 'casino_slots')
+
+# slots, providers and casinos are upserted on their slug unique keys (slots_slug_unique,
+# providers_slug_unique, casinos_slug_unique). casino_slots only has non-unique indexes; the link
+# upsert needs (casino_id, slot_id) as a unique key, which `--migrate` adds once after dropping
+# duplicate links. A plain load never changes the schema.
+LINKS_UNIQUE_KEY = "casino_slots_casino_id_slot_id_unique"
+LINKS_MIGRATIONS = [
+    f"""DELETE cs FROM `{LINKS_TABLE}` cs
+        JOIN `{LINKS_TABLE}` keep ON keep.casino_id = cs.casino_id AND keep.slot_id = cs.slot_id AND keep.id < cs.id""",
+    f"ALTER TABLE `{LINKS_TABLE}` ADD UNIQUE KEY `{LINKS_UNIQUE_KEY}` (`casino_id`, `slot_id`)",
+]
+
+
+def laravel_slug(text):
+    """Str::slug(): 'Big_Bass @ Sea' -> 'big-bass-at-sea', so our rows match the app's."""
+    text = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode("ascii")
+    text = re.sub(r'_+', '-', text).replace("@", "-at-")
+    text = re.sub(r'[^-a-z0-9\s]+', '', text.lower())
+    return re.sub(r'[-\s]+', '-', text).strip('-')
+
+
+def clean_record(record):
+    title = (record.get("title") or "").strip()
+    slug = laravel_slug(title)
+    if not slug:
+        return None
+    provider = (record.get("provider") or "Unknown").strip()
+    casino_name = (record.get("casino_name") or "").strip() or None
+    return {
+        "title": title,
+        "slug": slug,
+        "provider": provider,
+        "provider_slug": laravel_slug(provider) or "unknown",
+        "url": record.get("url") or None,
+        "casino_name": casino_name,
+        "casino_slug": laravel_slug(casino_name) if casino_name else None,
+    }
+
+
+def iter_chunks(paths):
+    chunk = {}
+    for path in paths:
+        for record in iter_records(path):
+            record = clean_record(record)
+            if not record:
+                continue
+            # Later rows for the same slot/casino win, so a chunk never upserts one key twice
+            chunk[(record["slug"], record["casino_slug"])] = record
+            if len(chunk) >= CHUNK_SIZE:
+                yield list(chunk.values())
+                chunk = {}
+    if chunk:
+        yield list(chunk.values())
+
+
+def has_links_key(cursor):
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.statistics "
+        "WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s", (LINKS_TABLE, LINKS_UNIQUE_KEY))
+    return bool(cursor.fetchone()[0])
+
+
+def migrate(cursor):
+    """Deletes duplicate links and adds the unique key; only run on an explicit --migrate."""
+    if has_links_key(cursor):
+        print(f"[Migrate] {LINKS_TABLE} already has {LINKS_UNIQUE_KEY}")
+        return
+    print(f"[Migrate] Adding {LINKS_UNIQUE_KEY} to {LINKS_TABLE}")
+    for statement in LINKS_MIGRATIONS:
+        cursor.execute(statement)
+
+
+def ids_by_slug(cursor, table, rows, cache):
+    """Inserts the (name, slug) rows that aren't there yet and returns the slug -> id cache."""
+    missing = {slug: name for name, slug in rows if slug not in cache}
+    if missing:
+        values = [v for slug, name in missing.items() for v in (name, slug)]
+        cursor.execute(
+            f"INSERT INTO `{table}` (`name`, `slug`, `created_at`, `updated_at`) VALUES "
+            + ", ".join(["(%s, %s, NOW(), NOW())"] * len(missing))
+            + " ON DUPLICATE KEY UPDATE `id` = `id`", values)
+        cursor.execute(
+            f"SELECT `id`, `slug` FROM `{table}` WHERE `slug` IN ({', '.join(['%s'] * len(missing))})",
+            list(missing))
+        cache.update({slug: row_id for row_id, slug in cursor.fetchall()})
+    return cache
+
+
+def slot_rows(records, providers):
+    slots = {r["slug"]: r for r in records}.values()
+    return [(providers[r["provider_slug"]], r["title"], r["slug"], r["url"]) for r in slots]
+
+
+def upsert_slots_insert(cursor, records, providers):
+    rows = slot_rows(records, providers)
+    # theoretical_rtp is NOT NULL without a default; 0 marks the slot as still needing details
+    cursor.execute(
+        f"INSERT INTO `{SLOTS_TABLE}` (`provider_id`, `title`, `slug`, `url`, `theoretical_rtp`, "
+        "`created_at`, `updated_at`) VALUES "
+        + ", ".join(["(%s, %s, %s, %s, 0, NOW(), NOW())"] * len(rows))
+        + f""" ON DUPLICATE KEY UPDATE
+            `url` = COALESCE(`{SLOTS_TABLE}`.`url`, VALUES(`url`)),
+            `updated_at` = NOW()""", [v for row in rows for v in row])
+
+
+def tsv_field(value):
+    if value is None:
+        return "\\N"
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+
+
+def upsert_slots_load_data(cursor, records, providers):
+    """Same effect as upsert_slots_insert, but streams the chunk through LOAD DATA LOCAL INFILE."""
+    cursor.execute("""
+        CREATE TEMPORARY TABLE IF NOT EXISTS `slots_staging` (
+            `provider_id` BIGINT UNSIGNED, `title` VARCHAR(255), `slug` VARCHAR(255), `url` VARCHAR(255)
+        )""")
+    cursor.execute("TRUNCATE TABLE `slots_staging`")
+    with tempfile.NamedTemporaryFile("w", suffix=".tsv", delete=False, encoding="utf-8", newline="") as f:
+        for row in slot_rows(records, providers):
+            f.write("\t".join(tsv_field(v) for v in row) + "\n")
+        tsv_path = f.name
+    try:
+        # Default FIELDS/LINES options: tab separated, backslash escaped, \N for NULL
+        cursor.execute(f"LOAD DATA LOCAL INFILE '{tsv_path}' INTO TABLE `slots_staging` "
+                       "(`provider_id`, `title`, `slug`, `url`)")
+    finally:
+        os.remove(tsv_path)
+    cursor.execute(f"""
+        INSERT INTO `{SLOTS_TABLE}` (`provider_id`, `title`, `slug`, `url`, `theoretical_rtp`, `created_at`, `updated_at`)
+        SELECT `provider_id`, `title`, `slug`, `url`, 0, NOW(), NOW() FROM `slots_staging`
+        ON DUPLICATE KEY UPDATE
+            `url` = COALESCE(`{SLOTS_TABLE}`.`url`, VALUES(`url`)),
+            `updated_at` = NOW()""")
+
+
+def link_slots(cursor, records, casinos):
+    linked = [r for r in records if r["casino_slug"]]
+    if not linked:
+        return
+    slugs = list({r["slug"] for r in linked})
+    cursor.execute(
+        f"SELECT `id`, `slug` FROM `{SLOTS_TABLE}` WHERE `slug` IN ({', '.join(['%s'] * len(slugs))})", slugs)
+    slot_ids = {slug: slot_id for slot_id, slug in cursor.fetchall()}
+
+    links = {(casinos[r["casino_slug"]], slot_ids[r["slug"]]) for r in linked if r["slug"] in slot_ids}
+    if not links:
+        return
+    cursor.execute(
+        f"INSERT INTO `{LINKS_TABLE}` (`casino_id`, `slot_id`, `is_available`, `created_at`, `updated_at`) VALUES "
+        + ", ".join(["(%s, %s, 1, NOW(), NOW())"] * len(links))
+        + " ON DUPLICATE KEY UPDATE `is_available` = 1, `updated_at` = NOW()", [v for link in links for v in link])
+
+
+def load(paths, run_migrations=False):
+    conn = mysql.connector.connect(**DB_CONFIG, allow_local_infile=BULK_MODE == "load_data")
+    cursor = conn.cursor()
+    upsert_slots = upsert_slots_load_data if BULK_MODE == "load_data" else upsert_slots_insert
+    provider_cache, casino_cache = {}, {}
+    total = 0
+    started = time.perf_counter()
+
+    try:
+        if run_migrations:
+            migrate(cursor)
+        elif not has_links_key(cursor):
+            raise RuntimeError(
+                f"{LINKS_TABLE} has no unique key {LINKS_UNIQUE_KEY}, so links would be duplicated. "
+                f"Run `python bulk_loader.py --migrate` once (it deletes duplicate links first).")
+        for records in iter_chunks(paths):
+            chunk_started = time.perf_counter()
+            # One transaction per chunk: a failure loses at most one chunk, and re-running redoes it
+            conn.start_transaction()
+            try:
+                ids_by_slug(cursor, PROVIDERS_TABLE, {(r["provider"], r["provider_slug"]) for r in records},
+                            provider_cache)
+                casinos = {(r["casino_name"], r["casino_slug"]) for r in records if r["casino_slug"]}
+                if casinos:
+                    ids_by_slug(cursor, CASINOS_TABLE, casinos, casino_cache)
+                upsert_slots(cursor, records, provider_cache)
+                link_slots(cursor, records, casino_cache)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+            total += len(records)
+            chunk_rate = len(records) / (time.perf_counter() - chunk_started)
+            print(f"   [Bulk] +{len(records)} rows (total {total}, {chunk_rate:,.0f} rows/s)")
+    finally:
+        cursor.close()
+        conn.close()
+
+    elapsed = time.perf_counter() - started
+    print(f">>> Loaded {total} rows in {elapsed:.1f}s ({total / elapsed if elapsed else 0:,.0f} rows/s, mode={BULK_MODE})")
+
+
+def run():
+    args = sys.argv[1:]
+    run_migrations = "--migrate" in args
+    paths = [a for a in args if a != "--migrate"] or ["slots_data.json"]
+    try:
+        load(paths, run_migrations)
+    except mysql.connector.Error as e:
+        print(f"[DB ERROR] {e}")
+    except RuntimeError as e:
+        print(f"[Migrate] {e}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,341 @@
+import os
+import sys
+import time
+import random
+import shutil
+import asyncio
+import tempfile
+import threading
+import subprocess
+from html import escape
+from aiohttp import web
+from dotenv import load_dotenv
+from ndjson_store import iter_records
+
+load_dotenv()
+
+# --- CONFIGURATION ---
+HOST = os.getenv('SIM_HOST', '127.0.0.1')
+PORT = int(os.getenv('SIM_PORT', 39500))
+CATALOG_SOURCE = os.getenv('SIM_CATALOG', 'slots_data.json')
+CATALOG_SIZE = int(os.getenv('SIM_SIZE', 10000))
+PAGE_SIZE = int(os.getenv('SIM_PAGE_SIZE', 48))
+SLIDERS = int(os.getenv('SIM_SLIDERS', 8))
+SLIDE_SIZE = int(os.getenv('SIM_SLIDE_SIZE', 6))
+SEED = int(os.getenv('SIM_SEED', 1))
+# Added to every HTML page / every XHR, +/- JITTER of itself
+RENDER_LATENCY_MS = float(os.getenv('SIM_RENDER_LATENCY_MS', 300))
+XHR_LATENCY_MS = float(os.getenv('SIM_XHR_LATENCY_MS', 150))
+JITTER = float(os.getenv('SIM_JITTER', 0.3))
+# Fraction of requests answered with 503 / with 429 + Retry-After
+FAILURE_RATE = float(os.getenv('SIM_FAILURE_RATE', 0.0))
+THROTTLE_RATE = float(os.getenv('SIM_THROTTLE_RATE', 0.0))
+RETRY_AFTER = 2
+
+VOLATILITIES = ["Low", "Medium", "High", "Very High"]
+
+# Card markup carries the PlayOJO classes, the CasinoGrounds data-testids and the MrGreen cy-
+# classes, so those scrapers can read the simulator unchanged.
+CARD_HTML = (
+    '<div class="thumb" data-testid="game-card-{id}">'
+    '<a href="/game/{id}"><img class="thumb_img cy-game-image" data-testid="game-card-{id}-image" src="{avatar}" loading="lazy"></a>'
+    '<h3 class="cy-game-title" data-testid="game-card-{id}-title">{title}</h3>'
+    '<div class="thumb_hover"><img alt="{provider}" src="/img/provider.svg">'
+    '<span data-testid="game-card-{id}-provider">{provider}</span></div></div>'
+)
+# Same markup, built client-side for XHR-driven styles
+CARD_JS = """
+const card = (g) => `<div class="thumb" data-testid="game-card-${g.id}">`
+    + `<a href="/game/${g.id}"><img class="thumb_img cy-game-image" data-testid="game-card-${g.id}-image" src="${g.avatar}" loading="lazy"></a>`
+    + `<h3 class="cy-game-title" data-testid="game-card-${g.id}-title">${g.title}</h3>`
+    + `<div class="thumb_hover"><img alt="${g.provider}" src="/img/provider.svg">`
+    + `<span data-testid="game-card-${g.id}-provider">${g.provider}</span></div></div>`;
+async function games(offset, limit) {
+    for (let attempt = 0; attempt < 5; attempt++) {
+        const r = await fetch(`/api/games?offset=${offset}&limit=${limit}`);
+        if (r.ok) return r.json();
+        await new Promise(res => setTimeout(res, 500 * (attempt + 1)));
+    }
+    return {games: [], total: 0};
+}
+"""
+
+LOAD_MORE_JS = """
+let offset = %(offset)d;
+document.querySelector('button.btn-green')?.addEventListener('click', async (e) => {
+    const data = await games(offset, %(page_size)d);
+    offset += data.games.length;
+    document.querySelector('#grid').insertAdjacentHTML('beforeend', data.games.map(card).join(''));
+    if (offset >= data.total) e.target.remove();
+});
+"""
+
+INFINITE_JS = """
+let offset = 0, loading = false, done = false;
+async function more() {
+    if (loading || done) return;
+    loading = true;
+    const data = await games(offset, %(page_size)d);
+    offset += data.games.length;
+    done = offset >= data.total;
+    document.querySelector('#grid').insertAdjacentHTML('beforeend', data.games.map(card).join(''));
+    loading = false;
+}
+window.addEventListener('scroll', () => {
+    if (window.innerHeight + window.scrollY >= document.body.scrollHeight - 800) more();
+});
+more();
+"""
+
+SWIPER_JS = """
+document.querySelectorAll('.slider').forEach((slider) => {
+    const start = +slider.dataset.start, end = +slider.dataset.end;
+    let offset = start + %(slide_size)d;
+    slider.querySelector('button.cy-swiper-button-next').addEventListener('click', async (e) => {
+        const data = await games(offset, Math.min(%(slide_size)d, end - offset));
+        offset += data.games.length;
+        slider.querySelector('.track').insertAdjacentHTML('beforeend', data.games.map((g) =>
+            card(g).replace('class="thumb"', 'class="thumb cy-single-game-regular-template"')).join(''));
+        if (offset >= end) e.target.disabled = true;
+    });
+});
+"""
+
+STYLES = {
+    "load-more": "LOAD MORE button appending XHR pages",
+    "infinite": "infinite scroll",
+    "pages": "numbered pages, fully server-rendered",
+    "swiper": "sliders with a next button",
+}
+# Scrapers bench() runs as they are, each pointed at one style through its base-URL override.
+# (label, script, base URL variable, style, extra environment)
+BENCH_SCRAPERS = [
+    ("PlayOJO http", "PlayOjoCLI1.py", "PLAYOJO_BASE_URL", "load-more", {"LISTING_MODE": "http"}),
+    ("CasinoGrounds http", "CasinoGroundsCLI1.py", "CASINOGROUNDS_BASE_URL", "load-more", {"LISTING_MODE": "http"}),
+]
+BROWSER_BENCH_SCRAPERS = [
+    ("PlayOJO browser", "PlayOjoCLI1.py", "PLAYOJO_BASE_URL", "load-more", {"LISTING_MODE": "browser"}),
+    ("CasinoGrounds browser", "CasinoGroundsCLI1.py", "CASINOGROUNDS_BASE_URL", "load-more", {"LISTING_MODE": "browser"}),
+    ("MrGreen", "MrGreenCLI1.py", "MRGREEN_BASE_URL", "swiper", {}),
+]
+
+
+def build_catalog(path=CATALOG_SOURCE, size=CATALOG_SIZE, seed=SEED):
+    """Scales a real dump to `size` games; copies get a numbered title so every title is unique."""
+    rng = random.Random(seed)
+    base = list(iter_records(path))
+    catalog = []
+    for i in range(size):
+        source = base[i % len(base)]
+        copy = i // len(base)
+        catalog.append({
+            "id": i,
+            "title": source["title"] if copy == 0 else f"{source['title']} {copy + 1}",
+            "provider": source.get("provider") or "Unknown",
+            "avatar": f"/img/{i}.svg",
+            "rtp": round(rng.uniform(94.0, 97.5), 2),
+            "volatility": rng.choice(VOLATILITIES),
+            "max_win": rng.choice([500, 1000, 2500, 5000, 10000, 21100, 50000]),
+            "reels": rng.choice([3, 5, 5, 5, 6, 7]),
+            "rows": rng.choice([3, 3, 4, 5, 6]),
+        })
+    return catalog
+
+
+class Simulator:
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.rng = random.Random(SEED)
+        self.stats = {"requests": 0, "failed": 0, "throttled": 0, "syncs": 0}
+
+    def cards(self, start, end):
+        return "".join(CARD_HTML.format(id=g["id"], title=escape(g["title"]), provider=escape(g["provider"]),
+                                        avatar=g["avatar"]) for g in self.catalog[start:end])
+
+    def page(self, title, body, script=""):
+        return web.Response(content_type="text/html", text=(
+            f"<!doctype html><html><head><title>{escape(title)}</title>"
+            "<style>#grid,.track{display:flex;flex-wrap:wrap}.thumb{width:180px;height:260px;margin:4px}"
+            ".track{flex-wrap:nowrap;overflow:hidden}</style></head>"
+            f"<body>{body}<script>{CARD_JS}{script}</script></body></html>"))
+
+    @web.middleware
+    async def faults(self, request, handler):
+        """Latency, jitter, 503s and 429s for everything except images."""
+        if request.path.startswith("/img/"):
+            return await handler(request)
+        self.stats["requests"] += 1
+        base = XHR_LATENCY_MS if request.path.startswith("/api/") else RENDER_LATENCY_MS
+        await asyncio.sleep(max(0.0, base * (1 + self.rng.uniform(-JITTER, JITTER))) / 1000)
+        roll = self.rng.random()
+        if roll < FAILURE_RATE:
+            self.stats["failed"] += 1
+            raise web.HTTPServiceUnavailable()
+        if roll < FAILURE_RATE + THROTTLE_RATE:
+            self.stats["throttled"] += 1
+            raise web.HTTPTooManyRequests(headers={"Retry-After": str(RETRY_AFTER)})
+        return await handler(request)
+
+    async def index(self, request):
+        links = "".join(f'<li><a href="/{name}/">{name}</a>: {text}</li>' for name, text in STYLES.items())
+        return self.page("Casino simulator", f"<h1>{len(self.catalog)} games</h1><ul>{links}</ul>")
+
+    async def load_more(self, request):
+        # ?page=N renders the first N pages at once, like a server-side LOAD MORE fallback
+        shown = min(len(self.catalog), PAGE_SIZE * max(1, int(request.query.get("page", 1))))
+        button = '<button class="btn-green">LOAD MORE</button>' if shown < len(self.catalog) else ""
+        return self.page("Load more", f'<div id="grid">{self.cards(0, shown)}</div>{button}',
+                         LOAD_MORE_JS % {"offset": shown, "page_size": PAGE_SIZE})
+
+    async def infinite(self, request):
+        return self.page("Infinite scroll", '<div id="grid"></div>', INFINITE_JS % {"page_size": PAGE_SIZE})
+
+    async def pages(self, request):
+        page = max(1, int(request.query.get("page", 1)))
+        start = (page - 1) * PAGE_SIZE
+        last = (len(self.catalog) - 1) // PAGE_SIZE + 1
+        nav = "".join(f'<a class="page-link" href="/pages/?page={n}">{n}</a>'
+                      for n in range(max(1, page - 3), min(last, page + 3) + 1))
+        if page < last:
+            nav += f'<a class="page-link next" rel="next" href="/pages/?page={page + 1}">Next</a>'
+        return self.page(f"Page {page}", f'<div id="grid">{self.cards(start, start + PAGE_SIZE)}</div>'
+                                         f'<nav class="pagination">{nav}</nav>')
+
+    async def swiper(self, request):
+        per_slider = -(-len(self.catalog) // SLIDERS)
+        sliders = []
+        for i in range(SLIDERS):
+            start, end = i * per_slider, min(len(self.catalog), (i + 1) * per_slider)
+            first = self.cards(start, min(end, start + SLIDE_SIZE)).replace(
+                'class="thumb"', 'class="thumb cy-single-game-regular-template"')
+            sliders.append(f'<section class="slider" data-start="{start}" data-end="{end}"><h2>Row {i + 1}</h2>'
+                           f'<div class="track">{first}</div>'
+                           f'<button class="cy-swiper-button-next">&rsaquo;</button></section>')
+        return self.page("Swiper", "".join(sliders), SWIPER_JS % {"slide_size": SLIDE_SIZE})
+
+    async def api_games(self, request):
+        offset = max(0, int(request.query.get("offset", 0)))
+        limit = min(200, max(1, int(request.query.get("limit", PAGE_SIZE))))
+        games = [{k: g[k] for k in ("id", "title", "provider", "avatar")} for g in self.catalog[offset:offset + limit]]
+        return web.json_response({"games": games, "total": len(self.catalog)})
+
+    async def game(self, request):
+        """Detail page with both the sportsbet.io label markup and the stake.com table."""
+        g = self.catalog[int(request.match_info["id"]) % len(self.catalog)]
+        stats = [("rtp", "RTP", f"{g['rtp']}%"), ("volatility", "Volatility", g["volatility"]),
+                 ("max_win", "Max Win", f"{g['max_win']:,}x"), ("reels", "Reels", g["reels"]),
+                 ("rows", "Rows", g["rows"])]
+        labels = "".join(f"<div><span data-translation='casino.{key}'>{label}</span><p>{value}</p></div>"
+                         for key, label, value in stats)
+        rows = "".join(f"<tr><td>{label}</td><td>{value}</td></tr>" for _, label, value in stats)
+        return self.page(g["title"], f"<h1>{escape(g['title'])}</h1>"
+                                     f"<span data-translation='casino.game_stats'>Game Stats</span>{labels}"
+                                     f"<button>Game info</button><table><tbody>{rows}</tbody></table>")
+
+    async def styled(self, request):
+        handler = {"load-more": self.load_more, "infinite": self.infinite, "pages": self.pages,
+                   "swiper": self.swiper}.get(request.match_info["style"])
+        if handler is None:
+            raise web.HTTPNotFound()
+        return await handler(request)
+
+    async def sync(self, request):
+        """Stands in for the Laravel sync endpoint so benched scrapers never reach the live API."""
+        await request.read()
+        self.stats["syncs"] += 1
+        return web.json_response({"details": {}})
+
+    async def image(self, request):
+        return web.Response(content_type="image/svg+xml", headers={"Cache-Control": "max-age=86400"},
+                            text='<svg xmlns="http://www.w3.org/2000/svg" width="180" height="220"/>')
+
+    def app(self):
+        app = web.Application(middlewares=[self.faults])
+        app.add_routes([
+            web.get("/", self.index),
+            web.get("/load-more/", self.load_more),
+            web.get("/infinite/", self.infinite),
+            web.get("/pages/", self.pages),
+            web.get("/swiper/", self.swiper),
+            web.get("/api/games", self.api_games),
+            web.get("/game/{id}", self.game),
+            web.get("/img/{name}", self.image),
+            web.post("/api/slots/sync", self.sync),
+            # <style>/<anything>: a scraper's own paths under its base-URL override
+            web.get("/{style}/{tail:.+}", self.styled),
+        ])
+        return app
+
+
+def start_in_thread(catalog=None, host=HOST, port=PORT):
+    """Serves the simulator from a daemon thread (for benchmarks); returns (simulator, base_url)."""
+    simulator = Simulator(catalog or build_catalog())
+    ready = threading.Event()
+
+    def serve():
+        loop = asyncio.new_event_loop()
+        runner = web.AppRunner(simulator.app(), access_log=None)
+        loop.run_until_complete(runner.setup())
+        loop.run_until_complete(web.TCPSite(runner, host, port).start())
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=serve, daemon=True).start()
+    ready.wait(30)
+    return simulator, f"http://{host}:{port}"
+
+
+def run_scraper(script, env, base_url):
+    """
+    Runs one scraper script as it is, against the simulator: its base URL and API_ENDPOINT point
+    here and its run files and state go to a scratch directory. Returns (unique titles, seconds).
+    """
+    scratch = tempfile.mkdtemp(prefix="casino-simulator-")
+    env = {**os.environ, **env,
+           "API_ENDPOINT": f"{base_url}/api/slots/sync", "WIRE_FORMAT": "json", "HEADLESS": "True",
+           "NDJSON_OUTPUT_DIR": os.path.join(scratch, "runs"), "FRONTIER_DIR": os.path.join(scratch, "frontier"),
+           "PACING_DIR": os.path.join(scratch, "pacing"), "SELECTOR_HEALTH_DIR": os.path.join(scratch, "health"),
+           "HAR_MODE": "", "PW_PERSISTENT_PROFILES": "False"}
+    started = time.perf_counter()
+    try:
+        subprocess.run([sys.executable, script], env=env, cwd=os.path.dirname(os.path.abspath(__file__)),
+                       stdout=subprocess.DEVNULL, check=False)
+        elapsed = time.perf_counter() - started
+        runs = os.path.join(scratch, "runs")
+        titles = {r["title"] for r in iter_records(runs)} if os.path.isdir(runs) else set()
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    return len(titles), elapsed
+
+
+def bench(browser=False):
+    """End-to-end throughput of the real scrapers against a local simulator; --browser adds the Playwright ones."""
+    simulator, base_url = start_in_thread()
+    print(f">>> Simulator with {len(simulator.catalog)} games at {base_url} "
+          f"(render {RENDER_LATENCY_MS:.0f}ms, xhr {XHR_LATENCY_MS:.0f}ms, jitter {JITTER:.0%}, "
+          f"503 {FAILURE_RATE:.1%}, 429 {THROTTLE_RATE:.1%})")
+
+    results = []
+    for label, script, base_var, style, env in BENCH_SCRAPERS + (BROWSER_BENCH_SCRAPERS if browser else []):
+        print(f"   running {label} ...")
+        found, elapsed = run_scraper(script, {**env, base_var: f"{base_url}/{style}"}, base_url)
+        results.append((label, found, elapsed))
+
+    for label, found, elapsed in results:
+        print(f"   {label:<22} {found:>7} games  {elapsed:8.1f}s  {found / max(elapsed, 1e-9):8.1f} games/s")
+    print(f"   server: {simulator.stats}")
+
+
+def run():
+    simulator = Simulator(build_catalog())
+    print(f">>> Casino simulator: {len(simulator.catalog)} games on http://{HOST}:{PORT}/")
+    for name, text in STYLES.items():
+        print(f"   http://{HOST}:{PORT}/{name}/  ({text})")
+    web.run_app(simulator.app(), host=HOST, port=PORT, print=None, access_log=None)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        bench(browser="--browser" in sys.argv)
+    else:
+        run()
@@ -0,0 +1,165 @@
+import os
+import socket
+import mysql.connector
+from detail_priority import WEIGHTS, STALE_HOURS
+
+# --- CONFIGURATION ---
+CLAIM_BATCH = int(os.getenv('CLAIM_BATCH', 10))
+LEASE_SECONDS = int(os.getenv('CLAIM_LEASE_SECONDS', 1800))  # must cover a whole batch
+# A failed slot is retried after BASE * 2^(failures-1) minutes, up to MAX
+RETRY_BASE_MINUTES = int(os.getenv('CLAIM_RETRY_BASE_MINUTES', 60))
+RETRY_MAX_MINUTES = int(os.getenv('CLAIM_RETRY_MAX_MINUTES', 60 * 24 * 14))
+
+# Applied by `python detail_claims.py`; the index keeps the claim query a range scan on big tables.
+# casino_slots needs none: its slot_id foreign key index already serves the casino_count subquery.
+MIGRATIONS = [
+    """ALTER TABLE `slots`
+        ADD COLUMN `detail_lease_owner` VARCHAR(64) NULL,
+        ADD COLUMN `detail_lease_until` DATETIME NULL,
+        ADD COLUMN `detail_next_attempt_at` DATETIME NULL,
+        ADD COLUMN `detail_attempts` INT NOT NULL DEFAULT 0,
+        ADD COLUMN `detail_failures` INT NOT NULL DEFAULT 0,
+        ADD COLUMN `detail_last_error` VARCHAR(255) NULL,
+        ADD COLUMN `detail_checked_at` DATETIME NULL""",
+    "CREATE INDEX `slots_detail_claim_idx` ON `slots` (`theoretical_rtp`, `detail_next_attempt_at`, `detail_lease_until`)",
+]
+
+# Same signals and weights as DetailQueue.score(), computed over every due row: the fraction of
+# fields still empty, popularity (log of the casinos listing it, against the number of casinos)
+# and how long since the last check
+_CLAIM_SQL = """
+    SELECT s.id, s.url
+    FROM slots s
+    LEFT JOIN (SELECT slot_id, COUNT(*) AS casino_count FROM casino_slots GROUP BY slot_id) c ON c.slot_id = s.id
+    WHERE s.theoretical_rtp = 0 AND s.url IS NOT NULL
+      AND (s.detail_next_attempt_at IS NULL OR s.detail_next_attempt_at <= NOW())
+      AND (s.detail_lease_until IS NULL OR s.detail_lease_until < NOW())
+    ORDER BY
+        %(missing)s * ({missing}) / {field_count}
+        + %(popularity)s * LN(1 + COALESCE(c.casino_count, 0)) / LN(2 + (SELECT COUNT(*) FROM casinos))
+        + %(staleness)s * COALESCE(LEAST(1, TIMESTAMPDIFF(SECOND, s.detail_checked_at, NOW()) / %(stale_seconds)s), 1)
+        DESC, s.id
+    LIMIT %(limit)s
+    FOR UPDATE OF s SKIP LOCKED
+"""
+CLAIM_COLUMNS = ("detail_lease_owner", "detail_lease_until", "detail_next_attempt_at", "detail_attempts",
+                 "detail_failures", "detail_last_error", "detail_checked_at")
+
+
+class ClaimQueue:
+    """
+    Lets any number of slot_updater workers, on any hosts, drain the backlog without overlap.
+
+    claim() locks the highest priority due rows with FOR UPDATE SKIP LOCKED (rows other workers
+    are claiming are skipped, not waited on) and stamps a lease on them before committing, so no
+    transaction stays open while scraping. A crashed worker's rows come back once the lease
+    expires. complete() / fail() release a row with its outcome; failures are retried with
+    exponential backoff, kept in the database (the DetailQueue attempts file is not used here).
+    """
+
+    def __init__(self, db_config, priority_fields):
+        self.db_config = db_config
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"[:64]
+        missing = " + ".join(f"(s.`{f}` IS NULL OR s.`{f}` = 0)" for f in priority_fields)
+        self.claim_sql = _CLAIM_SQL.format(missing=missing, field_count=max(1, len(priority_fields)))
+        self.conn = mysql.connector.connect(**db_config)
+        self._check_schema()
+
+    def _check_schema(self):
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(
+                "SELECT COLUMN_NAME FROM information_schema.columns WHERE table_schema = DATABASE() "
+                "AND table_name = 'slots' AND COLUMN_NAME LIKE 'detail\\_%'")
+            missing = set(CLAIM_COLUMNS) - {name for (name,) in cursor.fetchall()}
+        finally:
+            cursor.close()
+        if missing:
+            self.conn.close()
+            raise RuntimeError(f"slots is missing the claim columns ({', '.join(sorted(missing))}); "
+                               "run `python detail_claims.py` once to add them")
+
+    def _cursor(self):
+        self.conn.ping(reconnect=True, attempts=3, delay=2)
+        return self.conn.cursor(dictionary=True)
+
+    def claim(self, batch=CLAIM_BATCH):
+        cursor = self._cursor()
+        try:
+            self.conn.start_transaction()
+            cursor.execute(self.claim_sql, {
+                "missing": WEIGHTS.get("missing", 0), "popularity": WEIGHTS.get("popularity", 0),
+                "staleness": WEIGHTS.get("staleness", 0), "stale_seconds": STALE_HOURS * 3600, "limit": batch})
+            rows = cursor.fetchall()
+            if rows:
+                ids = [row["id"] for row in rows]
+                cursor.execute(
+                    "UPDATE slots SET detail_lease_owner = %s, detail_lease_until = NOW() + INTERVAL %s SECOND, "
+                    "detail_attempts = detail_attempts + 1 WHERE id IN (" + ", ".join(["%s"] * len(ids)) + ")",
+                    (self.owner, LEASE_SECONDS, *ids))
+            self.conn.commit()
+            return rows
+        except mysql.connector.Error:
+            self.conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    def _release(self, sql, params):
+        cursor = self._cursor()
+        try:
+            # Only touch rows we still hold: after a lease expiry another worker may own it
+            cursor.execute(sql + " WHERE id = %s AND detail_lease_owner = %s", (*params, self.owner))
+            self.conn.commit()
+        finally:
+            cursor.close()
+
+    def complete(self, slot_id):
+        self._release(
+            "UPDATE slots SET detail_lease_owner = NULL, detail_lease_until = NULL, detail_failures = 0, "
+            "detail_last_error = NULL, detail_next_attempt_at = NULL, detail_checked_at = NOW()", (slot_id,))
+
+    def release(self, slot_id):
+        """Gives a claimed row back untouched, e.g. when its site can't be scraped right now."""
+        self._release(
+            "UPDATE slots SET detail_lease_owner = NULL, detail_lease_until = NULL, "
+            "detail_attempts = GREATEST(detail_attempts - 1, 0)", (slot_id,))
+
+    def fail(self, slot_id, reason):
+        self._release(
+            "UPDATE slots SET detail_lease_owner = NULL, detail_lease_until = NULL, "
+            "detail_failures = detail_failures + 1, detail_last_error = %s, detail_checked_at = NOW(), "
+            "detail_next_attempt_at = NOW() + INTERVAL LEAST(%s, %s * POW(2, detail_failures - 1)) MINUTE",
+            ((reason or "unknown")[:255], RETRY_MAX_MINUTES, RETRY_BASE_MINUTES, slot_id))
+
+    def close(self):
+        self.conn.close()
+
+
+def run():
+    """Applies the claim columns and indexes, then prints the backlog."""
+    from slot_updater import DB_CONFIG
+
+    conn = mysql.connector.connect(**DB_CONFIG)
+    cursor = conn.cursor(dictionary=True)
+    for statement in MIGRATIONS:
+        try:
+            cursor.execute(statement)
+            print(f"[Migrate] {statement.split('(')[0].split(chr(10))[0].strip()} ... done")
+        except mysql.connector.Error as e:
+            # Duplicate column / key name: already applied
+            print(f"[Migrate] Skipped: {e.msg}")
+    cursor.execute("""
+        SELECT SUM(detail_lease_until >= NOW()) AS leased,
+               SUM(detail_next_attempt_at > NOW()) AS backing_off,
+               COUNT(*) AS pending
+        FROM slots WHERE theoretical_rtp = 0 AND url IS NOT NULL
+    """)
+    stats = cursor.fetchone()
+    print(f"[Claims] Pending {stats['pending']}, leased {stats['leased'] or 0}, backing off {stats['backing_off'] or 0}")
+    cursor.close()
+    conn.close()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,116 @@
+import re
+
+# Runs inside the page. For every field it finds the raw text (or attribute) and reports whether
+# the field is settled: a value is present (with a digit if numeric), or the field is optional
+# and its label isn't on the page at all.
+_COLLECT_JS = """
+(fields) => {
+    const text = (el) => (el && (el.innerText || el.textContent) || '').trim();
+    const hasDigit = (s) => /\\d/.test(s);
+
+    function byLabel(field) {
+        const label = document.querySelector(`span[data-translation='${field.label}']`);
+        if (!label) return [false, null];
+        // Value <p> sits next to the label: the nearest ancestor holding any other <p> is the
+        // label's own tile, so stop there rather than reading a neighbouring tile's value
+        let node = label.parentElement;
+        for (let depth = 0; node && depth < 4; depth++, node = node.parentElement) {
+            const values = [...node.querySelectorAll('p')].filter((p) => !p.contains(label)).map(text);
+            if (!values.length) continue;
+            return [true, values.find((value) => value && (!field.numeric || hasDigit(value))) || null];
+        }
+        return [true, null];
+    }
+
+    function byTable(field) {
+        const rows = document.querySelectorAll(field.rows || 'tbody tr');
+        for (const row of rows) {
+            const cells = row.querySelectorAll('td');
+            if (cells.length < 2) continue;
+            const label = text(cells[0]).toLowerCase();
+            if (field.exact ? label === field.label : label.includes(field.label)) {
+                const value = text(cells[1]);
+                return [true, value && (!field.numeric || hasDigit(value)) ? value : null];
+            }
+        }
+        return [false, null];
+    }
+
+    function byAttribute(field) {
+        const el = document.querySelector(field.selector);
+        if (!el) return [false, null];
+        return [true, el.getAttribute(field.attribute) || null];
+    }
+
+    const strategies = {label: byLabel, table: byTable, attribute: byAttribute};
+    const values = {};
+    let settled = true;
+    for (const [name, field] of Object.entries(fields)) {
+        const [labelFound, value] = strategies[field.strategy](field);
+        values[name] = value;
+        if (value === null && (field.required || labelFound)) settled = false;
+    }
+    return {settled, values};
+}
+"""
+
+_WAIT_JS = f"(fields) => {{ const r = ({_COLLECT_JS})(fields); return r.settled ? r.values : null; }}"
+
+
+def extract_details(page, fields, timeout=15000, polling=250):
+    """
+    Waits inside the page, with a single wait_for_function, until every field in `fields` is settled,
+    then returns {field: raw_text_or_None}. On timeout it returns whatever was present at the deadline.
+
+    fields = {
+        "rtp": {"strategy": "label", "label": "casino.rtp", "numeric": True, "required": True},
+        "max_win": {"strategy": "table", "label": "max win", "numeric": True},
+        "volatility": {"strategy": "attribute", "selector": "span[data-translation^='casino.volatility_']",
+                       "attribute": "data-translation"},
+    }
+    """
+    try:
+        handle = page.wait_for_function(_WAIT_JS, arg=fields, timeout=timeout, polling=polling)
+        return handle.json_value()
+    except Exception as e:
+        print(f"   [Extract] Not all fields settled within {timeout}ms: {str(e)[:60]}")
+        try:
+            return page.evaluate(_COLLECT_JS, fields)["values"]
+        except Exception:
+            return {name: None for name in fields}
+
+
+def parse_float(raw):
+    """'96.50%' -> 96.5"""
+    if not raw:
+        return None
+    text = raw.replace(',', '') if '.' in raw else raw.replace(',', '.')
+    match = re.search(r'\d+(?:\.\d+)?', text)
+    return float(match.group(0)) if match else None
+
+
+def parse_multiplier(raw):
+    """'5,000x' / '5.000x' / 'x5 000' / '21100' -> 5000 / 5000 / 5000 / 21100"""
+    if not raw:
+        return None
+    digits = re.sub(r'[^\d.,]', '', raw)
+    if '.' in digits and ',' in digits:
+        # '5.000,50x' / '5,000.50x': whichever separator comes last is the decimal point
+        thousands = ',' if digits.rfind('.') > digits.rfind(',') else '.'
+        digits = digits.replace(thousands, '').replace(',', '.')
+    elif re.fullmatch(r'\d{1,3}(?:\.\d{3})+', digits):
+        digits = digits.replace('.', '')
+    else:
+        digits = digits.replace(',', '')
+    try:
+        return int(float(digits)) if digits else None
+    except ValueError:
+        return None
+
+
+def parse_int(raw):
+    """'5' / '5 reels' -> 5"""
+    if not raw:
+        return None
+    match = re.search(r'\d+', raw)
+    return int(match.group(0)) if match else None
@@ -0,0 +1,57 @@
+import time
+from playwright_stealth import Stealth
+from host_pacing import pacer_for
+
+
+def open_slot(page, slot):
+    """
+    Starts loading a slot's detail page and returns as soon as the response commits, so the page
+    keeps loading while the caller does other work. Host pacing applies as for a normal goto.
+    """
+    url = slot.get('url')
+    pacer = pacer_for(url)
+    pacer.wait()
+    try:
+        response = page.goto(url, wait_until="commit", timeout=60000)
+    except Exception as e:
+        print(f"    [Prefetch] {slot.get('title')} failed to start: {str(e)[:40]}")
+        pacer.report(error=True)
+        response = None
+    return {"slot": slot, "page": page, "response": response, "started": time.monotonic()}
+
+
+class Prefetcher:
+    """
+    Look-ahead over a detail job's slots with two tabs in one context: while slot N is parsed and
+    written back in one tab, slot N+1 is already loading in the other. pipeline() yields the
+    open_slot() result for each slot; call bind() whenever the session swaps the context.
+    """
+
+    def __init__(self, context):
+        self.context = None
+        self.pages = []
+        self._next = None
+        self.bind(context)
+
+    def bind(self, context):
+        if context is self.context:
+            return
+        self.context = context
+        self.pages = [context.new_page() for _ in range(2)]
+        for page in self.pages:
+            Stealth().apply_stealth_sync(page)
+        # The slot loading in the old context's tab starts over in the new one
+        if self._next:
+            self._next = open_slot(self.pages[1], self._next["slot"])
+
+    def pipeline(self, slots):
+        slots = (s for s in slots if s.get('url'))
+        first = next(slots, None)
+        self._next = open_slot(self.pages[0], first) if first else None
+        while self._next:
+            current, self._next = self._next, None
+            following = next(slots, None)
+            if following:
+                spare = self.pages[1] if current["page"] is self.pages[0] else self.pages[0]
+                self._next = open_slot(spare, following)
+            yield current
@@ -0,0 +1,89 @@
+import os
+import json
+import math
+import time
+import heapq
+
+# --- CONFIGURATION ---
+ATTEMPTS_DIR = os.getenv('DETAIL_ATTEMPTS_DIR', 'detail_attempts')
+BUDGET = int(os.getenv('DETAIL_BUDGET', 0)) or None  # slots per run; 0 = no limit, only the order changes
+# "signal=weight,..." — missing fields, popularity (casinos listing the game), time since last attempt
+WEIGHTS = dict(
+    (k.strip(), float(v)) for k, v in
+    (pair.split("=") for pair in os.getenv('DETAIL_PRIORITY_WEIGHTS', 'missing=3,popularity=2,staleness=1').split(",")))
+STALE_HOURS = float(os.getenv('DETAIL_STALE_HOURS', 72))  # staleness signal saturates here
+# After n failures a slot is deferred BASE * 2^(n-1) hours, up to MAX
+DEFER_BASE_HOURS = float(os.getenv('DETAIL_DEFER_BASE_HOURS', 1))
+DEFER_MAX_HOURS = float(os.getenv('DETAIL_DEFER_MAX_HOURS', 24 * 14))
+POPULARITY_KEYS = ("casino_count", "casinos_count", "popularity")
+
+
+class DetailQueue:
+    """
+    Orders a detail job's candidate slots so a limited budget goes to the ones that matter most.
+
+    Attempt history (last attempt, consecutive failures) is kept per job in ATTEMPTS_DIR/<job>.json.
+    A slot's score is the weighted sum of: the fraction of `fields` still empty, its popularity
+    (log-scaled against the most popular candidate) and how long since it was last tried.
+    Slots that keep failing are deferred with exponential backoff and only fill leftover budget.
+    """
+
+    def __init__(self, job, fields):
+        self.job = job
+        self.fields = fields
+        self.path = os.path.join(ATTEMPTS_DIR, f"{job}.json")
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.attempts = json.load(f)
+        except (OSError, ValueError):
+            self.attempts = {}
+
+    def _popularity(self, slot):
+        return next((float(slot[k]) for k in POPULARITY_KEYS if slot.get(k) is not None), 0.0)
+
+    def deferred_until(self, slot_id):
+        entry = self.attempts.get(str(slot_id))
+        if not entry or not entry.get("failures"):
+            return 0
+        hours = min(DEFER_MAX_HOURS, DEFER_BASE_HOURS * 2 ** (entry["failures"] - 1))
+        return entry["last_attempt"] + hours * 3600
+
+    def score(self, slot, max_popularity, now):
+        missing = sum(1 for f in self.fields if not slot.get(f)) / max(1, len(self.fields))
+        popularity = math.log1p(self._popularity(slot)) / math.log1p(max_popularity) if max_popularity else 0
+        entry = self.attempts.get(str(slot["id"]))
+        staleness = 1.0 if not entry else min(1.0, (now - entry["last_attempt"]) / (STALE_HOURS * 3600))
+        return (WEIGHTS.get("missing", 0) * missing + WEIGHTS.get("popularity", 0) * popularity
+                + WEIGHTS.get("staleness", 0) * staleness)
+
+    def _key(self, slot, max_popularity, now):
+        # Sorts ready slots before deferred ones, then by descending score
+        return (self.deferred_until(slot["id"]) > now, -self.score(slot, max_popularity, now), slot["id"])
+
+    def order(self, slots, budget=BUDGET):
+        """Top `budget` slots (all with no budget) by score, ready ones first, deferred ones last."""
+        now = time.time()
+        max_popularity = max((self._popularity(s) for s in slots), default=0)
+        keyed = [(self._key(slot, max_popularity, now), slot) for slot in slots]
+        best = heapq.nsmallest(budget, keyed, key=lambda e: e[0]) if budget else sorted(keyed, key=lambda e: e[0])
+        picked = [slot for _, slot in best]
+        deferred = sum(1 for key, _ in keyed if key[0])
+        print(f"[Priority] {self.job}: {len(slots)} candidates, {deferred} deferred, running {len(picked)}")
+        return picked
+
+    def take_best(self, slots):
+        """Removes and returns the most important slot from a list that is still being filled."""
+        now = time.time()
+        max_popularity = max((self._popularity(s) for s in slots), default=0)
+        best = min(range(len(slots)), key=lambda i: self._key(slots[i], max_popularity, now))
+        return slots.pop(best)
+
+    def record(self, slot_id, ok):
+        entry = self.attempts.setdefault(str(slot_id), {"failures": 0})
+        entry["last_attempt"] = time.time()
+        entry["failures"] = 0 if ok else entry["failures"] + 1
+        os.makedirs(ATTEMPTS_DIR, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.attempts, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,178 @@
+import os
+import json
+import time
+import fcntl
+import random
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+from browser_pool import HAR_MODE
+
+# --- CONFIGURATION ---
+# State lives on disk so every scraper process hitting the same host shares one schedule
+PACING_DIR = os.getenv('PACING_DIR', 'pacing_state')
+ADDITIVE_INCREASE = float(os.getenv('PACING_INCREASE', 0.002))  # req/s added per healthy response
+MULTIPLICATIVE_DECREASE = float(os.getenv('PACING_DECREASE', 0.5))
+JITTER = float(os.getenv('PACING_JITTER', 0.2))  # +/- fraction of the interval
+HISTORY_SIZE = 200
+HISTORY_STEP = 0.1  # an interval change of this fraction since the last entry is recorded
+
+# host -> (start, min, max) in seconds between requests
+HOST_INTERVALS = {
+    "sportsbet.io": (45, 10, 300),
+    "stake.com": (8, 2, 120),
+    # Plain HTML listing pages fetched by http_listing.py
+    "casinogrounds.com": (1, 0.25, 60),
+    "playojo.com": (1, 0.25, 60),
+    # casino_simulator.py and other local test servers
+    "127.0.0.1": (0.05, 0.01, 5),
+    "localhost": (0.05, 0.01, 5),
+}
+DEFAULT_INTERVALS = (5, 1, 120)
+
+# Challenge / block pages that come back as 200
+CHALLENGE_MARKERS = ("Verify you are human", "cf-challenge", "Just a moment...")
+
+_pacers = {}
+
+
+def is_challenge(page):
+    """True when a page that came back 200 is a bot check rather than the content."""
+    try:
+        return any(marker in page.title() for marker in CHALLENGE_MARKERS)
+    except Exception:
+        return False
+
+
+def parse_retry_after(value):
+    """Retry-After as seconds to wait: '120' -> 120.0, 'Wed, 21 Oct 2026 07:28:00 GMT' -> seconds until then."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def host_of(url):
+    host = urlsplit(url).hostname or url
+    return host[4:] if host.startswith("www.") else host
+
+
+class HostPacer:
+    """
+    Request spacing with AIMD rate control, one per host: requests go out 1/rate apart (+/- JITTER),
+    never in bursts. Persisted in PACING_DIR/<host>.json and guarded by flock so concurrent scrapers
+    share the same schedule. wait() blocks until the next request slot; report() nudges the rate up
+    on healthy responses and halves it on 429/5xx/challenges and on requests that failed outright
+    (error=True: timeouts, resets), honouring Retry-After.
+    """
+
+    def __init__(self, host):
+        self.host = host
+        start, self.min_interval, self.max_interval = HOST_INTERVALS.get(host, DEFAULT_INTERVALS)
+        self.start_rate = 1 / start
+        os.makedirs(PACING_DIR, exist_ok=True)
+        self.path = os.path.join(PACING_DIR, f"{host}.json")
+
+    def _update(self, fn):
+        with open(self.path, "a+", encoding="utf-8") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                raw = f.read()
+                state = json.loads(raw) if raw.strip() else {
+                    "rate": self.start_rate, "next_at": 0, "ok": 0, "errors": 0, "history": []}
+                result = fn(state)
+                f.seek(0)
+                f.truncate()
+                json.dump(state, f)
+                # Flush while still holding the lock, or another writer can interleave with ours
+                f.flush()
+                return result
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _clamp(self, rate):
+        return min(1 / self.min_interval, max(1 / self.max_interval, rate))
+
+    def wait(self):
+        if HAR_MODE == "replay":
+            return  # Nothing reaches the host
+
+        def reserve(state):
+            now = time.time()
+            interval = 1 / state["rate"]
+            interval *= 1 + random.uniform(-JITTER, JITTER)
+            slot = max(now, state["next_at"])
+            state["next_at"] = slot + interval
+            return slot - now
+
+        delay = self._update(reserve)
+        if delay > 0:
+            print(f"[Pacing] {self.host}: waiting {delay:.1f}s")
+            time.sleep(delay)
+
+    def report(self, status=None, challenge=False, retry_after=None, error=False):
+        throttled = challenge or error or status == 429 or (status is not None and status >= 500)
+        event = "challenge" if challenge else "error" if error else status
+
+        def adjust(state):
+            old_rate = state["rate"]
+            if throttled:
+                state["rate"] = self._clamp(old_rate * MULTIPLICATIVE_DECREASE)
+                state["errors"] += 1
+                if retry_after:
+                    state["next_at"] = max(state["next_at"], time.time() + retry_after)
+            else:
+                state["rate"] = self._clamp(old_rate + ADDITIVE_INCREASE)
+                state["ok"] += 1
+            interval = 1 / state["rate"]
+            last = state["history"][-1]["interval"] if state["history"] else 1 / self.start_rate
+            if throttled or abs(interval - last) >= HISTORY_STEP * last:
+                state["history"] = (state["history"] + [
+                    {"at": int(time.time()), "interval": round(interval, 3), "event": event}])[-HISTORY_SIZE:]
+            return state["rate"]
+
+        rate = self._update(adjust)
+        if throttled:
+            print(f"[Pacing] {self.host}: throttled ({event}), "
+                  f"interval now {1 / rate:.1f}s")
+
+    def report_response(self, response, page=None):
+        """Convenience for Playwright: reads status/Retry-After and checks the page for a challenge."""
+        status = response.status if response else None
+        retry_after = parse_retry_after(response.headers.get("retry-after")) if response else None
+        challenge = page is not None and status == 200 and is_challenge(page)
+        self.report(status, challenge=challenge, retry_after=retry_after)
+
+
+def pacer_for(url):
+    host = host_of(url)
+    if host not in _pacers:
+        _pacers[host] = HostPacer(host)
+    return _pacers[host]
+
+
+def run():
+    """Prints the rates each host has settled at and its recent throttling events."""
+    if not os.path.isdir(PACING_DIR):
+        print("No pacing state yet.")
+        return
+    for name in sorted(os.listdir(PACING_DIR)):
+        if not name.endswith(".json"):
+            continue
+        with open(os.path.join(PACING_DIR, name), encoding="utf-8") as f:
+            state = json.load(f)
+        print(f"{name[:-5]}: interval {1 / state['rate']:.1f}s, ok {state['ok']}, throttled {state['errors']}")
+        for event in state["history"][-5:]:
+            print(f"   {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(event['at']))} "
+                  f"{event['event']} -> {event['interval']}s")
+
+
+if __name__ == "__main__":
+    run()
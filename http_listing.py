@@ -0,0 +1,203 @@
+import os
+import re
+import atexit
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from selectolax.lexbor import LexborHTMLParser
+from host_pacing import pacer_for, parse_retry_after
+
+# --- CONFIGURATION ---
+# http = try the browser-free path first, browser = always use Chromium
+LISTING_MODE = os.getenv('LISTING_MODE', 'http').lower()
+FETCH_CONCURRENCY = int(os.getenv('HTTP_LISTING_CONCURRENCY', 8))
+PARSE_WORKERS = int(os.getenv('HTTP_LISTING_PARSE_WORKERS', os.cpu_count() or 2))
+FETCH_ATTEMPTS = int(os.getenv('HTTP_LISTING_ATTEMPTS', 4))
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+              "(KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36")
+
+
+def _session():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=FETCH_CONCURRENCY, max_retries=2)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"User-Agent": USER_AGENT, "Accept-Language": "en-US,en;q=0.9"})
+    return session
+
+
+def _field(card, field):
+    node = card.css_first(field["css"]) if field.get("css") else card
+    if node is None:
+        return ""
+    if field.get("attr"):
+        return (node.attributes.get(field["attr"]) or "").strip()
+    return node.text(strip=True)
+
+
+_parse_pool = None
+
+
+def _parsers():
+    """One parse pool per process, started on first use and shared by every crawl_listing() call."""
+    global _parse_pool
+    if _parse_pool is None:
+        # scheduler_daemon workers are daemonic and may not have children, so parse in threads there
+        if multiprocessing.current_process().daemon:
+            _parse_pool = ThreadPoolExecutor(PARSE_WORKERS)
+        else:
+            _parse_pool = ProcessPoolExecutor(PARSE_WORKERS)
+        atexit.register(_parse_pool.shutdown)
+    return _parse_pool
+
+
+def _has_more(tree, spec):
+    """Whether the page shows the listing's load-more control; None when the spec names none."""
+    if not spec.get("more"):
+        return None
+    css, text = spec["more"]
+    return any(text in node.text(strip=True).lower() for node in tree.css(css))
+
+
+def parse_listing(html, spec, casino_name, listing_url):
+    """
+    Runs in the parse pool. Maps every card of one listing page with the casino's field spec and
+    returns (records, more), `more` being _has_more(); records is None when the page has no cards
+    at all (markup changed or rendered client-side).
+    """
+    tree = LexborHTMLParser(html)
+    cards = tree.css(spec["card"])
+    if spec.get("card_filter"):
+        attr, pattern = spec["card_filter"]
+        cards = [c for c in cards if re.match(pattern, c.attributes.get(attr) or "")]
+    if not cards:
+        return None, _has_more(tree, spec)
+
+    records = []
+    for card in cards:
+        values = {name: _field(card, field) for name, field in spec["fields"].items()}
+        if not all(values.get(name) for name in spec.get("required", ["title"])):
+            continue
+        avatar = values.get("avatar", "")
+        if avatar.startswith("//"):
+            avatar = "https:" + avatar
+        records.append({
+            "title": values["title"],
+            "provider": values.get("provider") or "Unknown",
+            "url": listing_url,
+            "avatar": avatar,
+            "casino_name": casino_name,
+        })
+    return records, _has_more(tree, spec)
+
+
+def _fetch(session, url):
+    """Page HTML, or None once FETCH_ATTEMPTS paced tries have failed or been throttled."""
+    pacer = pacer_for(url)
+    for _ in range(FETCH_ATTEMPTS):
+        pacer.wait()
+        try:
+            response = session.get(url, timeout=30)
+        except requests.RequestException as e:
+            print(f"   [HTTP] {url} failed: {str(e)[:60]}")
+            pacer.report(error=True)
+            continue
+        pacer.report(response.status_code, retry_after=parse_retry_after(response.headers.get("Retry-After")))
+        if response.ok:
+            return response.text
+        if response.status_code != 429 and response.status_code < 500:
+            return None
+    return None
+
+
+def crawl_listing(casino_name, listing_url, spec, on_batch=None, frontier=None):
+    """
+    Browser-free crawl of a server-rendered listing: pages are fetched over a pooled session,
+    FETCH_CONCURRENCY at a time (under host pacing), and parsed in the shared parse pool.
+    Stops at the first page that adds nothing new, or once `frontier` (a ListingFrontier for a
+    newest-first listing) reports known cards; that frontier crawl goes one page at a time.
+    Returns the records, or None when the caller should fall back to the browser: LISTING_MODE=browser,
+    no cards on the first page, or a crawl that didn't stop at the frontier and looks incomplete.
+    `page_url` is only trusted while it proves itself, so that counts as incomplete when page 2 just
+    repeats page 1 (the site ignores the parameter), when max_pages runs out while pages still add
+    cards, when the last page that added cards still shows the `more` control, or when fewer than
+    min_records came back. Batches already passed to on_batch stay synced either way.
+
+    spec = {
+        "card": "div.game-card",                    # card_filter: (attribute, regex) narrows it
+        "fields": {"title": {"css": "h3"}, "avatar": {"css": "img", "attr": "src"}, ...},
+        "required": ["title"],
+        "page_url": "{url}?page={page}",            # optional, else only the first page
+        "more": ("button", "load more"),            # (css, lowercase text) of the load-more control
+        "max_pages": 100,
+        "min_records": 50,
+    }
+    """
+    if LISTING_MODE == "browser":
+        return None
+    page_url = spec.get("page_url")
+    max_pages = spec.get("max_pages", 100) if page_url else 1
+    seen, records = set(), []
+    pages_read = 0
+    more, more_page = None, 0
+    ignored = ended = False
+    # Pages past the frontier would be fetched for nothing
+    concurrency = 1 if frontier and not frontier.full else FETCH_CONCURRENCY
+
+    parsers = _parsers()
+    with _session() as session, ThreadPoolExecutor(FETCH_CONCURRENCY) as fetchers:
+        page = 1
+        while page <= max_pages:
+            # Page 1 goes alone, so a mapping that no longer matches costs a single request
+            last = page if page == 1 else min(max_pages, page + concurrency - 1)
+            numbers = range(page, last + 1)
+            urls = [listing_url if n == 1 else page_url.format(url=listing_url, page=n) for n in numbers]
+            htmls = list(fetchers.map(lambda u: _fetch(session, u), urls))
+            parsed = [parsers.submit(parse_listing, html, spec, casino_name, listing_url) if html else None
+                      for html in htmls]
+
+            for number, future in zip(numbers, parsed):
+                page_records, page_more = future.result() if future else (None, None)
+                if page_records is None and number == 1:
+                    print(f"   [HTTP] {listing_url}: required selectors missing, falling back to the browser.")
+                    return None
+                page_records = page_records or []
+                if number == 2 and page_records and all(r["title"] in seen for r in page_records):
+                    ignored = True
+                if frontier:
+                    page_records = list(itertools.takewhile(
+                        lambda r: not frontier.see(r["title"], r["provider"]), page_records))
+                batch = [r for r in page_records if r["title"] not in seen]
+                if batch:
+                    pages_read += 1
+                    more, more_page = page_more, number
+                    seen.update(r["title"] for r in batch)
+                    records.extend(batch)
+                    if on_batch:
+                        on_batch(batch)
+                if not batch or (frontier and frontier.stopped_early):
+                    ended = True
+                    page = max_pages + 1
+                    break
+            else:
+                page = last + 1
+
+    if ignored:
+        print(f"   [HTTP] {listing_url}: page 2 repeats page 1, falling back to the browser.")
+        return None
+    if frontier and frontier.stopped_early:
+        print(f"   [HTTP] {listing_url}: {len(records)} records over {pages_read} page(s), stopped at the known frontier.")
+        return records
+    if page_url and not ended:
+        print(f"   [HTTP] {listing_url}: still adding games at max_pages={max_pages}, falling back to the browser.")
+        return None
+    if more:
+        print(f"   [HTTP] {listing_url}: page {more_page} still offers more games, falling back to the browser.")
+        return None
+    if len(records) < spec.get("min_records", 1):
+        print(f"   [HTTP] {listing_url}: only {len(records)} records, falling back to the browser.")
+        return None
+    print(f"   [HTTP] {listing_url}: {len(records)} records over {pages_read} page(s).")
+    return records
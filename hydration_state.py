@@ -0,0 +1,211 @@
+import os
+import re
+import json
+from host_pacing import pacer_for, parse_retry_after
+
+# --- CONFIGURATION ---
+MAX_PAGES = int(os.getenv('HYDRATION_MAX_PAGES', 200))
+# Collected / reported total below this counts as incomplete, and the DOM crawl still runs
+COMPLETE_RATIO = float(os.getenv('HYDRATION_COMPLETE_RATIO', 0.98))
+
+# Serialized state the frameworks embed in the first HTML response
+_STATE_JS = """
+() => {
+    const parse = (text) => { try { return JSON.parse(text); } catch (e) { return null; } };
+    const out = {inline: []};
+    const next = document.getElementById('__NEXT_DATA__');
+    if (next) out.__NEXT_DATA__ = parse(next.textContent);
+    if (window.__NUXT__) out.__NUXT__ = parse(JSON.stringify(window.__NUXT__));
+    if (window.__APOLLO_STATE__) out.__APOLLO_STATE__ = parse(JSON.stringify(window.__APOLLO_STATE__));
+    for (const s of document.querySelectorAll('script[type="application/json"]')) {
+        if (s.id === '__NEXT_DATA__') continue;
+        const data = parse(s.textContent);
+        // SvelteKit inlines fetch responses with the body as a JSON string
+        if (data && typeof data.body === 'string') data.body = parse(data.body) || data.body;
+        if (data) out.inline.push(data);
+    }
+    return out;
+}
+"""
+_NEXT_DATA_RE = re.compile(r'<script[^>]+id="__NEXT_DATA__"[^>]*>(.*?)</script>', re.S)
+
+
+def get_path(obj, path):
+    """'props.pageProps.games|props.games' -> first alternative that resolves, else None."""
+    if not path:
+        return None
+    for alternative in path.split("|"):
+        value = obj
+        for key in alternative.split("."):
+            if isinstance(value, dict):
+                value = value.get(key)
+            elif isinstance(value, list) and key.isdigit() and int(key) < len(value):
+                value = value[int(key)]
+            else:
+                value = None
+            if value is None:
+                break
+        if value is not None:
+            return value
+    return None
+
+
+def find_records(obj, keys, depth=0):
+    """Largest list of dicts anywhere in obj whose first items all carry `keys`."""
+    best = []
+    if depth > 12:
+        return best
+    if isinstance(obj, list):
+        sample = obj[:5]
+        if sample and all(isinstance(i, dict) and all(get_path(i, k) is not None for k in keys) for i in sample):
+            best = obj
+        children = obj
+    elif isinstance(obj, dict):
+        children = obj.values()
+    else:
+        return best
+    for child in children:
+        found = find_records(child, keys, depth + 1)
+        if len(found) > len(best):
+            best = found
+    return best
+
+
+def _text(value):
+    return str(value).strip() if isinstance(value, (str, int, float)) else ""
+
+
+def map_records(items, spec, casino_name):
+    fields = spec["fields"]
+    records = []
+    for item in items:
+        title = _text(get_path(item, fields["title"]))
+        slug = _text(get_path(item, fields.get("slug")))
+        if not title or not slug:
+            continue
+        avatar = _text(get_path(item, fields.get("avatar")))
+        if avatar.startswith("/") and spec.get("asset_base"):
+            avatar = spec["asset_base"] + avatar
+        records.append({
+            "title": title,
+            "provider": _text(get_path(item, fields.get("provider"))) or "Unknown",
+            "url": spec["url"].format(slug=slug),
+            "avatar": avatar,
+            "casino_name": casino_name,
+        })
+    return records
+
+
+def _locate(state, spec):
+    """(items, cursor, total) from one state document; a spec with a `path` is never guessed past."""
+    if spec.get("path"):
+        items = get_path(state, spec["path"])
+        if not isinstance(items, list):
+            items = []
+    else:
+        items = find_records(state, [spec["fields"]["title"].split("|")[0], spec["fields"]["slug"].split("|")[0]])
+    cursor_spec = spec.get("cursor") or {}
+    cursor = get_path(state, cursor_spec.get("path"))
+    total = get_path(state, spec.get("total"))
+    return items, cursor, total if isinstance(total, int) else None
+
+
+def shape_ok(items, spec):
+    """
+    Whether items look like games: every one a dict carrying all `required` fields. A providers or
+    categories list also has names and slugs, but no provider, so it doesn't get synced as slots.
+    """
+    required = spec.get("required", ["title", "slug"])
+    return all(isinstance(item, dict) and all(_text(get_path(item, spec["fields"].get(name))) for name in required)
+               for item in items)
+
+
+def _fetch_state(page, url):
+    """
+    A cursor page: JSON straight from a data route, or __NEXT_DATA__ pulled out of the HTML.
+    Next.js /_next/data routes return only the props ({"pageProps": ...}), so they are wrapped
+    as {"props": ...} to resolve with the same spec paths as __NEXT_DATA__.
+    """
+    pacer = pacer_for(url)
+    pacer.wait()
+    try:
+        response = page.request.get(url, timeout=60000)
+    except Exception:
+        pacer.report(error=True)
+        raise
+    pacer.report(response.status, retry_after=parse_retry_after(response.headers.get("retry-after")))
+    if not response.ok:
+        return None
+    if "json" in response.headers.get("content-type", ""):
+        data = response.json()
+        if "/_next/data/" in url and isinstance(data, dict) and "pageProps" in data:
+            return {"props": data}
+        return data
+    match = _NEXT_DATA_RE.search(response.text())
+    return json.loads(match.group(1)) if match else None
+
+
+def extract_catalog(page, spec, casino_name, on_batch=None):
+    """
+    Maps the catalog embedded in the loaded page's hydration state to slot records, following the
+    site's own pagination cursor. Returns (records, complete); complete is False when the state is
+    missing, too small, or smaller than the total it reports, and the caller should crawl the DOM.
+
+    spec = {
+        "source": "__NEXT_DATA__",                  # or __NUXT__, __APOLLO_STATE__, inline
+        "path": "props.pageProps.games",            # optional, else the largest matching list
+        "required": ["title", "slug", "provider"],  # fields every item must carry, else nothing syncs
+        "fields": {"title": "name|title", "slug": "slug", "provider": "provider.name|provider",
+                   "avatar": "thumbnail|image"},
+        "url": "https://example.com/play/{slug}",
+        "cursor": {"path": "props.pageProps.nextCursor", "url": "https://example.com/_next/data/{build_id}/slots.json?cursor={cursor}"},
+        "total": "props.pageProps.total",
+        "min_records": 20,
+    }
+    """
+    try:
+        found = page.evaluate(_STATE_JS)
+    except Exception as e:
+        print(f"   [Hydration] Could not read page state: {str(e)[:60]}")
+        return [], False
+
+    source = spec.get("source", "__NEXT_DATA__")
+    states = found.get("inline", []) if source == "inline" else [found.get(source)]
+    states = [s for s in states if s]
+    if not states:
+        print(f"   [Hydration] No {source} state on the page.")
+        return [], False
+
+    items, cursor, total = max((_locate(s, spec) for s in states), key=lambda r: len(r[0]))
+    build_id = (found.get("__NEXT_DATA__") or {}).get("buildId", "")
+    records, seen_cursors, pages = [], set(), 1
+
+    while True:
+        if not shape_ok(items, spec):
+            print(f"   [Hydration] {spec.get('path') or 'matched list'} doesn't hold games, nothing synced from it.")
+            break
+        batch = map_records(items, spec, casino_name)
+        records.extend(batch)
+        if on_batch and batch:
+            on_batch(batch)
+
+        cursor_url = (spec.get("cursor") or {}).get("url")
+        if cursor in (None, "", False) or not cursor_url or cursor in seen_cursors or pages >= MAX_PAGES:
+            break
+        seen_cursors.add(cursor)
+        try:
+            state = _fetch_state(page, cursor_url.format(cursor=cursor, build_id=build_id))
+        except Exception as e:
+            print(f"   [Hydration] Cursor page failed: {str(e)[:60]}")
+            state = None
+        if not state:
+            break
+        items, cursor, _ = _locate(state, spec)
+        pages += 1
+
+    complete = len(records) >= spec.get("min_records", 1)
+    if total:
+        complete = complete and len(records) >= total * COMPLETE_RATIO
+    print(f"   [Hydration] {len(records)} records from {source} over {pages} page(s)"
+          f"{f' of {total} reported' if total else ''}, {'complete' if complete else 'incomplete, DOM crawl follows'}")
+    return records, complete
@@ -0,0 +1,83 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from ndjson_store import casino_slug
+
+# --- CONFIGURATION ---
+FRONTIER_DIR = os.getenv('FRONTIER_DIR', 'frontier_state')
+# Stop an ordered listing after this many consecutive cards we already know
+STOP_AFTER_KNOWN = int(os.getenv('FRONTIER_STOP_AFTER', 20))
+# ...but still crawl it to the end this often, to catch reorders and missed cards
+FULL_CRAWL_EVERY_HOURS = float(os.getenv('FRONTIER_FULL_EVERY_HOURS', 168))
+FORCE_FULL = os.getenv('FRONTIER_FORCE_FULL', 'False').lower() == 'true'
+
+# Listings of one casino may be crawled from parallel tabs and share one state file
+_commit_lock = threading.Lock()
+
+
+def fingerprint(title, provider=""):
+    key = f"{title.strip().lower()}|{(provider or '').strip().lower()}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+class ListingFrontier:
+    """
+    Early termination for newest-first listings. Every card is passed to see() in page order;
+    once STOP_AFTER_KNOWN consecutive cards are already in the fingerprint store the rest of the
+    listing is what we crawled last time, so see() returns True and the caller stops.
+    A full crawl (no early stop) is forced every FULL_CRAWL_EVERY_HOURS.
+    State: FRONTIER_DIR/<casino>.json -> {listing_url: {"last_full": ts, "fingerprints": [...]}}
+    """
+
+    def __init__(self, casino_name, listing_url):
+        self.listing_url = listing_url
+        self.path = os.path.join(FRONTIER_DIR, f"{casino_slug(casino_name)}.json")
+        state = self._load().get(listing_url, {})
+        self.known = set(state.get("fingerprints", []))
+        self.last_full = state.get("last_full", 0)
+        self.full = (FORCE_FULL or not self.known
+                     or time.time() - self.last_full > FULL_CRAWL_EVERY_HOURS * 3600)
+        self.seen = set()
+        self.streak = 0
+        self.stopped_early = False
+        mode = "full crawl" if self.full else f"stop after {STOP_AFTER_KNOWN} known cards"
+        print(f"   [Frontier] {listing_url}: {len(self.known)} known, {mode}")
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def see(self, title, provider=""):
+        """Registers a card; returns True once the known frontier has been reached."""
+        fp = fingerprint(title, provider)
+        self.seen.add(fp)
+        self.streak = self.streak + 1 if fp in self.known else 0
+        if not self.full and self.streak >= STOP_AFTER_KNOWN:
+            self.stopped_early = True
+        return self.stopped_early
+
+    def commit(self):
+        """Saves the fingerprints. A full crawl replaces the set, a partial one only adds to it."""
+        os.makedirs(FRONTIER_DIR, exist_ok=True)
+        with _commit_lock:
+            self._save()
+        new_cards = len(self.seen - self.known)
+        print(f"   [Frontier] {new_cards} new cards, {'stopped at frontier' if self.stopped_early else 'crawled to end'}")
+
+    def _save(self):
+        state = self._load()
+        entry = state.setdefault(self.listing_url, {})
+        if self.full:
+            entry["fingerprints"] = sorted(self.seen)
+            entry["last_full"] = time.time()
+        else:
+            entry["fingerprints"] = sorted(self.known | self.seen)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,280 @@
+import os
+import sys
+import gzip
+import json
+import time
+import random
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from aiohttp import web
+from dotenv import load_dotenv
+from ndjson_store import iter_records
+import wire_format
+from wire_format import JSON_CONTENT_TYPE, ENVELOPE_CONTENT_TYPE, MSGPACK_CONTENT_TYPE, expand_envelope, post_slots
+
+try:
+    import msgpack
+    import zstandard
+except ImportError:
+    msgpack = None
+    zstandard = None
+
+load_dotenv()
+
+# --- CONFIGURATION ---
+HOST = os.getenv('MOCK_API_HOST', '127.0.0.1')
+PORT = int(os.getenv('MOCK_API_PORT', 39600))
+PROFILE = os.getenv('MOCK_API_PROFILE', 'clean')
+SEED_FILE = os.getenv('MOCK_API_SEED', 'slots_data.json')
+SEED_CASINO = os.getenv('MOCK_API_SEED_CASINO', 'https://sportsbet.io')
+BENCH_RECORDS = int(os.getenv('MOCK_BENCH_RECORDS', 2000))
+BENCH_BATCH = int(os.getenv('MOCK_BENCH_BATCH', 50))
+# SyncQueue posts from a single consumer thread; raise this to see how the server side scales
+BENCH_CONCURRENCY = int(os.getenv('MOCK_BENCH_CONCURRENCY', 1))
+BENCH_FORMATS = os.getenv('MOCK_BENCH_FORMATS', 'json').split(',')
+
+# latency_ms +/- jitter per request; error/throttle rates answer 500 / 429 + Retry-After;
+# slow_body_rate sends the response in chunks spread over slow_body_ms
+PROFILES = {
+    "clean": {"latency_ms": 20, "jitter": 0.2},
+    "slow": {"latency_ms": 800, "jitter": 0.5},
+    "flaky": {"latency_ms": 100, "jitter": 0.5, "error_rate": 0.1},
+    "throttled": {"latency_ms": 50, "jitter": 0.2, "throttle_rate": 0.2, "retry_after": 1},
+    "slow-body": {"latency_ms": 50, "jitter": 0.2, "slow_body_rate": 0.5, "slow_body_ms": 2000},
+    "mixed": {"latency_ms": 200, "jitter": 0.8, "error_rate": 0.05, "throttle_rate": 0.05,
+              "retry_after": 2, "slow_body_rate": 0.1, "slow_body_ms": 3000},
+}
+
+
+def decode_sync_body(body, content_type):
+    """Everything post_slots() can send: a JSON list, or the envelope as gzip JSON / zstd msgpack."""
+    # Sniffed from the magic bytes, so a body the client didn't compress is still accepted
+    if body[:2] == b"\x1f\x8b":
+        body = gzip.decompress(body)
+    elif body[:4] == b"\x28\xb5\x2f\xfd":
+        body = zstandard.ZstdDecompressor().decompress(body)
+    if content_type == MSGPACK_CONTENT_TYPE:
+        return expand_envelope(msgpack.unpackb(body, raw=False))
+    if content_type == ENVELOPE_CONTENT_TYPE:
+        return expand_envelope(json.loads(body))
+    return json.loads(body)
+
+
+class MockApi:
+    """In-memory stand-in for the Laravel endpoints the scrapers call, with the same response shapes."""
+
+    def __init__(self, profile=PROFILE):
+        self.profile = PROFILES[profile]
+        self.rng = random.Random(1)
+        self.slots = {}  # title -> slot row
+        self.links = set()  # (slot id, casino id)
+        self.casinos = {}  # casino_name -> id
+        self.stats = {"requests": 0, "errors": 0, "throttled": 0, "slow_bodies": 0}
+
+    def use(self, profile):
+        self.profile = PROFILES[profile]
+
+    def casino_id(self, casino_name):
+        return self.casinos.setdefault(casino_name, len(self.casinos) + 1)
+
+    def store(self, records):
+        details = {"new_slots_added": 0, "existing_slots_skipped": 0,
+                   "new_links_added": 0, "existing_links_skipped": 0}
+        for record in records:
+            slot = self.slots.get(record["title"])
+            if slot:
+                details["existing_slots_skipped"] += 1
+            else:
+                slot = self.slots[record["title"]] = {
+                    "id": len(self.slots) + 1, "title": record["title"], "provider": record.get("provider"),
+                    "url": record.get("url"), "avatar": record.get("avatar"), "theoretical_rtp": 0,
+                    "volatility_level": None, "max_win_multiplier": None, "reels": None, "rows": None}
+                details["new_slots_added"] += 1
+            link = (slot["id"], self.casino_id(record["casino_name"]))
+            if link in self.links:
+                details["existing_links_skipped"] += 1
+            else:
+                self.links.add(link)
+                details["new_links_added"] += 1
+        return details
+
+    async def respond(self, request, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        if self.rng.random() >= self.profile.get("slow_body_rate", 0):
+            return web.Response(body=body, status=status, content_type="application/json")
+        self.stats["slow_bodies"] += 1
+        response = web.StreamResponse(status=status, headers={"Content-Type": "application/json"})
+        await response.prepare(request)
+        chunks = 8
+        size = -(-len(body) // chunks)
+        for i in range(chunks):
+            await response.write(body[i * size:(i + 1) * size])
+            await asyncio.sleep(self.profile["slow_body_ms"] / chunks / 1000)
+        await response.write_eof()
+        return response
+
+    @web.middleware
+    async def faults(self, request, handler):
+        self.stats["requests"] += 1
+        profile = self.profile
+        latency = profile.get("latency_ms", 0) * (1 + self.rng.uniform(-1, 1) * profile.get("jitter", 0))
+        await asyncio.sleep(max(0.0, latency) / 1000)
+        roll = self.rng.random()
+        if roll < profile.get("error_rate", 0):
+            self.stats["errors"] += 1
+            return web.json_response({"message": "Server Error"}, status=500)
+        if roll < profile.get("error_rate", 0) + profile.get("throttle_rate", 0):
+            self.stats["throttled"] += 1
+            return web.json_response({"message": "Too Many Attempts."}, status=429,
+                                     headers={"Retry-After": str(profile.get("retry_after", 1))})
+        return await handler(request)
+
+    async def sync(self, request):
+        try:
+            records = decode_sync_body(await request.read(), request.content_type)
+        except Exception as e:
+            return web.json_response({"message": f"Malformed body: {e}"}, status=400)
+        errors = {f"{i}.{field}": [f"The {i}.{field} field is required."]
+                  for i, r in enumerate(records) for field in ("title", "casino_name") if not r.get(field)}
+        if errors:
+            return web.json_response({"message": "The given data was invalid.", "errors": errors}, status=422)
+        return await self.respond(request, {"status": "success", "details": self.store(records)})
+
+    async def sync_options(self, request):
+        """Advertises the envelope encodings, which post_slots() checks before sending one."""
+        accepted = [JSON_CONTENT_TYPE, ENVELOPE_CONTENT_TYPE] + ([MSGPACK_CONTENT_TYPE] if msgpack and zstandard else [])
+        return web.Response(status=204, headers={"Allow": "POST, OPTIONS", "Accept-Post": ", ".join(accepted)})
+
+    async def casino_slots(self, request):
+        """Laravel paginator over the slots linked to a casino, still missing their details first."""
+        casino_id = int(request.match_info["id"])
+        page = max(1, int(request.query.get("page", 1)))
+        per_page = max(1, int(request.query.get("per_page", 500)))
+        ids = {slot_id for slot_id, linked in self.links if linked == casino_id}
+        rows = sorted((s for s in self.slots.values() if s["id"] in ids),
+                      key=lambda s: (s["theoretical_rtp"] != 0, s["id"]))
+        last_page = max(1, -(-len(rows) // per_page))
+        base = f"{request.url.origin()}{request.path}"
+        return await self.respond(request, {
+            "current_page": page,
+            "data": rows[(page - 1) * per_page:page * per_page],
+            "last_page": last_page,
+            "per_page": per_page,
+            "total": len(rows),
+            "next_page_url": f"{base}?page={page + 1}&per_page={per_page}" if page < last_page else None,
+        })
+
+    async def update_details(self, request):
+        payload = await request.json()
+        slot = next((s for s in self.slots.values() if s["id"] == payload.get("slot_id")), None)
+        if not slot:
+            return web.json_response({"message": "Slot not found."}, status=404)
+        rtp = payload.get("theoretical_rtp")
+        if rtp is not None and not isinstance(rtp, (int, float)):
+            return web.json_response({"message": "The given data was invalid.",
+                                      "errors": {"theoretical_rtp": ["The theoretical rtp must be a number."]}},
+                                     status=422)
+        slot.update({k: v for k, v in payload.items() if k in slot and k != "id"})
+        return await self.respond(request, {"status": "success", "slot_id": slot["id"]})
+
+    def app(self):
+        # aiohttp can't undo zstd itself, so bodies reach decode_sync_body() as sent
+        app = web.Application(middlewares=[self.faults], client_max_size=64 * 1024 * 1024,
+                              handler_args={"auto_decompress": False})
+        app.add_routes([
+            web.post("/api/slots/sync", self.sync),
+            web.options("/api/slots/sync", self.sync_options),
+            web.route("*", "/api/casinos/{id}/slots", self.casino_slots),
+            web.post("/api/slots/update-details", self.update_details),
+        ])
+        return app
+
+    def seed(self, path=SEED_FILE, casino_name=SEED_CASINO):
+        if os.path.exists(path):
+            self.store([{**r, "casino_name": r.get("casino_name", casino_name)} for r in iter_records(path)])
+
+
+def start_in_thread(api, host=HOST, port=PORT):
+    ready = threading.Event()
+
+    def serve():
+        loop = asyncio.new_event_loop()
+        runner = web.AppRunner(api.app(), access_log=None)
+        loop.run_until_complete(runner.setup())
+        loop.run_until_complete(web.TCPSite(runner, host, port).start())
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=serve, daemon=True).start()
+    ready.wait(30)
+    return f"http://{host}:{port}"
+
+
+def bench_traffic(path=SEED_FILE, size=BENCH_RECORDS, casinos=4):
+    """slots_data.json scaled to `size` records spread over a few casinos, so links and slots both grow."""
+    base = list(iter_records(path))
+    return [{**base[i % len(base)],
+             "title": f"{base[i % len(base)]['title']} {i // len(base) + 1}",
+             "casino_name": f"https://casino-{i % casinos}.test"} for i in range(size)]
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0
+
+
+def bench():
+    """records/s and request latency of post_slots() under every fault profile and wire format."""
+    api = MockApi()
+    endpoint = f"{start_in_thread(api)}/api/slots/sync"
+    records = bench_traffic()
+    batches = [records[i:i + BENCH_BATCH] for i in range(0, len(records), BENCH_BATCH)]
+    print(f">>> {len(records)} records in {len(batches)} batches of {BENCH_BATCH}, "
+          f"{BENCH_CONCURRENCY} concurrent poster(s), against {endpoint}")
+    print(f"   {'profile':<10} {'format':<9} {'rec/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'failed':>7} {'statuses'}")
+
+    for wire in BENCH_FORMATS:
+        wire_format.WIRE_FORMAT = wire
+        for name in PROFILES:
+            api.use(name)
+            api.slots.clear()
+            api.links.clear()
+            latencies, statuses = [], {}
+
+            def post(batch):
+                started = time.perf_counter()
+                try:
+                    status = post_slots(endpoint, batch, timeout=30).status_code
+                except Exception as e:
+                    status = type(e).__name__
+                latencies.append(time.perf_counter() - started)
+                statuses[status] = statuses.get(status, 0) + 1
+                return status == 200
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(BENCH_CONCURRENCY) as pool:
+                ok = list(pool.map(post, batches))
+            elapsed = time.perf_counter() - started
+            synced = sum(len(b) for b, good in zip(batches, ok) if good)
+            print(f"   {name:<10} {wire:<9} {synced / elapsed:8.0f} {percentile(latencies, 0.5) * 1000:8.0f} "
+                  f"{percentile(latencies, 0.95) * 1000:8.0f} {percentile(latencies, 0.99) * 1000:8.0f} "
+                  f"{ok.count(False):>7} {dict(sorted(statuses.items(), key=str))}")
+    print(f"   server: {api.stats}")
+
+
+def run():
+    api = MockApi()
+    api.seed()
+    base = f"http://{HOST}:{PORT}"
+    print(f">>> Mock Laravel API ({PROFILE} profile, {len(api.slots)} seeded slots) on {base}")
+    print(f"   export API_ENDPOINT={base}/api/slots/sync API_ENDPOINT_BASE={base}")
+    web.run_app(api.app(), host=HOST, port=PORT, print=None, access_log=None)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        bench()
+    else:
+        run()
@@ -0,0 +1,108 @@
+import os
+import re
+import json
+import time
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+from slot_record import dumps
+
+load_dotenv()
+
+# --- CONFIGURATION ---
+# Empty = disabled, scrapers only sync to Laravel as before
+OUTPUT_DIR = os.getenv('NDJSON_OUTPUT_DIR', '')
+FSYNC_EVERY_RECORDS = int(os.getenv('NDJSON_FSYNC_RECORDS', 200))
+FSYNC_EVERY_SECONDS = float(os.getenv('NDJSON_FSYNC_SECONDS', 10))
+PARTIAL_SUFFIX = ".part"
+# Committed runs that deliberately stopped early (e.g. at a listing frontier) hold only part of the
+# catalog; they are still .ndjson files, but this marks them for anything comparing whole runs
+INCOMPLETE_SUFFIX = ".incomplete.ndjson"
+
+
+def casino_slug(casino_name):
+    """'https://ge.betsson.com' -> 'ge-betsson-com', 'PlayOJO' -> 'playojo'"""
+    name = re.sub(r'^https?://', '', casino_name.lower())
+    return re.sub(r'[^a-z0-9]+', '-', name).strip('-')
+
+
+class NdjsonRunWriter:
+    """
+    Appends one JSON object per line to <OUTPUT_DIR>/<casino>/<run>.ndjson.part while a scraper runs.
+    commit() fsyncs and renames it to .ndjson, so a finished file is always complete; a .part file
+    is what a crashed or still running scrape has written so far. A run that mark_incomplete() was
+    called on commits to .incomplete.ndjson instead.
+    """
+
+    def __init__(self, casino_name, output_dir=None):
+        output_dir = OUTPUT_DIR if output_dir is None else output_dir
+        self.enabled = bool(output_dir)
+        self.count = 0
+        self.path = None
+        self.incomplete = False
+        if not self.enabled:
+            return
+
+        run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        casino_dir = os.path.join(output_dir, casino_slug(casino_name))
+        os.makedirs(casino_dir, exist_ok=True)
+        self.path = os.path.join(casino_dir, f"{run_id}.ndjson")
+        self._file = open(self.path + PARTIAL_SUFFIX, "a", encoding="utf-8")
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        print(f"   [NDJSON] Writing to {self.path}{PARTIAL_SUFFIX}")
+
+    def write_many(self, records):
+        if not self.enabled or not records:
+            return
+        self._file.write(b"".join(dumps(r) + b"\n" for r in records).decode("utf-8"))
+        # Flush every batch so readers tailing the .part file see whole lines promptly
+        self._file.flush()
+        self.count += len(records)
+        self._unsynced += len(records)
+        if self._unsynced >= FSYNC_EVERY_RECORDS or time.monotonic() - self._last_sync >= FSYNC_EVERY_SECONDS:
+            self._fsync()
+
+    def _fsync(self):
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def mark_incomplete(self):
+        """The scraper skipped part of the catalog on purpose, so this run doesn't list all of it."""
+        self.incomplete = True
+
+    def commit(self):
+        if not self.enabled or self._file.closed:
+            return
+        self._fsync()
+        self._file.close()
+        if self.incomplete:
+            self.path = self.path[:-len(".ndjson")] + INCOMPLETE_SUFFIX
+        os.replace(self._file.name, self.path)
+        print(f"   [NDJSON] Committed {self.count} records to {self.path}")
+
+
+def iter_records(path, include_partial=True):
+    """
+    Lazily yields records from an .ndjson(.part) file, a directory of them, or a legacy JSON array
+    such as slots_data.json. A half-written last line of a .part file is skipped, not an error.
+    """
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            full = os.path.join(path, name)
+            if os.path.isdir(full) or name.endswith(".ndjson") or (include_partial and name.endswith(".ndjson" + PARTIAL_SUFFIX)):
+                yield from iter_records(full, include_partial)
+        return
+
+    if path.endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            yield from json.load(f)
+        return
+
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                break  # still being written
+            line = line.strip()
+            if line:
+                yield json.loads(line)
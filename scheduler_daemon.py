@@ -0,0 +1,222 @@
+import os
+import json
+import time
+import signal
+import importlib
+import multiprocessing as mp
+from dotenv import load_dotenv
+from browser_pool import BROWSER_WS_ENV, browser_endpoints, start_browser_server, stop_browser_server
+from ndjson_store import INCOMPLETE_SUFFIX, casino_slug, iter_records
+
+load_dotenv()
+
+# --- CONFIGURATION ---
+IS_HEADLESS = os.getenv('HEADLESS', 'True').lower() == 'true'
+WORKERS = int(os.getenv('DAEMON_WORKERS', 3))
+BROWSER_SERVERS = int(os.getenv('DAEMON_BROWSER_SERVERS', 1))
+STATE_FILE = os.getenv('DAEMON_STATE_FILE', 'scheduler_state.json')
+TICK_SECONDS = 15
+# Listing runs are written as NDJSON so the daemon can measure how much of each catalog changed
+os.environ.setdefault('NDJSON_OUTPUT_DIR', 'runs')
+RUNS_DIR = os.environ['NDJSON_OUTPUT_DIR']
+# Spawned (not forked) workers import the scrapers fresh, with the environment above
+MP = mp.get_context("spawn")
+
+# A catalog where this fraction of titles is new on each run keeps its base interval;
+# busier catalogs are scheduled more often, quieter ones less (within the factor bounds).
+TARGET_CHANGE = 0.02
+MIN_FACTOR, MAX_FACTOR = 0.25, 7.0
+CHANGE_EWMA = 0.3
+
+JOBS = [
+    # name, module, kind, site (one run per site at a time), base interval, time budget
+    {"name": "bet365", "module": "Bet365CLI1", "kind": "listing", "site": "casino.bet365.com", "every_hours": 24, "budget_minutes": 60},
+    {"name": "betsson", "module": "BetssonCLI1", "kind": "listing", "site": "ge.betsson.com", "every_hours": 24, "budget_minutes": 60},
+    {"name": "bitstarz", "module": "BitStarzCLI1", "kind": "listing", "site": "bitstarz.com", "every_hours": 24, "budget_minutes": 60},
+    {"name": "casinogrounds", "module": "CasinoGroundsCLI1", "kind": "listing", "site": "casinogrounds.com", "every_hours": 24, "budget_minutes": 60},
+    {"name": "casumo", "module": "CasumoCLI1", "kind": "listing", "site": "casumo.com", "every_hours": 24, "budget_minutes": 30},
+    {"name": "cloudbet", "module": "CloudbetCLI1", "kind": "listing", "site": "cloudbet.com", "every_hours": 24, "budget_minutes": 60},
+    {"name": "duelbits", "module": "DuelbitsCLI1", "kind": "listing", "site": "duelbits.com", "every_hours": 24, "budget_minutes": 60},
+    {"name": "jackbit", "module": "JackbitCLI1", "kind": "listing", "site": "jackbit.com", "every_hours": 24, "budget_minutes": 60},
+    {"name": "mrgreen", "module": "MrGreenCLI1", "kind": "listing", "site": "mrgreen.com", "every_hours": 24, "budget_minutes": 30},
+    {"name": "playojo", "module": "PlayOjoCLI1", "kind": "listing", "site": "playojo.com", "every_hours": 24, "budget_minutes": 60},
+    {"name": "roobet", "module": "RoobetCLI1", "kind": "listing", "site": "roobet.com", "every_hours": 24, "budget_minutes": 60},
+    {"name": "sportsbet", "module": "SportBetCLI1", "kind": "listing", "site": "sportsbet.io", "every_hours": 24, "budget_minutes": 60},
+    {"name": "stake", "module": "StakeCLI1", "kind": "listing", "site": "stake.com", "every_hours": 24, "budget_minutes": 60},
+    {"name": "veikkaus", "module": "VeikkausCLI1", "kind": "listing", "site": "veikkaus.fi", "every_hours": 24, "budget_minutes": 60},
+    {"name": "bcgame", "module": "bcGameCLI1", "kind": "listing", "site": "bc.game", "every_hours": 24, "budget_minutes": 120},
+    {"name": "stake-details", "module": "StakeCLI2", "kind": "detail", "site": "stake.com", "every_hours": 24, "budget_minutes": 360},
+    {"name": "sportsbet-details", "module": "SportBetCLI2", "kind": "detail", "site": "sportsbet.io", "every_hours": 24, "budget_minutes": 360},
+    {"name": "slot-updater", "module": "slot_updater", "kind": "detail", "site": "sportsbet.io", "every_hours": 12, "budget_minutes": 120},
+]
+
+
+def worker_main(inbox, results):
+    """Long-lived worker: the interpreter and every scraper module stay imported between jobs."""
+    # Own process group, so Worker.kill() also reaches the Playwright driver and any local Chromium
+    os.setsid()
+    while True:
+        job = inbox.get()
+        if job is None:
+            return
+        os.environ[BROWSER_WS_ENV] = job["ws_endpoint"]
+        started = time.time()
+        result = {"name": job["name"], "ok": True, "error": None, "casino_name": None}
+        try:
+            module = importlib.import_module(job["module"])
+            result["casino_name"] = getattr(module, "CASINO_NAME", None)
+            module.run()
+        except BaseException as e:
+            result.update(ok=False, error=str(e)[:200])
+        result["duration"] = time.time() - started
+        results.put(result)
+
+
+class Worker:
+    def __init__(self, results):
+        self.inbox = MP.Queue()
+        self.process = MP.Process(target=worker_main, args=(self.inbox, results), daemon=True)
+        self.process.start()
+        self.job = None
+        self.started = None
+
+    def kill(self):
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        self.process.join()
+
+
+def load_state():
+    if os.path.exists(STATE_FILE):
+        with open(STATE_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+
+def save_state(state):
+    tmp_path = f"{STATE_FILE}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, STATE_FILE)
+
+
+def catalog_change(casino_name):
+    """
+    Fraction of titles in the latest complete run that weren't in the previous complete one.
+    Runs that stopped at a listing frontier only hold the newest part of the catalog, so they are skipped.
+    """
+    casino_dir = os.path.join(RUNS_DIR, casino_slug(casino_name))
+    if not os.path.isdir(casino_dir):
+        return None
+    runs = sorted(name for name in os.listdir(casino_dir)
+                  if name.endswith(".ndjson") and not name.endswith(INCOMPLETE_SUFFIX))
+    if len(runs) < 2:
+        return None
+    latest, previous = ({r.get("title") for r in iter_records(os.path.join(casino_dir, name))}
+                        for name in runs[-2:][::-1])
+    return len(latest - previous) / max(1, len(latest))
+
+
+def interval_seconds(job, job_state):
+    factor = 1.0
+    rate = job_state.get("change_rate")
+    if job["kind"] == "listing" and rate is not None:
+        factor = min(MAX_FACTOR, max(MIN_FACTOR, TARGET_CHANGE / max(rate, 1e-3)))
+    return job["every_hours"] * 3600 * factor
+
+
+def run():
+    state = load_state()
+    # Reuse servers from browser_server.py when PW_BROWSER_WS points at them, else own a set
+    shared = browser_endpoints()
+    servers = ([(None, ws) for ws in shared] if shared else
+               [start_browser_server(headless=IS_HEADLESS) for _ in range(BROWSER_SERVERS)])
+    for _, ws_endpoint in servers:
+        print(f"[Daemon] Warm browser at {ws_endpoint}")
+
+    results = MP.Queue()
+    workers = [Worker(results) for _ in range(WORKERS)]
+    dispatched = 0
+
+    try:
+        while True:
+            now = time.time()
+
+            # 1. Collect finished jobs
+            while not results.empty():
+                result = results.get()
+                job = next(j for j in JOBS if j["name"] == result["name"])
+                job_state = state.setdefault(job["name"], {})
+                job_state.update(last_end=now, last_ok=result["ok"], last_error=result["error"],
+                                 last_duration=round(result["duration"]))
+                if job["kind"] == "listing" and result["casino_name"]:
+                    change = catalog_change(result["casino_name"])
+                    if change is not None:
+                        old = job_state.get("change_rate", change)
+                        job_state["change_rate"] = round(CHANGE_EWMA * change + (1 - CHANGE_EWMA) * old, 4)
+                print(f"[Daemon] {job['name']} finished ({'ok' if result['ok'] else result['error']}) "
+                      f"in {result['duration']:.0f}s, change rate {job_state.get('change_rate')}")
+                for worker in workers:
+                    if worker.job is job:
+                        worker.job = None
+                save_state(state)
+
+            # 2. Enforce time budgets: the only safe way to stop a stuck Playwright job is to kill its process
+            for i, worker in enumerate(workers):
+                if worker.job and now - worker.started > worker.job["budget_minutes"] * 60:
+                    print(f"[Daemon] {worker.job['name']} exceeded its {worker.job['budget_minutes']} min budget, killing.")
+                    state.setdefault(worker.job["name"], {}).update(last_end=now, last_ok=False, last_error="budget exceeded")
+                    worker.kill()
+                    workers[i] = Worker(results)
+                    save_state(state)
+
+            # 3. Restart browser servers that died
+            for i, (process, _) in enumerate(servers):
+                if process and process.poll() is not None:
+                    print("[Daemon] Browser server exited, restarting.")
+                    stop_browser_server(process)
+                    servers[i] = start_browser_server(headless=IS_HEADLESS)
+
+            # 4. Dispatch due jobs, most overdue (relative to their interval) first, one run per site
+            busy_sites = {w.job["site"] for w in workers if w.job}
+            running = {w.job["name"] for w in workers if w.job}
+            due = []
+            for job in JOBS:
+                job_state = state.get(job["name"], {})
+                interval = interval_seconds(job, job_state)
+                overdue = (now - job_state.get("last_start", 0)) / interval
+                if overdue >= 1 and job["name"] not in running:
+                    due.append((overdue, job))
+            due.sort(key=lambda item: -item[0])
+
+            for _, job in due:
+                idle = next((w for w in workers if not w.job), None)
+                if not idle:
+                    break
+                if job["site"] in busy_sites:
+                    continue
+                ws_endpoint = servers[dispatched % len(servers)][1]
+                dispatched += 1
+                idle.job, idle.started = job, now
+                idle.inbox.put({**job, "ws_endpoint": ws_endpoint})
+                busy_sites.add(job["site"])
+                state.setdefault(job["name"], {})["last_start"] = now
+                print(f"[Daemon] Starting {job['name']} ({job['kind']})")
+                save_state(state)
+
+            time.sleep(TICK_SECONDS)
+    except KeyboardInterrupt:
+        print("[Daemon] Shutting down...")
+    finally:
+        for worker in workers:
+            worker.kill()
+        for process, _ in servers:
+            if process:
+                stop_browser_server(process)
+        save_state(state)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,114 @@
+import os
+import time
+
+# --- CONFIGURATION ---
+MIN_STEP = 400  # px per scroll; the most is one viewport, so no card is scrolled past unseen
+MAX_STEPS = int(os.getenv('SCROLL_MAX_STEPS', 500))  # hard stop, whatever the page keeps doing
+INITIAL_WAIT = float(os.getenv('SCROLL_INITIAL_WAIT', 3.0))  # s, until a few load times are measured
+MIN_WAIT, MAX_WAIT = 0.5, 15.0
+LATENCY_SAMPLES = 50
+
+_MEASURE_JS = """
+(sel) => {
+    const doc = document.scrollingElement || document.documentElement;
+    return {count: document.querySelectorAll(sel).length, height: doc.scrollHeight, y: window.scrollY,
+            viewport: window.innerHeight, bottom: window.scrollY + window.innerHeight >= doc.scrollHeight - 50};
+}
+"""
+# Two animation frames (the scroll is applied and what it revealed rendered), 100ms at most when
+# frames are throttled
+_SETTLE_JS = "() => new Promise(r => { requestAnimationFrame(() => requestAnimationFrame(r)); setTimeout(r, 100); })"
+_GROWN_JS = """
+(args) => {
+    const doc = document.scrollingElement || document.documentElement;
+    return document.querySelectorAll(args.sel).length > args.count || doc.scrollHeight > args.height;
+}
+"""
+
+
+class ScrollDriver:
+    """
+    Infinite-scroll stepping that learns from the page instead of fixed px / sleep / attempt counts.
+
+    A scroll that leaves more than a viewport of page below only waits for the next frame; one that
+    ends near the bottom waits in the page until the card count or document height grows, and
+    records how long that took. The wait for the next step is twice the 95th percentile of those
+    load times, so a step that sees no growth within it is almost certainly at the real end.
+    Steps grow while they only pass over cards we already have and shrink when they pay off, but
+    never beyond one viewport. advance() returns False once the bottom is reached with no growth
+    and no new cards `misses_needed` times in a row, or after max_steps steps.
+    """
+
+    def __init__(self, page, item_selector, step=1200, wheel=True, max_steps=MAX_STEPS):
+        self.page = page
+        self.item_selector = item_selector
+        self.step_px = step
+        self.wheel = wheel
+        self.max_steps = max_steps
+        self.latencies = []
+        self.misses = 0
+        self.steps = 0
+
+    @property
+    def wait_seconds(self):
+        if len(self.latencies) < 3:
+            return INITIAL_WAIT
+        ordered = sorted(self.latencies)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        return min(MAX_WAIT, max(MIN_WAIT, 2 * p95))
+
+    @property
+    def misses_needed(self):
+        # One extra confirmation while the load-time estimate is still rough
+        return 2 if len(self.latencies) >= 5 else 3
+
+    def _measure(self):
+        return self.page.evaluate(_MEASURE_JS, self.item_selector)
+
+    def advance(self, new_cards):
+        """Reports how many new cards the last extraction found, scrolls, and waits for growth near the bottom."""
+        self.steps += 1
+        before = self._measure()
+        if new_cards:
+            self.misses = 0
+            self.step_px = int(self.step_px * 0.9)
+        else:
+            self.step_px = int(self.step_px * 1.5)
+        self.step_px = max(MIN_STEP, min(before["viewport"], self.step_px))
+
+        if self.wheel:
+            self.page.mouse.wheel(0, self.step_px)
+        else:
+            self.page.evaluate(f"window.scrollBy(0, {self.step_px})")
+
+        started = time.monotonic()
+        self.page.evaluate(_SETTLE_JS)
+        after = self._measure()
+        # Mid-page the cards below are already there; only the end of the page loads more
+        near_bottom = after["y"] + 2 * after["viewport"] >= after["height"] or after["y"] == before["y"]
+        grown = False
+        if near_bottom:
+            try:
+                self.page.wait_for_function(_GROWN_JS, arg={"sel": self.item_selector, **before},
+                                            timeout=self.wait_seconds * 1000, polling=100)
+                grown = True
+                self.latencies = (self.latencies + [time.monotonic() - started])[-LATENCY_SAMPLES:]
+            except Exception:
+                pass
+            after = self._measure()
+
+        stuck = after["bottom"] or after["y"] == before["y"]
+        if not grown and not new_cards and stuck:
+            self.misses += 1
+            print(f"   [Scroll] No growth at the bottom ({self.misses}/{self.misses_needed}, waited {self.wait_seconds:.1f}s)")
+        if self.steps >= self.max_steps:
+            print(f"   [Scroll] Stopping after {self.steps} steps (max_steps).")
+            return False
+        return self.misses < self.misses_needed
+
+    def scroll_to_end(self):
+        """Scrolls until the page stops growing, e.g. to reveal a Load more button."""
+        self.misses = self.steps = 0
+        while self.advance(0):
+            pass
+        self.misses = self.steps = 0
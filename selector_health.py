@@ -0,0 +1,134 @@
+import os
+import json
+import time
+import fcntl
+from host_pacing import host_of, is_challenge
+
+# --- CONFIGURATION ---
+HEALTH_DIR = os.getenv('SELECTOR_HEALTH_DIR', 'selector_health')
+PROBE_TIMEOUT = int(os.getenv('SELECTOR_PROBE_TIMEOUT', 10000))
+# A site is broken when at least BROKEN_RATIO of its last BROKEN_WINDOW checks missed, once there are
+# BROKEN_MIN_CHECKS of them: a few removed or stat-less games shouldn't take the whole host out
+BROKEN_WINDOW = int(os.getenv('SELECTOR_BROKEN_WINDOW', 20))
+BROKEN_MIN_CHECKS = int(os.getenv('SELECTOR_BROKEN_MIN_CHECKS', 10))
+BROKEN_RATIO = float(os.getenv('SELECTOR_BROKEN_RATIO', 0.8))
+RECHECK_HOURS = float(os.getenv('SELECTOR_RECHECK_HOURS', 6))
+
+_sites = {}
+
+
+class SelectorHealth:
+    """
+    Fail-fast selector checks for one site, persisted in HEALTH_DIR/<site>.json and guarded by flock
+    so every scraper process working on the site shares one miss count.
+
+    find() waits once for any of the given variants (remembered working one first), with a short
+    timeout, and remembers which variant matched. Only a miss on a real page (a 200 that isn't a
+    challenge) counts: blocks and outages say nothing about the markup. Once BROKEN_RATIO of the
+    recent checks missed the site is marked broken; broken() then stays True for RECHECK_HOURS so
+    callers skip it instead of timing out again, after which a single probe is allowed through.
+    """
+
+    def __init__(self, site):
+        self.site = site
+        self.path = os.path.join(HEALTH_DIR, f"{site}.json")
+        os.makedirs(HEALTH_DIR, exist_ok=True)
+
+    @staticmethod
+    def _parse(raw):
+        try:
+            return json.loads(raw) if raw.strip() else None
+        except ValueError:
+            return None
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                fcntl.flock(f, fcntl.LOCK_SH)
+                try:
+                    state = self._parse(f.read())
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+        except OSError:
+            state = None
+        return state or self._empty()
+
+    @staticmethod
+    def _empty():
+        # checks: 1 for a miss, 0 for a hit, newest last
+        return {"preferred": {}, "checks": [], "broken_at": None}
+
+    def _update(self, fn):
+        with open(self.path, "a+", encoding="utf-8") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                state = self._parse(f.read()) or self._empty()
+                state.setdefault("checks", [])
+                result = fn(state)
+                f.seek(0)
+                f.truncate()
+                json.dump(state, f, indent=2)
+                f.flush()
+                return result
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def broken(self):
+        broken_at = self._load().get("broken_at")
+        return bool(broken_at) and time.time() - broken_at < RECHECK_HOURS * 3600
+
+    def find(self, page, key, variants, response, timeout=PROBE_TIMEOUT):
+        """
+        Returns the first variant present on the page, or None after `timeout` ms.
+        `response` is what page.goto() returned for the page being checked.
+        """
+        preferred = self._load()["preferred"].get(key)
+        ordered = [preferred] + [v for v in variants if v != preferred] if preferred in variants else list(variants)
+        try:
+            # One wait for the union of all variants instead of a full timeout per variant
+            page.wait_for_selector(", ".join(ordered), timeout=timeout)
+            selector = next(v for v in ordered if page.query_selector(v))
+        except Exception:
+            status = response.status if response else None
+            if status == 200 and not is_challenge(page):
+                self.miss(key)
+            else:
+                print(f"   [Selectors] {self.site}: '{key}' not found on a "
+                      f"{'challenge page' if status == 200 else f'{status} response'}, not counted")
+            return None
+
+        if selector != preferred:
+            print(f"   [Selectors] {self.site}: '{key}' matched by {selector}")
+
+        def found(state):
+            state["preferred"][key] = selector
+            if state.get("broken_at"):
+                # The probe after a broken spell passed: the markup is back, forget the old misses
+                state["checks"] = []
+            state["checks"] = (state["checks"] + [0])[-BROKEN_WINDOW:]
+            state["broken_at"] = None
+
+        self._update(found)
+        return selector
+
+    def miss(self, key):
+        def count(state):
+            state["checks"] = (state["checks"] + [1])[-BROKEN_WINDOW:]
+            checks = state["checks"]
+            tripped = len(checks) >= BROKEN_MIN_CHECKS and sum(checks) >= BROKEN_RATIO * len(checks)
+            if tripped:
+                state["broken_at"] = time.time()
+            return sum(checks), len(checks), tripped
+
+        misses, checks, tripped = self._update(count)
+        print(f"   [Selectors] {self.site}: '{key}' not found ({misses} of the last {checks} checks missed)")
+        if tripped:
+            print(f"   [Selectors] {self.site} marked broken for {RECHECK_HOURS:g}h, markup probably changed.")
+
+
+def health_for(url):
+    site = host_of(url)
+    if site not in _sites:
+        _sites[site] = SelectorHealth(site)
+    return _sites[site]
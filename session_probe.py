@@ -0,0 +1,164 @@
+import os
+import json
+import time
+import threading
+from playwright.sync_api import sync_playwright
+from playwright_stealth import Stealth
+from browser_pool import HAR_MODE, open_context
+
+# --- CONFIGURATION ---
+PROBE_EVERY = int(os.getenv('SESSION_PROBE_EVERY', 25))  # slots between periodic probes
+PROBE_TIMEOUT = int(os.getenv('SESSION_PROBE_TIMEOUT', 15000))
+# Re-login in the background once the earliest auth cookie expires within this many seconds
+REFRESH_MARGIN = int(os.getenv('SESSION_REFRESH_MARGIN', 3600))
+LOGIN_WAIT_TIMEOUT = int(os.getenv('SESSION_LOGIN_WAIT', 300))
+PROBE_BLOCKED = ("image", "media", "font")
+
+
+def state_expiry(state_file, cookie_domain, cookie_names):
+    """
+    Earliest expiry (unix time) of the auth cookies `cookie_names` for cookie_domain, or None.
+    Other cookies are ignored: bot-protection ones like __cf_bm live for minutes and say nothing
+    about the login.
+    """
+    try:
+        with open(state_file, encoding="utf-8") as f:
+            cookies = json.load(f).get("cookies", [])
+    except (OSError, ValueError):
+        return None
+    expiries = [c["expires"] for c in cookies
+                if c.get("name") in cookie_names and c.get("expires", -1) > 0
+                and cookie_domain in c.get("domain", "")]
+    return min(expiries) if expiries else None
+
+
+class SessionKeeper:
+    """
+    Keeps a storage_state login alive during a long detail run.
+
+    probe() asks probe_request(context) when the site has a cheap authenticated request to check
+    (an API call through context.request, sharing the context's cookies); otherwise it opens a
+    throwaway page with images, media and fonts blocked and checks for a logged-in marker (or the
+    absence of a logged-out one). When a probe fails or the cookies are about to expire,
+    login_fn(p, state_path) runs in a background thread with its own Playwright instance and
+    writes a fresh state file; the main loop swaps to a new context between slots via maintain().
+    Expiry is only tracked for the named auth_cookies; without any, probes alone catch a lost login.
+    context_name is the open_context() name; each refreshed context records/replays its own numbered HAR.
+    """
+
+    def __init__(self, state_file, login_fn, probe_url, cookie_domain, context_name, auth_cookies=(),
+                 logged_in_selector=None, logged_out_selector=None, context_options=None, probe_request=None):
+        self.state_file = state_file
+        self.login_fn = login_fn
+        self.probe_url = probe_url
+        self.cookie_domain = cookie_domain
+        self.context_name = context_name
+        self.auth_cookies = set(auth_cookies)
+        self.logged_in_selector = logged_in_selector
+        self.logged_out_selector = logged_out_selector
+        self.context_options = context_options or {}
+        self.probe_request = probe_request
+        self.processed = 0
+        self._thread = None
+        self._ready = threading.Event()
+        self._ok = False
+
+    def probe(self, context):
+        # context.request bypasses the HAR routes, so a replay run checks the recorded page instead
+        if self.probe_request and HAR_MODE != "replay":
+            try:
+                return bool(self.probe_request(context))
+            except Exception:
+                return False
+
+        page = context.new_page()
+        Stealth().apply_stealth_sync(page)
+        # Only the markup decides, so skip the heavy part of the page
+        page.route("**/*", lambda route: route.abort() if route.request.resource_type in PROBE_BLOCKED
+                   else route.fallback())
+        try:
+            page.goto(self.probe_url, wait_until="domcontentloaded", timeout=60000)
+            if self.logged_in_selector:
+                page.wait_for_selector(self.logged_in_selector, timeout=PROBE_TIMEOUT)
+                return True
+            # Only a logged-out marker is known: give it a few seconds to show up
+            try:
+                page.wait_for_selector(self.logged_out_selector, timeout=5000)
+                return False
+            except Exception:
+                return True
+        except Exception:
+            return False
+        finally:
+            page.close()
+
+    def expiring(self):
+        expiry = state_expiry(self.state_file, self.cookie_domain, self.auth_cookies)
+        return expiry is not None and expiry - time.time() < REFRESH_MARGIN
+
+    def _login_worker(self):
+        tmp_state = f"{self.state_file}.refresh"
+        try:
+            # The sync API is per thread, so the background login gets its own driver
+            with sync_playwright() as p:
+                ok = self.login_fn(p, tmp_state)
+            if ok:
+                os.replace(tmp_state, self.state_file)
+            # Only now, so a waiter never swaps to the old file
+            self._ok = ok
+        except Exception as e:
+            print(f"[Session] Background login failed: {e}")
+            self._ok = False
+        finally:
+            self._ready.set()
+
+    def start_refresh(self):
+        if self._thread and self._thread.is_alive():
+            return
+        print("[Session] Refreshing login in the background...")
+        self._ready.clear()
+        self._ok = False
+        self._thread = threading.Thread(target=self._login_worker, daemon=True)
+        self._thread.start()
+
+    def swap(self, browser, context, page):
+        """Opens a context on the fresh state file and closes the old one."""
+        new_context = open_context(browser, self.context_name, storage_state=self.state_file,
+                                   **self.context_options)
+        new_page = new_context.new_page()
+        Stealth().apply_stealth_sync(new_page)
+        context.close()
+        self._thread = None
+        print("[Session] Switched to refreshed session.")
+        return new_context, new_page
+
+    def maintain(self, browser, context, page):
+        """Call before every slot. Returns the (possibly new) context and page to use."""
+        self.processed += 1
+
+        if self._thread and self._ready.is_set():
+            if self._ok:
+                return self.swap(browser, context, page)
+            self._thread = None
+
+        if self._thread is None:
+            if self.expiring():
+                self.start_refresh()
+            elif self.processed % PROBE_EVERY == 0 and not self.probe(context):
+                print("[Session] Periodic probe failed.")
+                return self.recover(browser, context, page)
+        return context, page
+
+    def recover(self, browser, context, page):
+        """The session is gone: wait for a re-login and swap, so the caller can retry its slot."""
+        self.start_refresh()
+        finished = self._ready.wait(LOGIN_WAIT_TIMEOUT)
+        if not self._ok:
+            if finished:
+                print("[Session] Re-login did not succeed, continuing with the old session.")
+                self._thread = None
+            else:
+                # Keep the thread: maintain() swaps once it finishes, and no second login starts meanwhile
+                print("[Session] Re-login still running, continuing with the old session for now.")
+            return context, page
+        return self.swap(browser, context, page)
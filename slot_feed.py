@@ -0,0 +1,112 @@
+import os
+import json
+import threading
+import requests
+from detail_priority import BUDGET
+
+# --- CONFIGURATION ---
+PAGE_SIZE = int(os.getenv('SLOT_FEED_PAGE_SIZE', 500))
+CHUNK_BYTES = 64 * 1024
+
+
+def iter_json_array(chunks):
+    """Yields the elements of a top-level JSON array as its text arrives, without loading it whole."""
+    decoder = json.JSONDecoder()
+    buf, started = "", False
+    for chunk in chunks:
+        buf += chunk
+        pos = 0
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buf):
+                break
+            if not started:
+                if buf[pos] != "[":
+                    raise ValueError("response is not a JSON array")
+                started, pos = True, pos + 1
+                continue
+            if buf[pos] == "]":
+                return
+            try:
+                item, pos_end = decoder.raw_decode(buf, pos)
+            except ValueError:
+                break  # element not complete yet
+            yield item
+            pos = pos_end
+        buf = buf[pos:]
+
+
+def iter_slots(url, per_page=PAGE_SIZE):
+    """
+    Slots from the API one at a time. A Laravel paginator response ({"data": [...], ...}) is followed
+    page by page; a plain array (endpoint without pagination) is parsed incrementally as it streams.
+    """
+    page = 1
+    while True:
+        response = requests.post(url, params={"page": page, "per_page": per_page}, stream=True, timeout=(10, 120))
+        response.raise_for_status()
+        response.encoding = response.encoding or "utf-8"
+        chunks = response.iter_content(CHUNK_BYTES, decode_unicode=True)
+        first = next(chunks, "")
+        if first.lstrip()[:1] != "{":
+            yield from iter_json_array(_chain(first, chunks))
+            return
+
+        body = json.loads(first + "".join(chunks))
+        yield from body.get("data", [])
+        meta = body.get("meta", body)
+        last_page = meta.get("last_page")
+        if not body.get("data") or not (body.get("next_page_url") or (last_page and page < last_page)):
+            return
+        page += 1
+
+
+def _chain(first, rest):
+    yield first
+    yield from rest
+
+
+class SlotFeed:
+    """
+    Fetches a detail job's slot list in a background thread while the browser starts, logs in and
+    warms up. Iterating yields the most important slot that has arrived so far (per the job's
+    DetailQueue), blocking only while nothing is there yet, up to `budget` slots (None = all of them).
+    """
+
+    def __init__(self, url, queue, budget=BUDGET):
+        self.url = url
+        self.queue = queue
+        self.budget = budget
+        self.pending = []
+        self.received = 0
+        self.done = False
+        self._cond = threading.Condition()
+        threading.Thread(target=self._fetch, daemon=True).start()
+
+    def _fetch(self):
+        try:
+            for slot in iter_slots(self.url):
+                with self._cond:
+                    self.pending.append(slot)
+                    self.received += 1
+                    self._cond.notify()
+        except Exception as e:
+            print(f"[Feed] Slot list fetch failed: {e}")
+        finally:
+            with self._cond:
+                self.done = True
+                self._cond.notify_all()
+            print(f"[Feed] {self.received} slots received.")
+
+    def __iter__(self):
+        served = 0
+        while self.budget is None or served < self.budget:
+            with self._cond:
+                while not self.pending and not self.done:
+                    self._cond.wait()
+                if not self.pending:
+                    return
+                slot = self.queue.take_best(self.pending)
+            served += 1
+            yield slot
@@ -0,0 +1,222 @@
+import os
+import re
+import sys
+import time
+import hashlib
+import unicodedata
+from collections import Counter, defaultdict
+import numpy as np
+from scipy import sparse
+from ndjson_store import iter_records
+
+# --- CONFIGURATION ---
+NGRAM_SIZE = int(os.getenv('IDENTITY_NGRAM', 3))
+SIMILARITY_THRESHOLD = float(os.getenv('IDENTITY_THRESHOLD', 0.75))
+# Rows per sparse matmul; keeps the similarity block in memory for very large providers
+CHUNK_ROWS = int(os.getenv('IDENTITY_CHUNK_ROWS', 2000))
+
+# Casinos rebrand popular games with their own name ("Gates of Sportsbet 1000"),
+# so these tokens become a wildcard when matching titles.
+BRAND_TOKENS = {
+    "sportsbet", "stake", "roobet", "duelbits", "bcgame", "jackbit", "cloudbet", "bitstarz",
+    "casumo", "mrgreen", "playojo", "ojo", "betsson", "bet365", "veikkaus", "casinogrounds",
+}
+TITLE_STOPWORDS = {"slot", "slots", "game", "tm"}
+# Suffixes providers are listed with inconsistently across casinos ("Pragmatic Play" vs "pragmaticexternal")
+PROVIDER_SUFFIXES = ("external", "gaming", "games", "studios", "studio", "entertainment",
+                     "interactive", "group", "ltd", "play")
+UNKNOWN_PROVIDERS = {"", "unknown", "na", "n/a"}
+
+_camel_re = re.compile(r'(?<=[a-z])(?=[A-Z])|(?<=[A-Za-z])(?=\d)|(?<=\d)(?=[A-Za-z])')
+_non_alnum_re = re.compile(r'[^a-z0-9]+')
+
+
+def strip_accents(text):
+    return "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+
+
+def normalize_provider(provider):
+    """'Pragmatic Play' / 'pragmaticexternal' / 'Pragmatic' -> 'pragmatic'. Returns None when unknown."""
+    if not provider:
+        return None
+    text = _non_alnum_re.sub("", strip_accents(provider).lower())
+    changed = True
+    while changed:
+        changed = False
+        for suffix in PROVIDER_SUFFIXES:
+            if text.endswith(suffix) and len(text) > len(suffix):
+                text = text[:-len(suffix)]
+                changed = True
+    if text in UNKNOWN_PROVIDERS or text in BRAND_TOKENS:
+        return None
+    return text
+
+
+def title_tokens(title, provider=None):
+    """Tokenized title with casino brand names replaced by a '*' wildcard."""
+    text = _camel_re.sub(" ", strip_accents(title or ""))
+    tokens = _non_alnum_re.sub(" ", text.lower()).split()
+    # Duelbits/Roobet style slugs carry the provider as the first token
+    if provider and tokens and normalize_provider(tokens[0]) == provider:
+        tokens = tokens[1:]
+    return ["*" if t in BRAND_TOKENS else t for t in tokens if t not in TITLE_STOPWORDS]
+
+
+def normalize_title(title, provider=None):
+    """
+    'Starlight Princess™' -> 'starlight princess', 'pragmaticexternal-Sweet-Bonanza1000' -> 'sweet bonanza 1000',
+    'Gates of Sportsbet 1000' -> 'gates of 1000'.
+    """
+    return " ".join(t for t in title_tokens(title, provider) if t != "*")
+
+
+def char_ngrams(text):
+    padded = f" {text} "
+    return {padded[i:i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1)}
+
+
+def build_matrix(titles):
+    """Binary char n-gram TF-IDF matrix, rows L2-normalized so X @ X.T is cosine similarity."""
+    vocab = {}
+    indices, indptr = [], [0]
+    for title in titles:
+        for gram in char_ngrams(title):
+            indices.append(vocab.setdefault(gram, len(vocab)))
+        indptr.append(len(indices))
+
+    indices = np.asarray(indices, dtype=np.int32)
+    data = np.ones(len(indices), dtype=np.float32)
+    matrix = sparse.csr_matrix((data, indices, np.asarray(indptr)), shape=(len(titles), len(vocab)))
+
+    df = np.bincount(indices, minlength=len(vocab))
+    idf = np.log((1 + len(titles)) / (1 + df)).astype(np.float32) + 1
+    matrix = matrix @ sparse.diags(idf)
+
+    norms = np.sqrt(matrix.multiply(matrix).sum(axis=1)).A1
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms) @ matrix
+
+
+def candidate_pairs(matrix, rows, cols):
+    """Yields (i, j) global index pairs with cosine >= threshold between the row set and the col set."""
+    cols = np.asarray(cols)
+    right = matrix[cols].T.tocsc()
+    for start in range(0, len(rows), CHUNK_ROWS):
+        chunk = np.asarray(rows[start:start + CHUNK_ROWS])
+        sims = (matrix[chunk] @ right).tocoo()
+        keep = sims.data >= SIMILARITY_THRESHOLD
+        left, right_idx = chunk[sims.row[keep]], cols[sims.col[keep]]
+        mask = left < right_idx
+        yield from zip(left[mask].tolist(), right_idx[mask].tolist())
+
+
+def branded_pairs(tokens, providers):
+    """
+    'Gates of Sportsbet 1000' is too far from 'Gates of Olympus 1000' by n-grams, so branded titles
+    are matched positionally instead: same provider, same length, every non-brand token equal.
+    A branded title is only linked when exactly one distinct unbranded title fits ('Book of Stake'
+    fits both 'Book of Dead' and 'Book of Shadows', so it stays on its own); identical branded
+    titles from different casinos are linked to each other.
+    """
+    patterns = defaultdict(list)
+    for i, toks in enumerate(tokens):
+        if "*" in toks:
+            continue
+        for pos in range(len(toks)):
+            patterns[(providers[i], tuple(toks[:pos]) + ("*",) + tuple(toks[pos + 1:]))].append(i)
+
+    same_branded = {}
+    for i, toks in enumerate(tokens):
+        if "*" not in toks:
+            continue
+        key = (providers[i], tuple(toks))
+        if key in same_branded:
+            yield same_branded[key], i
+        else:
+            same_branded[key] = i
+        if toks.count("*") == 1:
+            matches = patterns.get(key, [])
+            if len({tuple(tokens[j]) for j in matches}) == 1:
+                for j in matches:
+                    yield min(i, j), max(i, j)
+
+
+def find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def resolve(records):
+    """Returns a canonical game id per record, in input order."""
+    providers = [normalize_provider(r.get("provider")) for r in records]
+    tokens = [title_tokens(r.get("title"), p) for r, p in zip(records, providers)]
+    titles = [" ".join(t for t in toks if t != "*") for toks in tokens]
+    # Branded titles are linked by branded_pairs() only: with the brand dropped, n-grams would tie
+    # 'Book of Stake' to every 'Book of ...' and let it bridge them into one game
+    branded = ["*" in toks for toks in tokens]
+    # "Sugar Rush" and "Sugar Rush 1000" are close by n-grams but different games
+    numbers = [frozenset(re.findall(r'\d+', t)) for t in titles]
+
+    matrix = build_matrix(titles)
+
+    # Blocking: only compare rows from the same provider; rows without one are compared to everything
+    blocks = defaultdict(list)
+    for i, provider in enumerate(providers):
+        blocks[provider].append(i)
+    unknown = blocks.pop(None, [])
+
+    parent = list(range(len(records)))
+    pair_sources = [candidate_pairs(matrix, block, block) for block in blocks.values()]
+    if unknown:
+        everything = list(range(len(records)))
+        pair_sources.append(candidate_pairs(matrix, unknown, everything))
+        pair_sources.append(candidate_pairs(matrix, everything, unknown))
+
+    pair_sources = [((i, j) for i, j in pairs if not (branded[i] or branded[j])) for pairs in pair_sources]
+    pair_sources.append(branded_pairs(tokens, providers))
+
+    for pairs in pair_sources:
+        for i, j in pairs:
+            if numbers[i] == numbers[j]:
+                root_i, root_j = find(parent, i), find(parent, j)
+                if root_i != root_j:
+                    parent[root_j] = root_i
+
+    clusters = defaultdict(list)
+    for i in range(len(records)):
+        clusters[find(parent, i)].append(i)
+
+    canonical = [None] * len(records)
+    for members in clusters.values():
+        # The longest of the most common titles keeps "olympus" over the branded "gates of 1000"
+        counts = Counter(titles[i] for i in members)
+        title = max(counts, key=lambda t: (counts[t], len(t)))
+        provider = Counter(providers[i] for i in members if providers[i]).most_common(1)
+        key = f"{provider[0][0] if provider else ''}|{title}"
+        game_id = "g_" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+        for i in members:
+            canonical[i] = game_id
+    return canonical
+
+
+def run():
+    source_file = sys.argv[1] if len(sys.argv) > 1 else "slots_data.json"
+    records = list(iter_records(source_file))
+
+    started = time.perf_counter()
+    ids = resolve(records)
+    elapsed = time.perf_counter() - started
+
+    groups = defaultdict(list)
+    for record, game_id in zip(records, ids):
+        groups[game_id].append(record.get("title"))
+    for game_id, titles in groups.items():
+        if len(titles) > 1:
+            print(f"   [Match] {game_id}: {titles}")
+    print(f">>> {len(records)} rows -> {len(groups)} canonical games in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,193 @@
+import os
+import sys
+import json
+import time
+import tracemalloc
+from dataclasses import dataclass, asdict
+from urllib.parse import urljoin
+from detail_extract import parse_float, parse_int, parse_multiplier
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# --- CONFIGURATION ---
+# Anything outside this range is a parse error (a bet size, a percentage of something else), not an RTP
+RTP_RANGE = (50.0, 100.0)
+VOLATILITY_RANGE = (1, 5)
+UNKNOWN_PROVIDER = "Unknown"
+
+
+class InvalidRecord(ValueError):
+    pass
+
+
+def absolute_url(url, base=None):
+    """'//cdn/x.png' -> 'https://cdn/x.png', '/slots/x' + 'https://a.com' -> 'https://a.com/slots/x'"""
+    if not url:
+        return ""
+    url = url.strip()
+    if url.startswith("//"):
+        return "https:" + url
+    if base and base.startswith("http") and not url.startswith(("http://", "https://", "data:")):
+        return urljoin(base, url)
+    return url
+
+
+def normalize_rtp(value):
+    """'96.50%' / 96.5 / 0.965 -> 96.5; None when it can't be an RTP."""
+    rtp = parse_float(value) if isinstance(value, str) else value
+    if rtp is None:
+        return None
+    rtp = float(rtp)
+    if 0 < rtp <= 1:
+        rtp *= 100
+    rtp = round(rtp, 2)
+    return rtp if RTP_RANGE[0] <= rtp <= RTP_RANGE[1] else None
+
+
+def normalize_multiplier(value):
+    """'5,000x' / 5000.0 -> 5000; None for zero or unparseable."""
+    multiplier = parse_multiplier(value) if isinstance(value, str) else value
+    return int(multiplier) if multiplier and multiplier > 0 else None
+
+
+def normalize_small_int(value, low=1, high=None):
+    number = parse_int(value) if isinstance(value, str) else value
+    if number is None:
+        return None
+    number = int(number)
+    return number if number >= low and (high is None or number <= high) else None
+
+
+@dataclass(slots=True)
+class SlotRecord:
+    """One listing card, as POSTed to /api/slots/sync. Constructing it validates and normalizes."""
+    title: str
+    provider: str
+    url: str
+    avatar: str
+    casino_name: str
+
+    def __post_init__(self):
+        self.title = (self.title or "").strip()
+        if not self.title:
+            raise InvalidRecord("missing title")
+        if not self.casino_name:
+            raise InvalidRecord(f"{self.title}: missing casino_name")
+        self.provider = (self.provider or "").strip() or UNKNOWN_PROVIDER
+        # casino_name is the site URL for most scrapers, so relative game links resolve against it
+        self.url = absolute_url(self.url, self.casino_name)
+        self.avatar = absolute_url(self.avatar, self.url)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get("title"), data.get("provider"), data.get("url"),
+                   data.get("avatar"), data.get("casino_name"))
+
+    def to_dict(self):
+        return {"title": self.title, "provider": self.provider, "url": self.url,
+                "avatar": self.avatar, "casino_name": self.casino_name}
+
+
+@dataclass(slots=True)
+class DetailRecord:
+    """
+    Detail stats for one slot, under the column names of the `slots` table (the names
+    /api/slots/update-details and slot_updater write). Raw strings are parsed on construction;
+    values that fail validation become None instead of being sent.
+    """
+    slot_id: int
+    theoretical_rtp: float = None
+    volatility_level: int = None
+    max_win_multiplier: int = None
+    reels: int = None
+    rows: int = None
+
+    def __post_init__(self):
+        if self.slot_id is None:
+            raise InvalidRecord("missing slot_id")
+        self.slot_id = int(self.slot_id)
+        self.theoretical_rtp = normalize_rtp(self.theoretical_rtp)
+        self.volatility_level = normalize_small_int(self.volatility_level, *VOLATILITY_RANGE)
+        self.max_win_multiplier = normalize_multiplier(self.max_win_multiplier)
+        self.reels = normalize_small_int(self.reels)
+        self.rows = normalize_small_int(self.rows)
+
+    def has_data(self):
+        return any(v is not None for v in (self.theoretical_rtp, self.volatility_level,
+                                           self.max_win_multiplier, self.reels, self.rows))
+
+    def to_payload(self):
+        """Body for /api/slots/update-details; fields we didn't find are left out, not nulled."""
+        return {k: v for k, v in asdict(self).items() if v is not None}
+
+
+def listing_records(slots_data):
+    """Coerces a batch of dicts (or records) to SlotRecords, dropping the ones that don't validate."""
+    records, dropped = [], 0
+    for item in slots_data:
+        if isinstance(item, SlotRecord):
+            records.append(item)
+            continue
+        try:
+            records.append(SlotRecord.from_dict(item))
+        except InvalidRecord:
+            dropped += 1
+    if dropped:
+        print(f"   [Record] Dropped {dropped} invalid record(s)")
+    return records
+
+
+def _default(obj):
+    # Same shape orjson gives dataclasses natively
+    if isinstance(obj, (SlotRecord, DetailRecord)):
+        return asdict(obj)
+    raise TypeError(f"{type(obj).__name__} is not serializable")
+
+
+def dumps(obj):
+    """JSON bytes; orjson when installed (it serializes slotted dataclasses natively)."""
+    if orjson:
+        return orjson.dumps(obj, default=_default)
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def encode_batch(records):
+    """JSON array body for a batch of SlotRecords, byte-compatible with the legacy list of dicts."""
+    return dumps(records)
+
+
+def benchmark(path, batch_size=50, repeat=5):
+    from ndjson_store import iter_records
+    casino_name = os.getenv('BENCH_CASINO_NAME', 'https://sportsbet.io')
+    raw = [{**r, "casino_name": r.get("casino_name", casino_name)} for r in iter_records(path)]
+
+    tracemalloc.start()
+    dicts = [dict(r) for r in raw]
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    tracemalloc.start()
+    records = listing_records(raw)
+    record_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    def timed(encode, items):
+        batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for batch in batches:
+                encode(batch)
+        return (time.perf_counter() - started) * 1000 / repeat
+
+    print(f">>> {len(records)} records from {path}")
+    print(f"   memory   dicts {dict_bytes / len(dicts):8.0f} B/record   SlotRecord {record_bytes / len(records):8.0f} B/record")
+    print(f"   encode   json.dumps(dicts) {timed(lambda b: json.dumps(b).encode('utf-8'), dicts):8.2f} ms   "
+          f"encode_batch(records) {timed(encode_batch, records):8.2f} ms"
+          f"{'' if orjson else '  (orjson not installed)'}")
+    assert json.loads(encode_batch(records)) == [r.to_dict() for r in records]
+
+
+if __name__ == "__main__":
+    benchmark(sys.argv[1] if len(sys.argv) > 1 else "slots_data.json")
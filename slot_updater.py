@@ -1,8 +1,13 @@
 import mysql.connector
-import time
-import re
 from playwright.sync_api import sync_playwright
 from playwright_stealth import Stealth
+from browser_pool import HAR_MODE, launch_browser, open_context, close_browser
+from host_pacing import pacer_for
+from selector_health import health_for
+from detail_priority import BUDGET
+from detail_claims import CLAIM_BATCH, ClaimQueue
+from detail_extract import extract_details
+from slot_record import DetailRecord
 
 # Database Configuration
 DB_CONFIG = {
@@ -12,6 +17,20 @@ DB_CONFIG = {
     'database': 'slot'
 }
 
+# Slot fields the claim query counts as missing when ordering the backlog
+PRIORITY_FIELDS = ['theoretical_rtp', 'volatility_level', 'max_win_multiplier', 'reels', 'rows']
+
+# "Game Stats" section, falling back to the stat labels themselves
+GAME_STATS_SELECTORS = ['span[data-translation="casino.game_stats"]', 'span[data-translation="casino.rtp"]']
+# Labels of the "Game Stats" section; optional ones are skipped when the label isn't rendered
+DETAIL_FIELDS = {
+    'rtp': {'strategy': 'label', 'label': 'casino.rtp', 'numeric': True, 'required': True},
+    'volatility': {'strategy': 'label', 'label': 'casino.volatility', 'numeric': False},
+    'max_win': {'strategy': 'label', 'label': 'casino.max_win', 'numeric': True},
+    'reels': {'strategy': 'label', 'label': 'casino.reels', 'numeric': True},
+    'rows': {'strategy': 'label', 'label': 'casino.rows', 'numeric': True},
+}
+
 def get_volatility_level(text):
     if not text: return 1
     text = text.lower()
@@ -21,7 +40,11 @@ def get_volatility_level(text):
     return 1
 
 
-def update_slot_in_db(slot_id, data):
+def update_slot_in_db(record):
+    if HAR_MODE == "replay":
+        # Replayed pages can be stale, so they never overwrite the database
+        print(f"   [HAR] Replay, not updating slot {record.slot_id}: {record.to_payload()}")
+        return True
     try:
         conn = mysql.connector.connect(**DB_CONFIG)
         cursor = conn.cursor()
@@ -34,21 +57,22 @@ def update_slot_in_db(slot_id, data):
                 `rows` = %s
             WHERE `id` = %s
         """
-        values = (data.get('rtp'), data.get('volatility'), data.get('max_win'),
-                  data.get('reels'), data.get('rows'), slot_id)
+        values = (record.theoretical_rtp, record.volatility_level, record.max_win_multiplier,
+                  record.reels, record.rows, record.slot_id)
         cursor.execute(query, values)
         conn.commit()
         cursor.close()
         conn.close()
         return True
     except Exception as e:
-        print(f"   [DB ERROR] ID {slot_id}: {e}")
+        print(f"   [DB ERROR] ID {record.slot_id}: {e}")
         return False
 
 
 def scrape_slot_details(p, slot_id, url):
-    browser = p.chromium.launch(headless=False)
-    context = browser.new_context(viewport={'width': 1920, 'height': 1080})
+    health = health_for(url)
+    browser = launch_browser(p, headless=False)
+    context = open_context(browser, f"slot-{slot_id}", viewport={'width': 1920, 'height': 1080})
     page = context.new_page()
 
     stealth = Stealth()
@@ -57,101 +81,108 @@ def scrape_slot_details(p, slot_id, url):
     print(f"\n--- Processing ID {slot_id} ---")
     print(f"Target: {url}")
 
-    extracted = {'rtp': 0.0, 'volatility': 1, 'max_win': None, 'reels': None, 'rows': None}
+    reason = "no valid RTP"
 
     try:
-        page.goto(url, wait_until="domcontentloaded", timeout=60000)
+        pacer = pacer_for(url)
+        pacer.wait()
+        try:
+            response = page.goto(url, wait_until="domcontentloaded", timeout=60000)
+        except Exception:
+            pacer.report(error=True)
+            raise
+        pacer.report_response(response, page)
 
         # Wait for the "Game Stats" section to appear
-        try:
-            page.wait_for_selector('span[data-translation="casino.game_stats"]', timeout=15000)
+        if health.find(page, "game_stats", GAME_STATS_SELECTORS, response):
             print(" + Section 'Game Stats' found.")
-        except:
+        else:
             print(" - TIMEOUT: Could not find 'Game Stats' section.")
-            return
-
-        # Give the JS extra time to populate the specific numbers
-        page.wait_for_timeout(4000)
-
-        def get_value_by_label(label_key):
-            try:
-                # Find the span that has the translation attribute
-                label_span = page.locator(f"span[data-translation='{label_key}']").first
-
-                # Go up to the parent div and find the first 'p' tag that follows it
-                # This is the most reliable way based on the Blade template structure
-                val_loc = label_span.locator(
-                    "xpath=./ancestor::div[1]//following-sibling::p | ./parent::div/following-sibling::p").first
-
-                # If that fails, try looking for the text-bulma class in the same container
-                if val_loc.count() == 0:
-                    val_loc = label_span.locator("xpath=./ancestor::div[contains(@class, 'flex')]//p").last
-
-                for _ in range(15):  # Retry loop to wait for JS hydration
-                    raw_text = val_loc.inner_text().strip()
-                    # Log the raw text so we can see what's happening
-                    print(f"   [LOG] Label '{label_key}' raw text: '{raw_text}'")
-
-                    # Check if it's a real value (contains a number) and NOT just a label like 'Casino'
-                    if raw_text and any(char.isdigit() for char in raw_text):
-                        return raw_text
-
-                    page.wait_for_timeout(500)  # Wait 0.5s before retrying
-
-                return None
-            except Exception as e:
-                print(f"   [LOG] Error parsing label '{label_key}': {e}")
-                return None
-
-        # --- Extract RTP ---
-        rtp_raw = get_value_by_label("casino.rtp")
-        if rtp_raw:
-            clean_rtp = re.sub(r'[^\d.]', '', rtp_raw)
-            if clean_rtp:
-                extracted['rtp'] = float(clean_rtp)
-                print(f" + Parsed RTP: {extracted['rtp']}")
+            return False, "game stats section not found"
+
+        # One in-page wait until every stat that has a label on the page holds a real value
+        raw = extract_details(page, DETAIL_FIELDS, timeout=15000)
+        print(f"   [LOG] Raw stats: {raw}")
+
+        # Parsing and range checks (RTP, multiplier, layout) happen in DetailRecord
+        record = DetailRecord(
+            slot_id,
+            theoretical_rtp=raw.get('rtp'),
+            volatility_level=get_volatility_level(raw.get('volatility')),
+            max_win_multiplier=raw.get('max_win'),
+            reels=raw.get('reels'),
+            rows=raw.get('rows'),
+        )
+        if record.theoretical_rtp:
+            print(f" + Parsed RTP: {record.theoretical_rtp}")
         else:
             print(" - Failed to extract RTP.")
-
-        # --- Extract Volatility ---
-        vol_raw = get_value_by_label("casino.volatility")
-        if vol_raw:
-            extracted['volatility'] = get_volatility_level(vol_raw)
-            print(f" + Parsed Volatility: {vol_raw} (Mapped to {extracted['volatility']})")
+        if raw.get('volatility'):
+            print(f" + Parsed Volatility: {raw['volatility']} (Mapped to {record.volatility_level})")
 
         # Only update if we found something useful
-        if extracted['rtp'] > 0:
-            if update_slot_in_db(slot_id, extracted):
+        if record.theoretical_rtp:
+            if update_slot_in_db(record):
                 print(f"✅ SUCCESS: ID {slot_id} updated in database.")
+                return True, None
+            reason = "database update failed"
         else:
             print(f"⚠️ SKIPPED: No valid RTP found for ID {slot_id}, skipping DB update.")
 
     except Exception as e:
         print(f"❌ CRITICAL ERROR: {e}")
+        reason = str(e)
     finally:
-        browser.close()
+        close_browser(browser)
+    return False, reason
 
 
 def run():
     try:
-        conn = mysql.connector.connect(**DB_CONFIG)
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT id, url FROM slots WHERE url IS NOT NULL AND theoretical_rtp = 0 LIMIT 100")
-        rows = cursor.fetchall()
-        cursor.close()
-        conn.close()
+        claims = ClaimQueue(DB_CONFIG, PRIORITY_FIELDS)
     except Exception as e:
-        print(f"DB Connection Error: {e}")
-        return
-
-    if not rows:
-        print("No slots need updating.")
+        print(f"[Claims] Cannot start: {e}")
         return
 
+    processed = 0
     with sync_playwright() as p:
-        for row in rows:
-            scrape_slot_details(p, row['id'], row['url'])
-            time.sleep(3)
+        # Claim small leased batches until the backlog or this worker's budget runs out;
+        # other workers (any host) claim around us via SKIP LOCKED
+        while BUDGET is None or processed < BUDGET:
+            try:
+                rows = claims.claim(CLAIM_BATCH if BUDGET is None else min(CLAIM_BATCH, BUDGET - processed))
+            except mysql.connector.Error as e:
+                # Nothing was leased (claim() rolled back), so stopping here loses no rows
+                print(f"[Claims] Claim failed, stopping: {e}")
+                break
+            if not rows:
+                print("No slots need updating." if not processed else "Backlog drained.")
+                break
+            for i, row in enumerate(rows):
+                health = health_for(row['url'])
+                if health.broken():
+                    # Not the slots' fault: hand the held rows back without a failure and stop claiming
+                    print(f"[Skip] {health.site} is marked broken, releasing {len(rows) - i} claimed slot(s).")
+                    try:
+                        for held in rows[i:]:
+                            claims.release(held['id'])
+                    except mysql.connector.Error as e:
+                        print(f"[Claims] Release failed, the leases will expire instead: {e}")
+                    break
+                ok, reason = scrape_slot_details(p, row['id'], row['url'])
+                try:
+                    if ok:
+                        claims.complete(row['id'])
+                    else:
+                        claims.fail(row['id'], reason)
+                except mysql.connector.Error as e:
+                    # The lease runs out on its own, after which the row is claimable again
+                    print(f"[Claims] Could not record ID {row['id']}: {e}")
+                processed += 1
+            else:
+                continue
+            break
+    claims.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,113 @@
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from playwright.sync_api import sync_playwright
+from playwright_stealth import Stealth
+from browser_pool import (browser_endpoints, launch_browser, open_context, close_context,
+                          start_browser_server, stop_browser_server)
+
+# --- CONFIGURATION ---
+MAX_TABS = int(os.getenv('FANOUT_TABS', 5))
+
+
+class SharedDedup:
+    """Thread-safe 'seen' set shared by every tab of one scrape."""
+
+    def __init__(self):
+        self._seen = set()
+        self._lock = threading.Lock()
+
+    def claim(self, key):
+        """True if key wasn't seen yet (and marks it seen)."""
+        with self._lock:
+            if key in self._seen:
+                return False
+            self._seen.add(key)
+            return True
+
+    def __len__(self):
+        with self._lock:
+            return len(self._seen)
+
+
+class SyncQueue:
+    """
+    One consumer thread that writes batches to the NDJSON writer and syncs them, so tabs never
+    block on the API and the writer / Laravel only ever see one batch at a time.
+    """
+
+    def __init__(self, writer, sync_fn):
+        self.writer = writer
+        self.sync_fn = sync_fn
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._consume, daemon=True)
+        self._thread.start()
+
+    def put(self, batch):
+        if batch:
+            self._queue.put(batch)
+
+    def _consume(self):
+        while True:
+            batch = self._queue.get()
+            if batch is None:
+                return
+            try:
+                self.writer.write_many(batch)
+                self.sync_fn(batch)
+            except Exception as e:
+                print(f"   [Sync] Batch failed: {e}")
+
+    def close(self):
+        """Drains what's queued and stops the consumer."""
+        self._queue.put(None)
+        self._thread.join()
+
+
+@contextmanager
+def shared_browser(headless=True):
+    """
+    The ws endpoint fan_out() tabs attach to: None when PW_BROWSER_WS already names warm servers
+    (launch_browser() picks one), else a browser server started for the duration of the block.
+    """
+    if browser_endpoints():
+        yield None
+        return
+    process, ws_endpoint = start_browser_server(headless=headless)
+    try:
+        yield ws_endpoint
+    finally:
+        stop_browser_server(process)
+
+
+def fan_out(casino_name, entries, crawl_fn, headless=True, context_options=None, max_tabs=MAX_TABS):
+    """
+    Runs crawl_fn(page, entry) for every entry in its own tab, up to max_tabs at once.
+    The sync API is bound to one thread, so every tab is a thread with its own Playwright driver,
+    but all of them are contexts in one Chromium (see shared_browser()), never a browser per tab.
+    Persistent profiles need a Chromium of their own, so fan-out tabs run on fresh contexts.
+    """
+    if not entries:
+        return
+    context_options = context_options or {'viewport': {'width': 1920, 'height': 1080}}
+
+    def run_tab(index, entry, ws_endpoint):
+        try:
+            with sync_playwright() as p:
+                browser = p.chromium.connect(ws_endpoint) if ws_endpoint else launch_browser(p, headless=headless)
+                context = open_context(browser, f"{casino_name}-{index}", **context_options)
+                try:
+                    page = context.new_page()
+                    Stealth().apply_stealth_sync(page)
+                    crawl_fn(page, entry)
+                finally:
+                    close_context(context)
+        except Exception as e:
+            print(f"!!! Tab {index} ({entry}) failed: {str(e)[:80]}")
+
+    with shared_browser(headless) as ws_endpoint, \
+            ThreadPoolExecutor(max_workers=max(1, min(max_tabs, len(entries)))) as pool:
+        for index, entry in enumerate(entries):
+            pool.submit(run_tab, index, entry, ws_endpoint)
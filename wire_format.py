@@ -0,0 +1,196 @@
+import os
+import sys
+import json
+import gzip
+import time
+import requests
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from dotenv import load_dotenv
+from slot_record import listing_records, encode_batch
+from browser_pool import HAR_MODE
+
+try:
+    import msgpack
+    import zstandard
+except ImportError:
+    msgpack = None
+    zstandard = None
+
+load_dotenv()
+
+# --- CONFIGURATION ---
+# json = legacy list of dicts, envelope = always send the compact envelope,
+# auto = send the envelope only to endpoints that advertise it (OPTIONS -> Accept-Post)
+WIRE_FORMAT = os.getenv('WIRE_FORMAT', 'json').lower()
+ENVELOPE_VERSION = 1
+
+JSON_CONTENT_TYPE = "application/json"
+ENVELOPE_CONTENT_TYPE = "application/vnd.slots-envelope+json"
+MSGPACK_CONTENT_TYPE = "application/vnd.slots-envelope+msgpack"
+
+# Query parameters that only change how the CDN renders the image, not which image it is
+IMGIX_TRANSFORM_PARAMS = {
+    "w", "h", "fit", "crop", "dpr", "q", "auto", "fm", "ar", "bg", "pad", "border",
+    "blur", "sharp", "rect", "max-w", "max-h", "min-w", "min-h", "fp-x", "fp-y", "fp-z",
+}
+IMGIX_TRANSFORM_PREFIXES = ("mark", "txt", "blend")
+
+# endpoint -> envelope content types it advertised (empty = legacy JSON only), probed once per process
+_capabilities = {}
+
+
+def canonical_avatar(url):
+    """Drops transform-only query params from known image CDNs. Other URLs are returned unchanged."""
+    if not url or "?" not in url:
+        return url
+    parts = urlsplit(url)
+    if not parts.netloc.endswith("imgix.net"):
+        return url
+    kept = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+            if k not in IMGIX_TRANSFORM_PARAMS and not k.startswith(IMGIX_TRANSFORM_PREFIXES)]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(kept), parts.fragment))
+
+
+def build_envelope(slots_data):
+    """
+    Lifts every field that has the same value on all records (casino_name, and often url/provider
+    for single-page casinos) to the batch level and canonicalizes avatars.
+    """
+    records = [dict(r, avatar=canonical_avatar(r.get("avatar"))) for r in slots_data]
+    # Union of keys in first-seen order, so a key that only later records carry isn't dropped
+    all_keys = list(dict.fromkeys(k for r in records for k in r))
+    missing = object()
+    shared = {}
+    for key in all_keys:
+        value = records[0].get(key, missing)
+        if value is not missing and all(r.get(key, missing) == value for r in records[1:]):
+            shared[key] = value
+    keys = [k for k in all_keys if k not in shared]
+    return {
+        "v": ENVELOPE_VERSION,
+        "shared": shared,
+        "fields": keys,
+        # Rows are positional against "fields", so keys aren't repeated per record
+        "rows": [[r.get(k) for k in keys] for r in records],
+    }
+
+
+def expand_envelope(envelope):
+    """Inverse of build_envelope; handy for the server side and for the benchmark round-trip check."""
+    return [{**envelope["shared"], **dict(zip(envelope["fields"], row))} for row in envelope["rows"]]
+
+
+def encode_envelope(slots_data, accepted=None):
+    """Returns (body, headers) for the best encoding available locally (and in `accepted`, if given)."""
+    envelope = build_envelope(slots_data)
+    if msgpack and zstandard and (accepted is None or MSGPACK_CONTENT_TYPE in accepted):
+        body = zstandard.ZstdCompressor(level=10).compress(msgpack.packb(envelope, use_bin_type=True))
+        return body, {"Content-Type": MSGPACK_CONTENT_TYPE, "Content-Encoding": "zstd"}
+    body = gzip.compress(json.dumps(envelope, separators=(",", ":")).encode("utf-8"))
+    return body, {"Content-Type": ENVELOPE_CONTENT_TYPE, "Content-Encoding": "gzip"}
+
+
+def _post_json(endpoint, records, timeout):
+    return requests.post(endpoint, data=encode_batch(records), timeout=timeout,
+                         headers={"Content-Type": JSON_CONTENT_TYPE})
+
+
+def envelope_types(endpoint, timeout=10):
+    """
+    Envelope content types the endpoint accepts, from the Accept-Post header of an OPTIONS request.
+    A server that doesn't answer OPTIONS or doesn't list them gets legacy JSON; we never guess from
+    how it reacts to a POST, since 422 is ordinary validation and an unknown type may even be ignored.
+    """
+    if endpoint in _capabilities:
+        return _capabilities[endpoint]
+    try:
+        response = requests.options(endpoint, timeout=timeout)
+    except requests.RequestException as e:
+        print(f"   [Wire] Capability probe of {endpoint} failed ({str(e)[:60]}), using JSON for now")
+        return set()
+    if response.status_code == 429 or response.status_code >= 500:
+        return set()  # Not an answer; ask again on the next batch
+    advertised = {t.split(";")[0].strip() for t in response.headers.get("Accept-Post", "").split(",")}
+    _capabilities[endpoint] = advertised & {ENVELOPE_CONTENT_TYPE, MSGPACK_CONTENT_TYPE}
+    return _capabilities[endpoint]
+
+
+def replayed_response(endpoint, details=None):
+    """Stands in for an API write under HAR_MODE=replay: a 200 that wrote nothing."""
+    response = requests.Response()
+    response.status_code = 200
+    response.url = endpoint
+    response.headers["Content-Type"] = JSON_CONTENT_TYPE
+    response._content = json.dumps({"replayed": True, "details": details or {}}).encode("utf-8")
+    return response
+
+
+def post_slots(endpoint, slots_data, timeout=120):
+    """
+    Drop-in replacement for requests.post(endpoint, json=slots_data) honouring WIRE_FORMAT.
+    Records (dicts or SlotRecords) are validated and normalized first; invalid ones are dropped.
+    Under HAR_MODE=replay nothing is sent: replayed pages must not write to the live API.
+    """
+    records = listing_records(slots_data)
+    if HAR_MODE == "replay":
+        print(f"   [Wire] HAR replay, not syncing {len(records)} records")
+        return replayed_response(endpoint, {"new_slots_added": 0, "existing_slots_skipped": len(records)})
+    accepted = None
+    if WIRE_FORMAT == "auto":
+        accepted = envelope_types(endpoint)
+        if not accepted:
+            return _post_json(endpoint, records, timeout)
+    elif WIRE_FORMAT != "envelope":
+        return _post_json(endpoint, records, timeout)
+
+    body, headers = encode_envelope([r.to_dict() for r in records], accepted)
+    headers["Accept"] = JSON_CONTENT_TYPE
+    response = requests.post(endpoint, data=body, headers=headers, timeout=timeout)
+
+    # Only 406/415 say the envelope itself was refused; anything else is about the data or the server
+    if WIRE_FORMAT == "auto" and response.status_code in (406, 415):
+        print(f"   [Wire] {endpoint} refused the envelope ({response.status_code}), falling back to JSON")
+        _capabilities[endpoint] = set()
+        return _post_json(endpoint, records, timeout)
+    return response
+
+
+def benchmark(path, batch_size=50):
+    with open(path, encoding="utf-8") as f:
+        records = json.load(f)
+    # slots_data.json is a sportsbet.io dump; the scraper adds casino_name before POSTing
+    casino_name = os.getenv('BENCH_CASINO_NAME', 'https://sportsbet.io')
+    records = [{**r, "casino_name": r.get("casino_name", casino_name)} for r in records]
+    batches = [records[i:i + batch_size] for i in range(0, len(records), batch_size)]
+
+    def measure(label, encode):
+        started = time.perf_counter()
+        size = sum(len(encode(batch)) for batch in batches)
+        elapsed = (time.perf_counter() - started) * 1000
+        return label, size, elapsed
+
+    results = [
+        measure("legacy json", lambda b: json.dumps(b).encode("utf-8")),
+        measure("legacy json+gzip", lambda b: gzip.compress(json.dumps(b).encode("utf-8"))),
+        measure("envelope json", lambda b: json.dumps(build_envelope(b), separators=(",", ":")).encode("utf-8")),
+        measure("envelope json+gzip", lambda b: gzip.compress(
+            json.dumps(build_envelope(b), separators=(",", ":")).encode("utf-8"))),
+    ]
+    if msgpack and zstandard:
+        results.append(measure("envelope msgpack+zstd", lambda b: encode_envelope(b)[0]))
+    else:
+        print("   [Bench] msgpack/zstandard not installed, skipping msgpack+zstd")
+
+    baseline = results[0][1]
+    print(f">>> {len(records)} records in {len(batches)} batches of {batch_size} from {path}")
+    for label, size, elapsed in results:
+        print(f"   {label:<24} {size:>10,} bytes  {size / baseline:6.1%}  {elapsed:8.2f} ms")
+
+    # The envelope drops only render params, so expanding it must give back the same records
+    for batch in batches:
+        expanded = expand_envelope(build_envelope(batch))
+        assert [r["title"] for r in expanded] == [r["title"] for r in batch]
+
+
+if __name__ == "__main__":
+    benchmark(sys.argv[1] if len(sys.argv) > 1 else "slots_data.json")